@@ -0,0 +1,209 @@
+"""
+Deterministic itinerary composer: the planner's Markdown table without an LLM.
+
+The planner rules are mechanical (exactly `days` rows, place names only in
+the slots, weather-only notes), so the table is built locally:
+
+  1. POIs are deduped by name (keeping the tool's ranking) and classified as
+     indoor, outdoor or either from their kinds and name.
+  2. Rainy days (precip_mm >= RAIN_MM, or a rain/snow/storm summary) are
+     filled first, from indoor and either-way POIs only, so outdoor slots
+     land on dry days whenever the POIs allow it.
+  3. Each day is a geographic cluster: seeded with the best remaining POI,
+     then grown with the nearest remaining ones.
+  4. Within a day, outdoor stops go to daylight slots, and the notes carry
+     the day's weather.
+
+The same observations always give the same table.
+"""
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..utils.geo import haversine_m
+from .planner_context import name_key, table_cell
+
+SLOTS = ("Morning", "Afternoon", "Evening")
+RAIN_MM = 2.0
+
+# Whole words only ("small" is not a mall, "Chill Lounge" is not a hill); kinds
+# like "tourism:theme_park" are matched with "_" read as a space
+_INDOOR_RE = re.compile(
+    r"\b(?:museums?|galler(?:y|ies)|theat(?:re|er)s?|cinemas?|aquariums?|planetariums?|librar(?:y|ies)|"
+    r"malls?|shopping|religio(?:n|us)|churche?s?|cathedrals?|mosques?|temples?|mandirs?|gurdwaras?|"
+    r"synagogues?|monaster(?:y|ies)|palaces?|havelis?|exhibitions?|arts? cent(?:re|er)s?|indoor|spas?)\b"
+)
+_OUTDOOR_RE = re.compile(
+    r"\b(?:parks?|gardens?|natur(?:e|al)|beach(?:es)?|view ?points?|zoos?|lakes?|rivers?|waterfalls?|water|"
+    r"forts?|ruins?|archaeolog\w*|monuments?|memorials?|tombs?|squares?|bridges?|trails?|peaks?|hills?|"
+    r"islands?|valleys?|baolis?|ghats?|gates?|towers?|minars?)\b"
+)
+_RAIN_RE = re.compile(r"rain|drizzle|shower|thunder|snow|storm|hail", re.I)
+
+
+def _setting(item: Dict[str, Any]) -> str:
+    """'indoor', 'outdoor' or 'either', from the POI's kinds, then its name."""
+    for text in (str(item.get("kinds") or ""), str(item.get("name") or "")):
+        text = text.lower().replace("_", " ")
+        if _INDOOR_RE.search(text):
+            return "indoor"
+        if _OUTDOOR_RE.search(text):
+            return "outdoor"
+    return "either"
+
+
+def _candidates(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Named POIs in tool order, deduped by normalized name, with setting and position."""
+    seen = set()
+    out = []
+    for rank, it in enumerate(items or []):
+        name = table_cell(it.get("name") or "")
+        key = name_key(name)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        lat, lon = it.get("lat"), it.get("lon")
+        out.append({
+            "name": name,
+            "rank": rank,
+            "setting": _setting(it),
+            "pos": (float(lat), float(lon)) if lat is not None and lon is not None else None,
+        })
+    return out
+
+
+def _is_rainy(day: Optional[Dict[str, Any]]) -> bool:
+    if not day:
+        return False
+    rain = day.get("precip_mm")
+    return (rain is not None and rain >= RAIN_MM) or bool(_RAIN_RE.search(str(day.get("summary") or "")))
+
+
+def _day_weather(weather: Dict[str, Any], start_date: str, days: int) -> List[Optional[Dict[str, Any]]]:
+    """The forecast row for each trip day, by date when the window parses, else by position."""
+    rows = (weather or {}).get("days") or []
+    by_date = {d.get("date"): d for d in rows}
+    try:
+        start = date.fromisoformat(start_date)
+    except (TypeError, ValueError):
+        return [rows[i] if i < len(rows) else None for i in range(days)]
+    out = []
+    for i in range(days):
+        iso = (start + timedelta(days=i)).isoformat()
+        out.append(by_date.get(iso) or (rows[i] if i < len(rows) and not rows[i].get("date") else None))
+    return out
+
+
+def _distance(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    if a["pos"] is None or b["pos"] is None:
+        return float("inf")
+    return haversine_m(a["pos"][0], a["pos"][1], b["pos"][0], b["pos"][1])
+
+
+def _take_cluster(pool: List[Dict[str, Any]], size: int) -> List[Dict[str, Any]]:
+    """Best-ranked POI in `pool` plus its nearest neighbours (removed from `pool`)."""
+    if not pool:
+        return []
+    seed = pool.pop(0)
+    near = sorted(pool, key=lambda p: (_distance(seed, p), p["rank"]))[: size - 1]
+    for p in near:
+        pool.remove(p)
+    return [seed] + near
+
+
+def _order_stops(stops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Outdoor stops first (daylight), then route order: nearest next stop from the seed."""
+    outdoor = [s for s in stops if s["setting"] == "outdoor"]
+    rest = [s for s in stops if s["setting"] != "outdoor"]
+    ordered: List[Dict[str, Any]] = []
+    for group in (outdoor, rest):
+        group = list(group)
+        while group:
+            prev = ordered[-1] if ordered else None
+            nxt = min(group, key=lambda s: (_distance(prev, s) if prev else 0.0, s["rank"]))
+            group.remove(nxt)
+            ordered.append(nxt)
+    return ordered
+
+
+def _plan_days(
+    candidates: List[Dict[str, Any]], rainy: List[bool], per_day: int
+) -> List[List[Dict[str, Any]]]:
+    """Stops per day: rainy days take indoor/either POIs first, then dry days take the best of the rest."""
+    pool = sorted(candidates, key=lambda c: c["rank"])
+    plan: List[List[Dict[str, Any]]] = [[] for _ in rainy]
+    sheltered = [c for c in pool if c["setting"] != "outdoor"]
+    for i, wet in enumerate(rainy):
+        if wet:
+            plan[i] = _take_cluster(sheltered, per_day)
+            for c in plan[i]:
+                pool.remove(c)
+    for i, wet in enumerate(rainy):
+        if not wet:
+            plan[i] = _take_cluster(pool, per_day)
+    # Not enough sheltered POIs: top rainy days up with whatever is left
+    for i, wet in enumerate(rainy):
+        if wet and len(plan[i]) < per_day and pool:
+            plan[i] += _take_cluster(pool, per_day - len(plan[i]))
+    return [_order_stops(stops) for stops in plan]
+
+
+def _notes(day: Optional[Dict[str, Any]], stops: List[Dict[str, Any]], budget_mode: bool) -> str:
+    if not day:
+        cue = "Forecast unavailable; check weather before heading out"
+    else:
+        parts = []
+        if day.get("summary"):
+            parts.append(table_cell(day["summary"]))
+        tmin, tmax = day.get("tmin_c"), day.get("tmax_c")
+        if tmin is not None and tmax is not None:
+            parts.append(f"{round(tmin)}-{round(tmax)}°C")
+        rain = day.get("precip_mm")
+        if _is_rainy(day):
+            outdoor = any(s["setting"] == "outdoor" for s in stops)
+            parts.append(
+                f"Rain{f' {round(rain, 1)} mm' if rain else ''}: "
+                + ("keep outdoor stops short" if outdoor else "indoor stops")
+            )
+        else:
+            parts.append("No rain expected")
+        cue = ", ".join(parts)
+    if budget_mode:
+        cue += "; public transit"
+    return cue
+
+
+def compose(
+    pois: List[Dict[str, Any]],
+    weather: Dict[str, Any],
+    days: int,
+    start_date: str,
+    *,
+    budget_mode: bool = False,
+    per_day: int = len(SLOTS),
+) -> str:
+    """
+    Markdown table `Day | Morning | Afternoon | Evening | Notes` with exactly
+    `days` rows; slots hold one place name each ("-" when POIs run out).
+    """
+    days = max(1, int(days or 1))
+    forecast = _day_weather(weather, start_date, days)
+    rainy = [_is_rainy(d) for d in forecast]
+    plan = _plan_days(_candidates(pois), rainy, per_day)
+
+    try:
+        start: Optional[date] = date.fromisoformat(start_date)
+    except (TypeError, ValueError):
+        start = None
+
+    lines = ["| Day | " + " | ".join(SLOTS) + " | Notes |", "|---|---|---|---|---|"]
+    for i in range(days):
+        stops = plan[i]
+        label = f"Day {i + 1}" + (f" ({(start + timedelta(days=i)).isoformat()})" if start else "")
+        cells = []
+        for k in range(len(SLOTS)):
+            # Spread extra stops over the slots, at most two names per cell
+            names = [s["name"] for s in stops[k::len(SLOTS)]][:2]
+            cells.append(", ".join(names) or "-")
+        lines.append(f"| {label} | " + " | ".join(cells) + f" | {_notes(forecast[i], stops, budget_mode)} |")
+    return "\n".join(lines)
@@ -1,12 +1,32 @@
 import json
-from typing import Any, Dict, Optional
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional
 
-from ..llm import chat
+from ..config import settings
+from ..llm import chat, chat_stream
 from ..prompts import planner_system
+from ..utils.concurrency import get_pool
+from ..utils.tracing import propagate, traced
+from .itinerary import compose
+from .planner_context import compact_context
 from .weather_agent import run as weather_run
 from .poi_agent import run as poi_run
 
 
+def _branch_result(future, deadline: float, label: str, empty_key: str):
+    """Wait for one fan-out branch; failures and timeouts become an error observation."""
+    try:
+        _, obs = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        return obs
+    except FutureTimeout:
+        future.cancel()
+        return {"error": f"{label} failed: timed out after {settings.planner_branch_timeout_s:g}s", empty_key: []}
+    except Exception as e:
+        return {"error": f"{label} failed: {e}", empty_key: []}
+
+
+@traced("agent.planner")
 def run(
     user_query: str,
     city: str,
@@ -19,6 +39,7 @@ def run(
     budget_mode: bool = False,
     poi_topic: Optional[str] = None,
     guide_topic: Optional[str] = None,
+    on_token: Optional[Callable[[str], None]] = None,
     **_ignored_kwargs: Any,  
 ):
     """
@@ -29,24 +50,23 @@ def run(
       - Morning/Afternoon/Evening cells contain **only place names** (no descriptions).
       - Notes contain short logistics or weather cues only.
       - Accepts extra kwargs like `guide_topic` without error.
+      - The table is composed locally (agents/itinerary.py); with PLANNER_LLM_POLISH
+        the LLM rewrites that draft, and the draft is kept if the call fails.
+      - With `on_token`, the table is passed to it (streamed while the LLM polishes).
     """
 
-    # Fetch weather 
-    weather_obs: Dict[str, Any] = {}
-    try:
-        _, weather_obs = weather_run(user_query, city, start_date, end_date)
-    except Exception as e:
-        weather_obs = {"error": f"weather failed: {e}", "days": []}
+    # Fetch weather + POIs concurrently; wall time is max(weather, poi), not the sum
+    pool = get_pool("planner", settings.planner_workers)
+    deadline = time.monotonic() + settings.planner_branch_timeout_s
+    weather_future = pool.submit(propagate(weather_run, user_query, city, start_date, end_date))
+    poi_future = pool.submit(
+        propagate(poi_run, f"best tourist attractions in {city}", city, limit=18, topic="general", mode="fast")
+    )
 
-    # Fetch POIs 
-    poi_obs: Dict[str, Any] = {"items": []}
-    try:
-       
-        _, poi_obs = poi_run(f"best tourist attractions in {city}", city, limit=18, topic="general")
-    except Exception as e:
-        poi_obs = {"error": f"poi failed: {e}", "items": []}
+    weather_obs = _branch_result(weather_future, deadline, "weather", "days")
+    poi_obs = _branch_result(poi_future, deadline, "poi", "items")
 
-    # Build planning context for the LLM
+    # Planning context (also the LLM's observations when polishing)
     constraints = {
         "days": days,
         "date_window": [start_date, end_date],
@@ -58,7 +78,22 @@ def run(
         },
     }
 
-    # System + user prompt 
+    ctx = {"weather": weather_obs, "pois": poi_obs, "constraints": constraints}
+
+    # The table itself is mechanical: compose it locally, reproducibly
+    draft = compose(
+        (poi_obs or {}).get("items") or [],
+        weather_obs,
+        days,
+        start_date,
+        budget_mode=budget_mode,
+    )
+    if not settings.planner_llm_polish:
+        if on_token is not None:
+            on_token(draft)
+        return draft, ctx
+
+    # Optional polish: the LLM may reorder or swap places, but starts from the draft
     sys = {"role": "system", "content": planner_system.SYSTEM_PROMPT}
     user = {
         "role": "user",
@@ -72,16 +107,36 @@ def run(
             )
             + "Output ONLY a Markdown table with columns: Day | Morning | Afternoon | Evening | Notes. "
             + "Morning/Afternoon/Evening cells must contain only place names (no descriptions). "
-            + "Notes must contain short logistics/weather cues only."
+            + "Notes must contain short logistics/weather cues only. "
+            + f"Keep exactly {days} rows and keep outdoor places off rainy days."
         ),
     }
 
-    ctx = {"weather": weather_obs, "pois": poi_obs, "constraints": constraints}
-
-    # Ask LLM to compose the table 
-    final = chat(
-        [sys, user, {"role": "user", "content": f"Observations: {json.dumps(ctx)}"}],
-        temperature=0.2,
-    )
+    # Only the fields the table needs go into the prompt
+    if settings.planner_compact_context:
+        observations, ctx["prompt_tokens"] = compact_context(
+            ctx, settings.planner_context_tokens, min_pois=min(3 * days, 12)
+        )
+    else:
+        observations = json.dumps(ctx)
 
-    return final, ctx
+    messages = [
+        sys,
+        user,
+        {"role": "user", "content": f"Observations:\n{observations}\n\nDraft table to improve:\n{draft}"},
+    ]
+    parts = []
+    try:
+        if on_token is None:
+            final = chat(messages, temperature=0.2)
+        else:
+            for delta in chat_stream(messages, temperature=0.2):
+                parts.append(delta)
+                on_token(delta)
+            final = "".join(parts).strip()
+    except Exception:
+        # Polish is optional; the draft already satisfies the rules
+        if on_token is not None:
+            on_token(("\n\n" if parts else "") + draft)
+        final = draft
+    return final or draft, ctx
@@ -0,0 +1,90 @@
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+from ..utils.tokens import estimate_tokens
+
+_KIND_PREFIX_RE = re.compile(r"^(tourism|historic|leisure|natural|water|waterway|amenity):")
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _short_kind(kinds: Any) -> str:
+    """First kind only, without the OSM key prefix ('tourism:museum' -> 'museum')."""
+    first = str(kinds or "").split(",")[0].strip()
+    return _KIND_PREFIX_RE.sub("", first).replace("_", " ")
+
+
+def table_cell(value: Any) -> str:
+    """`value` as text that is safe inside one Markdown/pipe-separated table cell."""
+    return str(value).replace("|", "/").replace("\n", " ").strip()
+
+
+def name_key(name: str) -> str:
+    """Dedupe key for a place name: lowercase letters and digits only."""
+    return _NORM_RE.sub("", name.lower())
+
+
+def _ranked_pois(items: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """Dedupe by normalized name, keeping the tool's cross-source ranking order."""
+    seen = set()
+    unique = []
+    for it in items or []:
+        name = table_cell(it.get("name") or "")
+        key = name_key(name)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        unique.append((name, _short_kind(it.get("kinds"))))
+    return unique
+
+
+def _weather_lines(weather: Dict[str, Any]) -> List[str]:
+    days = (weather or {}).get("days") or []
+    if not days:
+        return ["WEATHER unavailable"]
+    lines = ["WEATHER date|sky|min-max C|rain mm"]
+    for d in days:
+        tmin, tmax, rain = d.get("tmin_c"), d.get("tmax_c"), d.get("precip_mm")
+        temps = f"{round(tmin)}-{round(tmax)}" if tmin is not None and tmax is not None else "?"
+        lines.append(f"{d.get('date', '')}|{table_cell(d.get('summary') or '?')}|{temps}|{'?' if rain is None else round(rain, 1)}")
+    return lines
+
+
+def _constraint_line(constraints: Dict[str, Any]) -> str:
+    window = constraints.get("date_window") or ["", ""]
+    line = f"CONSTRAINTS days={constraints.get('days')} window={window[0]}..{window[1]}"
+    budget = constraints.get("budget")
+    if budget and budget.get("amount"):
+        line += f" budget=~{budget['amount']} {budget.get('currency') or ''}".rstrip()
+    return line
+
+
+def compact_context(ctx: Dict[str, Any], token_budget: int, min_pois: int = 0) -> Tuple[str, Dict[str, int]]:
+    """
+    Project the planner context onto what the table needs (weather per day,
+    ranked POI names with one kind, the day window) in a terse pipe-separated
+    encoding, dropping the lowest-ranked POIs until it fits `token_budget`.
+
+    Returns (text, {"raw_tokens", "compact_tokens", "pois_kept", "pois_total"}).
+    """
+    head = _weather_lines(ctx.get("weather") or {})
+    tail = [_constraint_line(ctx.get("constraints") or {})]
+    pois = _ranked_pois((ctx.get("pois") or {}).get("items") or [])
+
+    def _render(n: int) -> str:
+        rows = ["POIS name|kind"] + [f"{name}|{kind}" if kind else name for name, kind in pois[:n]]
+        return "\n".join(head + (rows if n else ["POIS none"]) + tail)
+
+    keep = len(pois)
+    text = _render(keep)
+    while keep > min_pois and estimate_tokens(text) > token_budget:
+        keep -= 1
+        text = _render(keep)
+
+    stats = {
+        "raw_tokens": estimate_tokens(json.dumps(ctx)),
+        "compact_tokens": estimate_tokens(text),
+        "pois_kept": keep,
+        "pois_total": len(pois),
+    }
+    return text, stats
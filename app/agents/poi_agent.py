@@ -1,25 +1,16 @@
 # app/agents/poi_agent.py
 import re
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Callable, Iterable, Optional, Tuple, Dict, Any, List
 
-from ..llm import chat
+from ..config import settings
+from ..llm import chat, chat_stream
 from ..prompts import react_agent
 from ..tools import poi as poi_tool
+from ..utils.patterns import FOODS_RE, NATURE_RE, RESTAURANT_RE
+from ..utils.tracing import traced
+from .react import run_react
 
 
-# Common regex patterns
-RESTAURANT_RE = re.compile(
-    r"\b(rest(?:a|e)?ur(?:a|e)?n(?:t|ts)?|resto|dining|food\s+places|best\s+rest|top\s+rest)\b",
-    re.IGNORECASE,
-)
-FOODS_RE = re.compile(
-    r"\b(foods?\s+to\s+try|local\s+dishes|must[-\s]*try\s+foods?|what\s+to\s+eat|famous\s+foods?)\b",
-    re.IGNORECASE,
-)
-NATURE_RE = re.compile(
-    r"\b(nature|park(s)?|garden(s)?|lake(s)?|waterfall(s)?|beach(es)?|viewpoint(s)?|hiking|trail(s)?|valley|forest)\b",
-    re.IGNORECASE,
-)
 GREET_RE = re.compile(
     r"\b(hi|hello|hey|good\s+(morning|afternoon|evening|night)|how\s+are\s+you|thank(s)?|what'?s\s+up|yo|sup)\b",
     re.IGNORECASE,
@@ -64,20 +55,103 @@ def _names_from_items(items: List[Dict[str, Any]]) -> List[str]:
     return names
 
 
+def _names_from_table(text: str, names: List[str]) -> None:
+    """Append names found in a Markdown table (header/separator rows skipped)."""
+    extracted = re.findall(r"\|\s*([^\|\n]+?)\s*\|", text or "")
+    for n in extracted:
+        n2 = n.strip()
+        low = n2.lower()
+        if n2 and low not in {"place", "food", "name", "item", "---"} and not set(n2) <= set("-: ") and n2 not in names:
+            names.append(n2)
+
+
+def _stream_names(
+    deltas: Iterable[str], names: List[str], topic: str, on_token: Callable[[str], None]
+) -> None:
+    """
+    Collect names from a streamed Markdown table, emitting each one as a row of
+    the final table as soon as its line is complete.
+    """
+    on_token(f"| {_header_for_topic(topic)} |\n|---|\n")
+
+    def _emit(line: str) -> None:
+        before = len(names)
+        _names_from_table(line, names)
+        for n in names[before:]:
+            on_token(f"| {n} |\n")
+
+    buf = ""
+    for delta in deltas:
+        buf += delta
+        while "\n" in buf:
+            line, buf = buf.split("\n", 1)
+            _emit(line)
+    _emit(buf)
+    if not names:
+        on_token("| _No live results found for this scope_ |\n")
+
+
+def _fetch_live(city: str, limit: int, topic: str) -> Dict[str, Any]:
+    try:
+        if topic == "foods":
+            return poi_tool.list_foods(city, limit=max(12, limit))
+        return poi_tool.list_pois(city, limit=max(14, limit), topic=topic)
+    except Exception as e:
+        return {"city": city, "error": f"poi fetch failed: {e}", "items": []}
+
+
+def _run_react(user_query: str, city: str, limit: int, topic: str) -> Tuple[str, Dict[str, Any]]:
+    """The model picks the tool calls and sees their observations before answering."""
+    list_topic = "general" if topic == "foods" else topic
+    tools = {
+        "poi.list": lambda a: poi_tool.list_pois(
+            a.get("city") or city,
+            limit=max(14, int(a.get("limit") or limit)),
+            topic=a.get("topic") if a.get("topic") in {"general", "restaurants", "nature"} else list_topic,
+        ),
+        "poi.foods": lambda a: poi_tool.list_foods(a.get("city") or city, limit=max(12, int(a.get("limit") or limit))),
+    }
+    final, steps = run_react(
+        react_agent.REACT_PROMPT,
+        f"{user_query}\n(city: {city}; topic hint: {topic})",
+        tools,
+        max_steps=settings.react_max_steps,
+    )
+
+    # Last successful observation is the live data behind the answer
+    obs: Dict[str, Any] = {"city": city, "items": []}
+    for step in steps:
+        if isinstance(step["observation"], dict) and step["observation"].get("items"):
+            obs = step["observation"]
+    obs = {**obs, "react_steps": [{"action": s["action"], "args": s["args"]} for s in steps]}
+
+    names: List[str] = []
+    _names_from_table(final, names)
+    if not names:
+        names = _names_from_items(obs.get("items", []))
+    return _format_names_table(names, topic), obs
+
+
 def _is_greeting(text: str) -> bool:
     """Detect if the input is a greeting or casual message"""
     return bool(GREET_RE.search(text.strip()))
 
 
+@traced("agent.poi")
 def run(
     user_query: str,
     city: str,
     limit: int = 14,
     topic: Optional[str] = None,
+    mode: Optional[str] = None,
+    on_token: Optional[Callable[[str], None]] = None,
     **_ignored_kwargs,
 ) -> Tuple[str, Dict[str, Any]]:
     """
-    Live-first POI agent with greetings + fallback handling
+    Live-first POI agent with greetings + fallback handling.
+    `mode` overrides settings.poi_agent_mode ("fast" | "react").
+    `on_token` receives the LLM fallback table row by row while it is generated
+    (live results are returned whole and never streamed).
     """
     #   Handle casual chat
     if _is_greeting(user_query):
@@ -94,25 +168,11 @@ def run(
     if topic not in _ALLOWED_TOPICS:
         topic = _detect_topic(user_query)
 
-    # LLM + ReAct wrapper 
-    system = {"role": "system", "content": react_agent.REACT_PROMPT}
-    user = {
-        "role": "user",
-        "content": (
-            "You will receive an observation with live POIs.\n"
-            "Return ONLY a Markdown table of names (no descriptions)."
-        ),
-    }
-    _ = chat([system, user], temperature=0.2)
+    if (mode or settings.poi_agent_mode) == "react":
+        return _run_react(user_query, city, limit, topic)
 
-    #  Live data
-    try:
-        if topic == "foods":
-            obs = poi_tool.list_foods(city, limit=max(12, limit))
-        else:
-            obs = poi_tool.list_pois(city, limit=max(14, limit), topic=topic)
-    except Exception as e:
-        obs = {"city": city, "error": f"poi fetch failed: {e}", "items": []}
+    #  Fast mode: live data first, the model is only used when it comes back empty
+    obs = _fetch_live(city, limit, topic)
 
     items = obs.get("items", []) or []
     names = _names_from_items(items)
@@ -123,24 +183,19 @@ def run(
             "foods to try" if topic == "foods"
             else ("restaurants" if topic == "restaurants" else ("nature places" if topic == "nature" else "tourist attractions"))
         )
-        proposal = chat(
-            [
-                {
-                    "role": "system",
-                    "content": "List strictly names only (no descriptions, no numbering). Output as Markdown table.",
-                },
-                {
-                    "role": "user",
-                    "content": f"Give top {prompt_topic_text} in {city}. Names only.",
-                },
-            ],
-            temperature=0.2,
-        )
-        extracted = re.findall(r"\|\s*([^\|\n]+?)\s*\|", proposal)
-        for n in extracted:
-            n2 = n.strip()
-            low = n2.lower()
-            if n2 and low not in {"place", "food", "---"} and n2 not in names:
-                names.append(n2)
+        messages = [
+            {
+                "role": "system",
+                "content": "List strictly names only (no descriptions, no numbering). Output as Markdown table.",
+            },
+            {
+                "role": "user",
+                "content": f"Give top {prompt_topic_text} in {city}. Names only.",
+            },
+        ]
+        if on_token is None:
+            _names_from_table(chat(messages, temperature=0.2), names)
+        else:
+            _stream_names(chat_stream(messages, temperature=0.2), names, topic, on_token)
 
     return _format_names_table(names, topic), obs
@@ -0,0 +1,96 @@
+"""
+Speculative warm-up that overlaps the router LLM call.
+
+When the pre-router is not sure enough to skip the LLM, its guess usually
+still names the right city. `start` launches the geocode, forecast and POI
+fetches that the guessed agent would make, on a background pool, while Groq
+is still answering.
+
+Nothing is handed over directly. The fetches fill the geocode, forecast and
+POI caches, and an agent that asks for the same URL while it is still in
+flight joins it through the transport's single-flight. So when the router
+agrees, the agent adopts the work simply by making its usual calls. When the
+router picks another city, `settle` cancels whatever has not started yet.
+"""
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..tools import poi as poi_tool
+from ..tools import weather as weather_tool
+from ..utils import tracing
+from ..utils.cache import normalize_key
+from ..utils.concurrency import get_pool
+from ..utils.tracing import propagate
+
+_stats = {"started": 0, "adopted": 0, "discarded": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _tasks(guess: Dict[str, Any]) -> List[Tuple[str, Callable[[], Any]]]:
+    """The tool calls the guessed agent will make, with the same arguments so cache keys line up."""
+    city, intent = guess["city"], guess.get("intent")
+    tasks: List[Tuple[str, Callable[[], Any]]] = [("geocode", lambda: weather_tool.geocode_city(city))]
+    if intent in ("weather", "plan"):
+        tasks.append(("forecast", lambda: weather_tool.daily_summary(city, guess["start_date"], guess["end_date"])))
+    if intent == "plan":
+        tasks.append(("poi", lambda: poi_tool.list_pois(city, limit=18, topic="general")))
+    elif intent == "poi":
+        topic = guess.get("poi_topic") or "general"
+        if topic == "foods":
+            tasks.append(("poi", lambda: poi_tool.list_foods(city, limit=14)))
+        else:
+            tasks.append(("poi", lambda: poi_tool.list_pois(city, limit=14, topic=topic)))
+    return tasks
+
+
+def _quiet(name: str, fn: Callable[[], Any]) -> Callable[[], None]:
+    def _run() -> None:
+        with tracing.span(f"prefetch.{name}"):
+            try:
+                fn()
+            except Exception:
+                pass  # speculative; the agent will make (and report) the real call
+    return _run
+
+
+class Prefetch:
+    """Handle on one speculative warm-up; `settle` it once the router has answered."""
+
+    def __init__(self, city: str, futures: List[Future]):
+        self.city = city
+        self.futures = futures
+
+    def settle(self, city: str) -> bool:
+        """Adopt (True) if the router chose the same city, else cancel what has not started (False)."""
+        adopted = bool(city) and normalize_key(city) == normalize_key(self.city)
+        if not adopted:
+            for f in self.futures:
+                f.cancel()
+        _count("adopted" if adopted else "discarded")
+        tracing.annotate(prefetch_city=self.city, prefetch_adopted=adopted)
+        return adopted
+
+
+def start(guess: Dict[str, Any]) -> Optional[Prefetch]:
+    """Warm the caches for a pre-router guess; None when there is nothing to guess or nowhere to keep it."""
+    if not settings.router_prefetch or not settings.cache_enabled or not guess.get("city"):
+        return None
+    pool = get_pool("prefetch", settings.prefetch_workers)
+    futures = [pool.submit(propagate(_quiet(name, fn))) for name, fn in _tasks(guess)]
+    _count("started")
+    return Prefetch(guess["city"], futures)
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        out = dict(_stats)
+    settled = out["adopted"] + out["discarded"]
+    out["adopt_rate"] = (out["adopted"] / settled) if settled else 0.0
+    return out
@@ -0,0 +1,156 @@
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from ..utils import date_utils
+from ..utils.patterns import (
+    BUDGET_RE,
+    DAYS_RE,
+    FOODS_RE,
+    NATURE_RE,
+    PLAN_RE,
+    RESTAURANT_RE,
+    SIGHTS_RE,
+    WEATHER_RE,
+)
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "gazetteer.txt"
+
+_WORD_NUMBERS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+_MAX_NGRAM = 4
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_stats = {"hits": 0, "misses": 0}
+_stats_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _gazetteer() -> Dict[Tuple[str, ...], str]:
+    """Token tuple of every name/alias -> canonical city name."""
+    index: Dict[Tuple[str, ...], str] = {}
+    for line in GAZETTEER_PATH.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        names = [n.strip() for n in line.split("|") if n.strip()]
+        for n in names:
+            index[tuple(_TOKEN_RE.findall(n.lower()))] = names[0]
+    return index
+
+
+def find_cities(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Gazetteer matches in `text` as (canonical_name, start_token, end_token),
+    longest match first, non-overlapping, in reading order.
+    """
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    index = _gazetteer()
+    found: List[Tuple[str, int, int]] = []
+    i = 0
+    while i < len(tokens):
+        for n in range(min(_MAX_NGRAM, len(tokens) - i), 0, -1):
+            name = index.get(tuple(tokens[i:i + n]))
+            if name:
+                found.append((name, i, i + n))
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def _days(text: str) -> int:
+    m = DAYS_RE.search(text)
+    if m:
+        raw = m.group(1).lower()
+        days = int(raw) if raw.isdigit() else _WORD_NUMBERS.get(raw, 2)
+        return max(1, days)
+    if re.search(r"\b(a|one)\s+week\b", text, re.IGNORECASE):
+        return 7
+    return 2
+
+
+def _intent(text: str) -> Tuple[str, float]:
+    """
+    (intent, intent_confidence); confidence is 0.5 only when exactly one intent
+    is cued. Mixed cues score 0.2, so even with a known city (0.5) they stay
+    under the fast-router threshold and the LLM decides.
+    """
+    poi_cue = bool(RESTAURANT_RE.search(text) or FOODS_RE.search(text) or NATURE_RE.search(text) or SIGHTS_RE.search(text))
+    plan_cue = bool(PLAN_RE.search(text))
+    weather_cue = bool(WEATHER_RE.search(text))
+    cues = [name for name, hit in (("plan", plan_cue), ("weather", weather_cue), ("poi", poi_cue)) if hit]
+    if len(cues) == 1:
+        return cues[0], 0.5
+    if cues:
+        # "weather in Goa during my trip": plan is the likelier guess (cues lists it
+        # first), but only the LLM can tell
+        return cues[0], 0.2
+    return "poi", 0.0
+
+
+def _topics(text: str) -> Tuple[str, str]:
+    if FOODS_RE.search(text):
+        poi_topic, guide_topic = "foods", "foods_to_try"
+    elif RESTAURANT_RE.search(text):
+        poi_topic, guide_topic = "restaurants", "none"
+    elif NATURE_RE.search(text):
+        poi_topic, guide_topic = "nature", "none"
+    else:
+        poi_topic, guide_topic = "general", "none"
+    if guide_topic == "none" and BUDGET_RE.search(text):
+        guide_topic = "budget"
+    return poi_topic, guide_topic
+
+
+def pre_route(query: str, tz: str) -> Dict[str, Any]:
+    """
+    Rule + gazetteer classification with the same shape as `router.route()`,
+    plus a `confidence` in [0, 1]: 0.5 for a single known city, 0.5 for an
+    unambiguous intent cue. The router only trusts it above its threshold.
+    """
+    text = query or ""
+    cities = find_cities(text)
+    distinct = {c[0] for c in cities}
+    city = cities[0][0] if cities else ""
+    city_conf = 0.5 if len(distinct) == 1 else (0.2 if distinct else 0.0)
+
+    # Cue words inside a place name ("Spiti Valley", "Rann of Kutch") must not count
+    tokens = _TOKEN_RE.findall(text.lower())
+    for _, start, end in cities:
+        tokens[start:end] = [""] * (end - start)
+    cue_text = " ".join(t for t in tokens if t)
+
+    intent, intent_conf = _intent(cue_text)
+    days = _days(cue_text)
+    poi_topic, guide_topic = _topics(cue_text)
+    start, end = date_utils.resolve_dates(text, tz_name=tz, default_days=days)
+
+    return {
+        "intent": intent,
+        "city": city,
+        "start_date": start,
+        "end_date": end,
+        "days": days,
+        "poi_topic": poi_topic,
+        "guide_topic": guide_topic,
+        "confidence": round(city_conf + intent_conf, 2),
+    }
+
+
+def record(hit: bool) -> None:
+    with _stats_lock:
+        _stats["hits" if hit else "misses"] += 1
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": (hits / total) if total else 0.0}
@@ -0,0 +1,74 @@
+import json
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..llm import chat
+
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+_BARE_JSON_RE = re.compile(r"^\s*(\{.*\})\s*$", re.DOTALL)
+
+# Keep observations small; the model only needs names and kinds to answer
+_MAX_OBSERVATION_CHARS = 4000
+
+
+def _parse_action(text: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return (tool_name, args) if the model emitted an action block, else None (final answer)."""
+    m = _JSON_BLOCK_RE.search(text or "") or _BARE_JSON_RE.match(text or "")
+    if not m:
+        return None
+    try:
+        d = json.loads(m.group(1))
+    except Exception:
+        return None
+    if not isinstance(d, dict) or not d.get("action"):
+        return None
+    args = d.get("args") or {}
+    return str(d["action"]), args if isinstance(args, dict) else {}
+
+
+def _observation_text(obs: Any) -> str:
+    text = json.dumps(obs, ensure_ascii=False)
+    if len(text) > _MAX_OBSERVATION_CHARS:
+        text = text[:_MAX_OBSERVATION_CHARS] + "…"
+    return text
+
+
+def run_react(
+    system_prompt: str,
+    user_prompt: str,
+    tools: Dict[str, Callable[[Dict[str, Any]], Any]],
+    max_steps: int = 3,
+    temperature: float = 0.2,
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Minimal ReAct loop: the model either emits a JSON action (we run the tool
+    and feed back the observation) or a final answer (returned as-is).
+
+    Returns (final_text, steps) where each step is {"action", "args", "observation"}.
+    """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt},
+    ]
+    steps: List[Dict[str, Any]] = []
+
+    for _ in range(max_steps):
+        out = chat(messages, temperature=temperature)
+        action = _parse_action(out)
+        if action is None:
+            return out, steps
+
+        name, args = action
+        tool = tools.get(name)
+        try:
+            obs = tool(args) if tool else {"error": f"unknown tool '{name}'. Available: {', '.join(tools)}"}
+        except Exception as e:
+            obs = {"error": f"{name} failed: {e}"}
+        steps.append({"action": name, "args": args, "observation": obs})
+
+        messages.append({"role": "assistant", "content": out})
+        messages.append({"role": "user", "content": f"Observation: {_observation_text(obs)}"})
+
+    # Out of steps: force a final answer from what has been observed
+    messages.append({"role": "user", "content": "Give your final answer now. Do not emit another action."})
+    return chat(messages, temperature=temperature), steps
@@ -1,37 +1,70 @@
 import json
-from ..llm import chat
+from ..config import settings
+from ..llm import cached_chat
 from ..prompts import router_system
-from ..utils import date_utils
+from ..utils import date_utils, tracing
 from ..tools import weather as weather_tool  
+from . import prefetch, prerouter
 
+def _is_json_object(text: str) -> bool:
+    try:
+        return isinstance(json.loads(text.strip()), dict)
+    except Exception:
+        return False
+
+@tracing.traced("route")
 def route(query: str, tz: str):
-    system = {"role": "system", "content": router_system.SYSTEM_PROMPT}
-    user = {"role": "user", "content": query}
+    # Cheap local classification first; the LLM only sees queries the rules aren't sure about
+    fast = None
+    if settings.fast_router_threshold <= 1.0:
+        fast = prerouter.pre_route(query, tz)
+        if fast["confidence"] >= settings.fast_router_threshold:
+            prerouter.record(True)
+            tracing.annotate(fast_path=True, confidence=fast["confidence"])
+            return fast
+        prerouter.record(False)
 
-    out = chat([system, user], temperature=0.0)
+    # The rules' city guess is usually right even when their intent isn't:
+    # start its geocode/forecast/POI fetches now so they overlap the LLM call
+    warm = None
+    if settings.router_prefetch:
+        warm = prefetch.start(fast or prerouter.pre_route(query, tz))
 
-    # Expect pure JSON from the LLM 
+    # Settle even when the LLM call fails, so an abandoned warm-up is discarded
+    city = ""
     try:
-        data = json.loads(out.strip())
-    except Exception:
-        # Minimal safe fallback 
-        data = {
-            "intent": "poi",
-            "city": "",
-            "days": 2,
-            "relative_date_phrase": query,
-            "poi_topic": "general",
-            "guide_topic": "none",
-        }
-
-    # City: if empty, try live geocode 
-    city = (data.get("city") or "").strip()
-    if not city:
+        system = {"role": "system", "content": router_system.SYSTEM_PROMPT}
+        user = {"role": "user", "content": query}
+
+        # Deterministic call: near-identical queries share one cached answer.
+        # Dates are still resolved below, so 'tomorrow' stays relative to today.
+        out = cached_chat([system, user], cache_text=query, validate=_is_json_object)
+
+        # Expect pure JSON from the LLM 
         try:
-            g = weather_tool.geocode_city(query)
-            city = g.get("name") or ""
+            data = json.loads(out.strip())
         except Exception:
-            city = ""
+            # Minimal safe fallback 
+            data = {
+                "intent": "poi",
+                "city": "",
+                "days": 2,
+                "relative_date_phrase": query,
+                "poi_topic": "general",
+                "guide_topic": "none",
+            }
+
+        # City: if empty, try live geocode 
+        city = (data.get("city") or "").strip()
+        if not city:
+            try:
+                g = weather_tool.geocode_city(query)
+                city = g.get("name") or ""
+            except Exception:
+                city = ""
+    finally:
+        if warm is not None:
+            warm.settle(city)
 
     # Days 
     try:
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app.tools import weather as weather_tool
+from app.utils.tracing import traced
 
 TOOLS = {
     "weather.search": lambda args: weather_tool.daily_summary(
@@ -8,6 +9,7 @@ TOOLS = {
 }
 
 
+@traced("agent.weather")
 def run(query: str, city: str, start_date: str, end_date: str):
     try:
         obs = TOOLS["weather.search"]({"city": city, "start_date": start_date, "end_date": end_date})
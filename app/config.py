@@ -12,6 +12,86 @@ class Settings:
     opentripmap_api_key: str = os.getenv("OPENTRIPMAP_API_KEY", "")
     app_tz: str = os.getenv("APP_TIMEZONE", "Asia/Kolkata")
 
+    # Groq client: process-wide quota, concurrency cap, per-call deadline and retries (0 disables a quota)
+    llm_rpm: float = float(os.getenv("LLM_RPM", "30"))
+    llm_tpm: float = float(os.getenv("LLM_TPM", "6000"))
+    llm_completion_tokens: int = int(os.getenv("LLM_COMPLETION_TOKENS", "300"))
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    llm_timeout_s: float = float(os.getenv("LLM_TIMEOUT_S", "60"))
+    llm_retries: int = int(os.getenv("LLM_RETRIES", "4"))
+    llm_backoff_s: float = float(os.getenv("LLM_BACKOFF_S", "1"))
+    llm_max_backoff_s: float = float(os.getenv("LLM_MAX_BACKOFF_S", "30"))
+
+    # Tracing: spans for route/agents/HTTP/LLM appended to TRACE_FILE ("jsonl" or "otlp")
+    trace_file: str = os.getenv("TRACE_FILE", "")
+    trace_format: str = os.getenv("TRACE_FORMAT", "jsonl").lower()
+
+    # Planner prompt: compact pipe-separated observations within a token budget
+    planner_compact_context: bool = os.getenv("PLANNER_COMPACT_CONTEXT", "1").lower() not in ("0", "false", "no")
+    planner_context_tokens: int = int(os.getenv("PLANNER_CONTEXT_TOKENS", "600"))
+    # The plan table is composed locally; with this on, the LLM rewrites the draft (fallback: the draft)
+    planner_llm_polish: bool = os.getenv("PLANNER_LLM_POLISH", "0").lower() in ("1", "true", "yes")
+
+    # Rule-based pre-router: confidence needed to skip the router LLM (>1 disables it)
+    fast_router_threshold: float = float(os.getenv("FAST_ROUTER_THRESHOLD", "0.8"))
+    # While the router LLM runs, warm the caches for the pre-router's guessed city (needs CACHE_ENABLED)
+    router_prefetch: bool = os.getenv("ROUTER_PREFETCH", "1").lower() not in ("0", "false", "no")
+    prefetch_workers: int = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+    # POI agent: "fast" (tools only, LLM just for empty results) or "react" (LLM picks tools)
+    poi_agent_mode: str = os.getenv("POI_AGENT_MODE", "fast").lower()
+    react_max_steps: int = int(os.getenv("REACT_MAX_STEPS", "3"))
+
+    # Local caches (SQLite files live under cache_dir)
+    cache_enabled: bool = os.getenv("CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+    cache_dir: str = os.path.expanduser(os.getenv("CACHE_DIR", "~/.cache/agentic-travel-planner"))
+    geocode_cache_ttl_s: float = float(os.getenv("GEOCODE_CACHE_TTL_S", str(30 * 24 * 3600)))
+    geocode_cache_max_entries: int = int(os.getenv("GEOCODE_CACHE_MAX_ENTRIES", "5000"))
+    poi_cache_fresh_s: float = float(os.getenv("POI_CACHE_FRESH_S", str(3 * 24 * 3600)))
+    poi_cache_stale_s: float = float(os.getenv("POI_CACHE_STALE_S", str(30 * 24 * 3600)))
+    poi_cache_memory_entries: int = int(os.getenv("POI_CACHE_MEMORY_ENTRIES", "512"))
+    poi_cache_max_entries: int = int(os.getenv("POI_CACHE_MAX_ENTRIES", "5000"))
+    forecast_cache_max_entries: int = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "20000"))
+    forecast_update_hours: float = float(os.getenv("FORECAST_UPDATE_HOURS", "6"))
+    forecast_update_lag_min: float = float(os.getenv("FORECAST_UPDATE_LAG_MIN", "30"))
+    forecast_coord_precision: int = int(os.getenv("FORECAST_COORD_PRECISION", "2"))
+    # daily_summary_many: locations per comma-separated Open-Meteo forecast request
+    forecast_batch_size: int = int(os.getenv("FORECAST_BATCH_SIZE", "50"))
+    llm_cache_ttl_s: float = float(os.getenv("LLM_CACHE_TTL_S", str(24 * 3600)))
+    llm_cache_max_entries: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+    llm_cache_persist: bool = os.getenv("LLM_CACHE_PERSIST", "0").lower() in ("1", "true", "yes")
+
+    # Local OSM extract (python -m app.tools.osm_local ingest ...) used instead of Overpass where it covers
+    osm_local_db: str = os.getenv("OSM_LOCAL_DB", "")
+    # Overpass: one all-topics query per point, at least this radius, capped per topic and element type
+    overpass_radius_m: int = int(os.getenv("OVERPASS_RADIUS_M", "20000"))
+    overpass_element_limit: int = int(os.getenv("OVERPASS_ELEMENT_LIMIT", "200"))
+
+    # Concurrency
+    planner_workers: int = int(os.getenv("PLANNER_WORKERS", "8"))
+    planner_branch_timeout_s: float = float(os.getenv("PLANNER_BRANCH_TIMEOUT_S", "60"))
+    poi_workers: int = int(os.getenv("POI_WORKERS", "16"))
+    poi_strategy_wave: int = int(os.getenv("POI_STRATEGY_WAVE", "3"))
+
+    # ASGI service (app/server.py)
+    server_host: str = os.getenv("SERVER_HOST", "127.0.0.1")
+    server_port: int = int(os.getenv("SERVER_PORT", "8000"))
+    server_max_concurrency: int = int(os.getenv("SERVER_MAX_CONCURRENCY", "64"))
+    # Workers still running past their request's deadline; at the cap new requests get 503
+    server_max_overrun: int = int(os.getenv("SERVER_MAX_OVERRUN", "16"))
+    server_request_timeout_s: float = float(os.getenv("SERVER_REQUEST_TIMEOUT_S", "90"))
+    server_max_body_bytes: int = int(os.getenv("SERVER_MAX_BODY_BYTES", "65536"))
+
+    # Shared HTTP transport (app/tools/transport.py)
+    http2: bool = os.getenv("HTTP2", "1").lower() not in ("0", "false", "no")
+    http_timeout_s: float = float(os.getenv("HTTP_TIMEOUT_S", "20"))
+    http_max_connections_per_host: int = int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10"))
+    http_keepalive_s: float = float(os.getenv("HTTP_KEEPALIVE_S", "60"))
+    http_retries: int = int(os.getenv("HTTP_RETRIES", "2"))
+    http_backoff_s: float = float(os.getenv("HTTP_BACKOFF_S", "0.5"))
+    http_max_backoff_s: float = float(os.getenv("HTTP_MAX_BACKOFF_S", "8"))
+    http_user_agent: str = os.getenv("HTTP_USER_AGENT", "agentic-travel-planner/1.0")
+
 settings = Settings()
 
 # ✅ Normalize timezone 
@@ -0,0 +1,128 @@
+# app/io/batch.py
+import json
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Deque, Dict, Iterator, Optional, Set, Tuple
+
+from ..pipeline import run_query
+
+_QUERY_FIELDS = ("query", "text", "prompt", "input")
+_ID_FIELDS = ("id", "request_id", "query_id")
+
+
+def iter_queries(path: str) -> Iterator[Tuple[str, Optional[str], Optional[str]]]:
+    """
+    Stream (id, query, parse_error) from a JSONL file.
+    A line may be an object ({"id": ..., "query": ...}) or a bare JSON string.
+    The id may also be named "request_id" or "query_id", and the query "text",
+    "prompt" or "input"; lines without an id get their 1-based line number.
+    """
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except Exception as e:
+                yield str(lineno), None, f"invalid JSON: {e}"
+                continue
+            if isinstance(rec, str):
+                yield str(lineno), rec, None
+                continue
+            if not isinstance(rec, dict):
+                yield str(lineno), None, "expected an object or a string"
+                continue
+            qid = next((str(rec[k]) for k in _ID_FIELDS if rec.get(k) is not None), str(lineno))
+            query = next((rec[k] for k in _QUERY_FIELDS if isinstance(rec.get(k), str) and rec[k].strip()), None)
+            yield qid, query, None if query else "no query field"
+
+
+def _done_ids(output_path: str) -> Set[str]:
+    """
+    Ids already written to `output_path`. A torn last line from an interrupted
+    run is cut off, so its query is redone and appended on a line of its own.
+    """
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        end = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                f.truncate(end)
+                break
+            end += len(line)
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except Exception:
+                continue
+    return done
+
+
+def _process(qid: str, query: str, agent: str, tz: Optional[str]) -> Dict[str, Any]:
+    return {"id": qid, **run_query(query, tz=tz, agent=agent)}
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    *,
+    concurrency: int = 4,
+    ordered: bool = True,
+    resume: bool = False,
+    agent: str = "auto",
+    tz: Optional[str] = None,
+    progress=None,
+) -> Dict[str, int]:
+    """
+    Replay every query in `input_path` and write one JSONL result per input.
+
+    - At most `concurrency` queries run at once and the input is read lazily.
+    - `ordered=False` writes results as they finish instead of in input order.
+    - The output file doubles as the checkpoint: with `resume=True`, ids already
+      in it are skipped and new results are appended.
+    """
+    skip = _done_ids(output_path) if resume else set()
+    counts = {"written": 0, "skipped": 0, "errors": 0}
+    max_in_flight = max(1, concurrency) * 2
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="batch-") as pool, \
+            open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+
+        def _write(rec: Dict[str, Any]) -> None:
+            out.write(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+            out.flush()
+            counts["written"] += 1
+            if rec.get("error"):
+                counts["errors"] += 1
+            if progress:
+                progress(rec)
+
+        pending: Deque[Future] = deque()
+
+        def _drain(block_until: int) -> None:
+            while len(pending) > block_until:
+                if ordered:
+                    _write(pending.popleft().result())
+                else:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for f in finished:
+                        pending.remove(f)
+                        _write(f.result())
+
+        for qid, query, error in iter_queries(input_path):
+            if qid in skip:
+                counts["skipped"] += 1
+                continue
+            if error:
+                f: Future = Future()
+                f.set_result({"id": qid, "query": query, "error": error})
+                pending.append(f)
+            else:
+                pending.append(pool.submit(_process, qid, query, agent, tz))
+            _drain(max_in_flight - 1)
+        _drain(0)
+
+    return counts
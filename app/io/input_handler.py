@@ -1,48 +1,57 @@
 # app/io/input_handler.py
-import re
 from rich.console import Console
-from ..agents.router import route
-from ..agents.weather_agent import run as weather_run
-from ..agents.poi_agent import run as poi_run
-from ..agents.planner_agent import run as planner_run
+from ..config import settings
+from ..pipeline import run_query
 
 console = Console()
 
-_HELP_TEXT = (
-    " Hey there! I can help you plan trips, find restaurants, or explore tourist spots.\n"
-    "Try asking something like:\n\n"
-    "best restaurants in Delhi\n\n"
-    "plan a 3-day trip to Kashmir\n\n"
-    "nature spots near Ooty\n"
-)
 
-_GREET_WORDS = {"hi", "hello", "hey", "yo", "sup", "thanks", "thank", "thank you", "ok", "okay"}
-_TRAVEL_HINTS = (
-    "plan", "trip", "itinerary", "travel", "tour", "stay", "hotel", "flight", "train", "bus",
-    "weather", "rain", "temperature", "attraction", "attractions", "restaurant", "food",
-    "nature", "places", "place", "poi"
-)
+class StreamPrinter:
+    """`on_token` callback that writes deltas straight to the console as they arrive."""
 
-def _is_chitchat(text: str) -> bool:
-    t = (text or "").strip().lower()
-    if not t:
-        return True
-    words = re.findall(r"[a-zA-Z]+", t)
-    if any(w in _GREET_WORDS for w in words):
-        # allow genuine travel queries that happen to include a greeting
-        if any(h in t for h in _TRAVEL_HINTS):
-            return False
-        return True
-    if len(words) <= 3 and not any(h in t for h in _TRAVEL_HINTS):
-        return True
-    return False
+    def __init__(self, out: Console):
+        self.out = out
+        self.started = False
+        self._last = ""
+
+    def __call__(self, delta: str) -> None:
+        self.started = True
+        self._last = delta or self._last
+        self.out.file.write(delta)
+        self.out.file.flush()
+
+    def finish(self, final: str) -> None:
+        """Print `final` only if nothing was streamed; otherwise just end the line."""
+        if not self.started:
+            self.out.print(final)
+        elif not self._last.endswith("\n"):
+            self.out.file.write("\n")
+            self.out.file.flush()
+
+_JSON_TITLES = {"weather": "Weather JSON", "poi": "POIs JSON", "plan": "Planner Context JSON"}
+
+
+def answer(user_input: str, agent: str, print_json, show_route: bool) -> None:
+    """Answer one query through `run_query`, streaming LLM output as it arrives."""
+    printer = StreamPrinter(console)
+
+    def _banner(intent, r):
+        if show_route:
+            console.print(f"[bold]Routed to:[/bold] {intent} • city={r['city']} • dates={r.get('start_date')}→{r.get('end_date')}")
+
+    result = run_query(user_input, tz=settings.app_tz, agent=agent, on_route=_banner, on_token=printer)
+    if result["error"]:
+        console.print(f"[red]Error:[/red] {result['error']}")
+        return
+    printer.finish(result["final"])
+    if print_json and result["intent"] in _JSON_TITLES:
+        print_json(_JSON_TITLES[result["intent"]], result["observations"] or {})
 
 
 def interactive_loop(default_agent: str, print_json, show_route: bool):
     """
-    Simple REPL for interactive usage. Minimal chitchat handling:
-    - If user input is greeting/random, print helper and continue.
-    - If router returns no/invalid intent, print helper and continue.
+    Simple REPL for interactive usage. Greetings, random input and queries the
+    router cannot place get the help text.
     """
     while True:
         try:
@@ -53,54 +62,4 @@ def interactive_loop(default_agent: str, print_json, show_route: bool):
 
         if not user_input:
             continue
-
-        # 🔹 Short-circuit greetings 
-        if _is_chitchat(user_input):
-            console.print(_HELP_TEXT)
-            continue
-
-        # Route the request
-        from ..config import settings
-        r = route(user_input, settings.app_tz)
-
-        # 🔹 If router couldn't confidently pick an agent, show helper
-        if not r.get("intent") or r.get("intent") not in ["weather", "poi", "plan"]:
-            console.print(_HELP_TEXT)
-            continue
-
-        intent = r["intent"]
-        city = r.get("city") or "Delhi"
-        start_date = r.get("start_date")
-        end_date = r.get("end_date")
-
-        # Only show the banner if dates are resolved and user wants it
-        if show_route:
-            console.print(
-                f"[dim]Routed to: {intent} • city={city} • dates={start_date}→{end_date}[/dim]"
-            )
-
-        # Execute agent
-        if intent == "weather":
-            final, obs = weather_run(user_input, city, start_date, end_date)
-            console.print(final)
-            print_json and print_json("Weather JSON", obs or {})
-
-        elif intent == "poi":
-            final, obs = poi_run(user_input, city, topic=r.get("poi_topic"))
-            console.print(final)
-            print_json and print_json("POIs JSON", obs or {})
-
-        else:  
-            final, ctx = planner_run(
-                user_input,
-                city,
-                start_date,
-                end_date,
-                r.get("days", 2),
-                budget_amount=r.get("budget_amount"),
-                budget_currency=r.get("budget_currency"),
-                budget_mode=r.get("budget_mode", False),
-                poi_topic=r.get("poi_topic"),
-            )
-            console.print(final)
-            print_json and print_json("Planner Context JSON", ctx or {})
+        answer(user_input, default_agent, print_json, show_route)
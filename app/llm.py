@@ -1,23 +1,338 @@
-from groq import Groq
+import asyncio
+import hashlib
+import os
+import random
+import threading
+import time
+import unicodedata
+import weakref
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, Optional
+
 from .config import settings
+from .utils import tracing
+from .utils.cache import LRUCache, SQLiteCache
+from .utils.ratelimit import RateLimiter
+from .utils.tokens import estimate_tokens
+
+if TYPE_CHECKING:  # imported on the first LLM call instead, see _sdk()
+    import groq
+
+_client: "Optional[groq.Groq]" = None
+_http_transport = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, groq.AsyncGroq]" = weakref.WeakKeyDictionary()
+_async_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+# Shared by sync and async callers so the whole process stays under the Groq quota
+_limiter = RateLimiter(settings.llm_rpm, settings.llm_tpm)
+_slots = threading.BoundedSemaphore(max(1, settings.llm_max_concurrency))
+_stats = {"calls": 0, "retries": 0, "rate_limited": 0, "wait_s": 0.0}
+_stats_lock = threading.Lock()
+
+def _api_key() -> str:
+    if not settings.groq_api_key:
+        raise RuntimeError("GROQ_API_KEY missing. Set it in .env")
+    return settings.groq_api_key
 
-_client = None
+def _sdk():
+    # The Groq SDK (with httpx and pydantic) is most of the CLI's import time, so it
+    # loads on the first LLM call rather than with this module
+    import groq
 
-def get_client():
+    return groq
+
+def get_client() -> "groq.Groq":
     global _client
     if _client is None:
-        if not settings.groq_api_key:
-            raise RuntimeError("GROQ_API_KEY missing. Set it in .env")
-        _client = Groq(api_key=settings.groq_api_key)
+        import httpx
+
+        # Retries are ours (quota-aware); the SDK's own would bypass the limiter
+        http_client = httpx.Client(transport=_http_transport) if _http_transport is not None else None
+        _client = _sdk().Groq(api_key=_api_key(), max_retries=0, timeout=settings.llm_timeout_s, http_client=http_client)
     return _client
 
-def chat(messages, temperature=0.2, model=None):
+def get_async_client() -> "groq.AsyncGroq":
+    # AsyncGroq holds an httpx.AsyncClient, which is bound to the loop that created it
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+
+        http_client = httpx.AsyncClient(transport=_http_transport) if _http_transport is not None else None
+        client = _sdk().AsyncGroq(api_key=_api_key(), max_retries=0, timeout=settings.llm_timeout_s, http_client=http_client)
+        _async_clients[loop] = client
+        _async_slots[loop] = asyncio.Semaphore(max(1, settings.llm_max_concurrency))
+    return client
+
+def use_transport(transport) -> None:
+    """Send Groq calls through an httpx transport (e.g. recorded fixtures); None restores the network."""
+    global _client, _http_transport
+    _client = None
+    _async_clients.clear()
+    _async_slots.clear()
+    _http_transport = transport
+
+def _count(key: str, amount: float = 1) -> None:
+    with _stats_lock:
+        _stats[key] += amount
+
+def _estimate(messages) -> int:
+    prompt = sum(estimate_tokens(m.get("content") or "") + 4 for m in messages)
+    return prompt + settings.llm_completion_tokens
+
+def _retry_delay(attempt: int, error: Exception) -> Optional[float]:
+    """Seconds to wait before retrying `error`, or None if it is not worth retrying."""
+    groq = _sdk()
+    if isinstance(error, groq.APIStatusError):
+        if error.status_code != 429 and error.status_code < 500:
+            return None
+        retry_after = error.response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.llm_max_backoff_s)
+            except ValueError:
+                pass
+    elif not isinstance(error, groq.APIConnectionError):  # includes APITimeoutError
+        return None
+    backoff = min(settings.llm_backoff_s * (2 ** attempt), settings.llm_max_backoff_s)
+    return backoff * (0.5 + random.random() / 2)
+
+def _remaining(deadline: float, timeout: float) -> float:
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise TimeoutError(f"LLM call exceeded its {timeout:g}s deadline")
+    return left
+
+def _reserve(deadline: float, timeout: float, cost: int) -> float:
+    """Reserve quota for one attempt and return the wait; give it back if the wait would blow the deadline."""
+    wait = _limiter.reserve(cost)
+    if wait > deadline - time.monotonic():
+        _limiter.refund(cost)
+        raise TimeoutError(f"LLM quota wait of {wait:.1f}s exceeds the {timeout:g}s deadline")
+    _count("wait_s", wait)
+    return wait
+
+def _no_slot(timeout: float, cost: int) -> TimeoutError:
+    """The attempt never got a concurrency slot: hand back its quota and give up."""
+    _limiter.refund(cost)
+    return TimeoutError(f"no free LLM slot within the {timeout:g}s deadline")
+
+def _on_error(attempt: int, error: Exception, cost: int) -> float:
+    """Bookkeeping for a failed attempt; returns the retry delay or re-raises."""
+    delay = _retry_delay(attempt, error)
+    if isinstance(error, _sdk().RateLimitError):
+        _count("rate_limited")
+        if delay is not None:
+            _limiter.pause(delay)  # everyone backs off, not just this caller
+    else:
+        _limiter.settle(cost, 0)  # the attempt never reached the model
+    if delay is None or attempt >= settings.llm_retries:
+        raise error
+    _count("retries")
+    return delay
+
+def _settle(resp, cost: int, sp) -> None:
+    usage = getattr(resp, "usage", None)
+    if usage is not None and getattr(usage, "total_tokens", None):
+        _limiter.settle(cost, usage.total_tokens)
+        sp.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
+
+def _create(messages, temperature, model, timeout, **extra):
+    """One completion request with quota admission, concurrency cap, deadline and retries."""
     client = get_client()
+    groq = _sdk()
+    timeout = timeout or settings.llm_timeout_s
+    deadline = time.monotonic() + timeout
+    cost = _estimate(messages)
     model = model or settings.llm_model
-    resp = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-        response_format={"type":"text"},
-    )
+    with tracing.span("llm.chat", model=model, stream=bool(extra.get("stream")), est_tokens=cost) as sp:
+        for attempt in range(settings.llm_retries + 1):
+            time.sleep(_reserve(deadline, timeout, cost))
+            sp.set(attempts=attempt + 1)
+            if not _slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                raise _no_slot(timeout, cost)
+            release = True
+            try:
+                _count("calls")
+                resp = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    response_format={"type":"text"},
+                    timeout=_remaining(deadline, timeout),
+                    **extra,
+                )
+            except (groq.APIStatusError, groq.APIConnectionError) as e:
+                delay = _on_error(attempt, e, cost)
+            else:
+                if extra.get("stream"):
+                    release = False  # an open stream keeps its slot; chat_stream releases it
+                else:
+                    _settle(resp, cost, sp)
+                return resp
+            finally:
+                if release:
+                    _slots.release()
+            time.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+    raise RuntimeError("unreachable")
+
+def chat(messages, temperature=0.2, model=None, timeout: Optional[float] = None):
+    """
+    One chat completion. Rate limits (429), 5xx and connection errors are retried
+    with jittered backoff (Retry-After wins); `timeout` bounds the whole call,
+    including quota waits and retries (default LLM_TIMEOUT_S).
+    """
+    resp = _create(messages, temperature, model, timeout)
     return resp.choices[0].message.content.strip()
+
+def chat_stream(messages, temperature=0.2, model=None, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Like `chat`, but yields content deltas as Groq generates them. Only opening
+    the stream is retried. The concurrency slot is held until the stream is
+    exhausted or the generator is closed.
+    """
+    stream = _create(messages, temperature, model, timeout, stream=True)
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    finally:
+        try:
+            close = getattr(stream, "close", None)
+            if close:
+                close()  # abandoned early: drop the connection instead of draining it
+        finally:
+            _slots.release()
+
+async def chat_async(messages, temperature=0.2, model=None, timeout: Optional[float] = None):
+    """Async twin of `chat`; shares the process-wide quota with sync callers."""
+    client = get_async_client()
+    groq = _sdk()
+    slots = _async_slots[asyncio.get_running_loop()]
+    timeout = timeout or settings.llm_timeout_s
+    deadline = time.monotonic() + timeout
+    cost = _estimate(messages)
+    model = model or settings.llm_model
+    with tracing.span("llm.chat", model=model, stream=False, est_tokens=cost) as sp:
+        for attempt in range(settings.llm_retries + 1):
+            await asyncio.sleep(_reserve(deadline, timeout, cost))
+            sp.set(attempts=attempt + 1)
+            try:
+                await asyncio.wait_for(slots.acquire(), max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                raise _no_slot(timeout, cost) from None
+            try:
+                _count("calls")
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    response_format={"type":"text"},
+                    timeout=_remaining(deadline, timeout),
+                )
+            except (groq.APIStatusError, groq.APIConnectionError) as e:
+                delay = _on_error(attempt, e, cost)
+            else:
+                _settle(resp, cost, sp)
+                return resp.choices[0].message.content.strip()
+            finally:
+                slots.release()
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+    raise RuntimeError("unreachable")
+
+def stats() -> Dict[str, float]:
+    with _stats_lock:
+        out = dict(_stats)
+    out["wait_s"] = round(out["wait_s"], 2)
+    return out
+
+
+# Response cache for deterministic (temperature=0) calls
+
+_ARTICLES = {"a", "an", "the", "please"}
+_memory_cache: Optional[LRUCache] = None
+_disk_cache: Optional[SQLiteCache] = None
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+
+def normalize_query(text: str) -> str:
+    """
+    'Plan a 3-day trip to goa!' and 'plan 3 day trip to Goa' normalize to the same
+    key text. Words in any script count ('Zürich', 'दिल्ली'); punctuation does not.
+    """
+    # Letters, marks and digits of any script. `\w` alone would split Devanagari
+    # words at their vowel signs, which are marks, not letters.
+    kept = "".join(c if unicodedata.category(c)[0] in "LMN" else " " for c in (text or "").casefold())
+    words = kept.split()
+    return " ".join(w for w in words if w not in _ARTICLES)
+
+def _caches():
+    global _memory_cache, _disk_cache
+    if _memory_cache is None:
+        with _cache_lock:
+            if _memory_cache is None:
+                if settings.llm_cache_persist and settings.cache_enabled:
+                    _disk_cache = SQLiteCache(
+                        os.path.join(settings.cache_dir, "llm.sqlite3"),
+                        table="responses",
+                        ttl=settings.llm_cache_ttl_s,
+                        max_entries=settings.llm_cache_max_entries,
+                    )
+                _memory_cache = LRUCache(settings.llm_cache_max_entries, ttl=settings.llm_cache_ttl_s)
+    return _memory_cache, _disk_cache
+
+def _cache_key(messages, model: str, cache_text: str) -> str:
+    system = "\n".join(m["content"] for m in messages if m.get("role") == "system")
+    system_hash = hashlib.sha256(system.encode("utf-8")).hexdigest()[:16]
+    return hashlib.sha256(f"{model}\0{system_hash}\0{normalize_query(cache_text)}".encode("utf-8")).hexdigest()
+
+def cached_chat(
+    messages,
+    *,
+    cache_text: str,
+    model=None,
+    validate: Optional[Callable[[str], bool]] = None,
+):
+    """
+    `chat` at temperature 0 behind a response cache keyed by
+    (model, system-prompt hash, normalized `cache_text`).
+    Only outputs that pass `validate` are stored.
+    """
+    model = model or settings.llm_model
+    # Nothing to key on (only punctuation/emoji): such queries must not share an entry
+    if settings.llm_cache_max_entries <= 0 or not normalize_query(cache_text):
+        return chat(messages, temperature=0.0, model=model)
+
+    memory, disk = _caches()
+    key = _cache_key(messages, model, cache_text)
+    out = memory.get(key)
+    if out is None and disk is not None:
+        try:
+            out = disk.get(key)
+        except Exception:
+            out = None
+        if out is not None:
+            memory.set(key, out)
+    tracing.annotate(llm_cache_hit=out is not None)
+    with _cache_lock:
+        _cache_stats["hits" if out is not None else "misses"] += 1
+    if out is not None:
+        return out
+
+    out = chat(messages, temperature=0.0, model=model)
+    if validate is None or validate(out):
+        memory.set(key, out)
+        if disk is not None:
+            try:
+                disk.set(key, out)
+            except Exception:
+                pass
+    return out
+
+def cache_stats():
+    with _cache_lock:
+        hits, misses = _cache_stats["hits"], _cache_stats["misses"]
+    total = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": (hits / total) if total else 0.0}
@@ -0,0 +1,148 @@
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .config import settings
+from .utils import date_utils, tracing
+
+# Agents (and through them the Groq SDK and httpx) are imported where they run,
+# so HELP_TEXT / is_chitchat stay cheap to import for the CLI
+
+#  Minimal helper & detection
+
+HELP_TEXT = (
+    "👋 Hey there! I can help you plan trips, find restaurants, or explore tourist spots.\n"
+    "Try asking something like:\n\n"
+    "best restaurants in Delhi\n\n"
+    "plan a 3-day trip to Kashmir\n\n"
+    "nature spots near Ooty\n"
+)
+
+_GREET_WORDS = ("hi", "hello", "hey", "yo", "sup", "thanks", "thank you", "ok", "okay")
+_TRAVEL_HINTS = (
+    "plan", "trip", "itinerary", "travel", "tour", "stay", "hotel", "flight", "train", "bus",
+    "weather", "rain", "temperature", "attraction", "attractions", "restaurant", "food",
+    "nature", "places", "place", "poi"
+)
+
+VALID_INTENTS = ("weather", "poi", "plan")
+
+
+def is_chitchat(text: str) -> bool:
+    t = (text or "").strip().lower()
+    if not t:
+        return True
+    words = re.findall(r"[a-zA-Z]+", t)
+    # greetings
+    if any(w in _GREET_WORDS for w in words):
+        # but allow travel queries even if they start with hello
+        if any(h in t for h in _TRAVEL_HINTS):
+            return False
+        return True
+    # very short messages
+    if len(words) <= 3 and not any(h in t for h in _TRAVEL_HINTS):
+        return True
+    return False
+
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 1)
+
+
+def _route(query: str, tz: str, agent: str, hints: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Router output with caller hints applied; a forced agent plus a city skips the router entirely."""
+    hints = {k: v for k, v in (hints or {}).items() if v not in (None, "")}
+    if agent != "auto" and hints.get("city"):
+        days = max(1, int(hints.get("days") or 2))
+        start, end = date_utils.resolve_dates(query, tz_name=tz, default_days=days)
+        r = {
+            "intent": agent, "city": "", "start_date": start, "end_date": end,
+            "days": days, "poi_topic": "general", "guide_topic": "none",
+        }
+    else:
+        from .agents.router import route
+
+        r = route(query, tz)
+    r.update(hints)
+    return r
+
+
+def run_query(
+    query: str,
+    tz: Optional[str] = None,
+    agent: str = "auto",
+    hints: Optional[Dict[str, Any]] = None,
+    on_route: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    on_token: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Route one query and run the chosen agent; the CLI, REPL, batch mode and
+    server all answer through here.
+    `hints` (city, start_date, end_date, days, poi_topic) override router fields.
+    `on_route(intent, route)` fires before the agent runs, and `on_token`
+    receives the POI/planner LLM output as it streams.
+
+    Returns {"query", "intent", "route", "final", "observations", "timings", "error"}.
+    Agent failures are captured in "error" instead of raised. With TRACE_FILE
+    set, the spans are exported and the result also carries "trace_id".
+    """
+    tz = tz or settings.app_tz
+    t0 = time.perf_counter()
+    out: Dict[str, Any] = {
+        "query": query, "intent": None, "route": None, "final": None,
+        "observations": None, "timings": {}, "error": None,
+    }
+
+    with tracing.trace("query", agent=agent) as tr:
+        if tr is not None:
+            out["trace_id"] = tr.trace_id
+        try:
+            if agent == "auto" and is_chitchat(query):
+                out.update(intent="chitchat", final=HELP_TEXT)
+                return out
+
+            t = time.perf_counter()
+            r = _route(query, tz, agent, hints)
+            out["timings"]["route_ms"] = _ms(t)
+            out["route"] = r
+
+            intent = r.get("intent") if agent == "auto" else agent
+            if intent not in VALID_INTENTS:
+                out.update(intent="help", final=HELP_TEXT)
+                return out
+            out["intent"] = intent
+            city = r.get("city") or "Delhi"
+            if on_route:
+                on_route(intent, {**r, "city": city})
+
+            t = time.perf_counter()
+            if intent == "weather":
+                from .agents.weather_agent import run as weather_run
+
+                final, obs = weather_run(query, city, r["start_date"], r["end_date"])
+            elif intent == "poi":
+                from .agents.poi_agent import run as poi_run
+
+                final, obs = poi_run(query, city, topic=r.get("poi_topic"), on_token=on_token)
+            else:
+                from .agents.planner_agent import run as planner_run
+
+                final, obs = planner_run(
+                    query,
+                    city,
+                    r["start_date"],
+                    r["end_date"],
+                    r.get("days", 2),
+                    budget_amount=r.get("budget_amount"),
+                    budget_currency=r.get("budget_currency"),
+                    budget_mode=r.get("budget_mode", False),
+                    poi_topic=r.get("poi_topic"),
+                    on_token=on_token,
+                )
+            out["timings"]["agent_ms"] = _ms(t)
+            out.update(final=final, observations=obs)
+        except Exception as e:
+            out["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            out["timings"]["total_ms"] = _ms(t0)
+    return out
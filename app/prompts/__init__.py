@@ -2,11 +2,22 @@ from pathlib import Path
 
 SYSTEMS = Path(__file__).parent
 
-class router_system:
-    SYSTEM_PROMPT = (SYSTEMS / "router_system.md").read_text(encoding="utf-8")
 
-class react_agent:
-    REACT_PROMPT = (SYSTEMS / "react_agent.md").read_text(encoding="utf-8")
+class _Prompt:
+    """Exposes one prompt file as attribute `attr`, read on first access rather than at import."""
 
-class planner_system:
-    SYSTEM_PROMPT = (SYSTEMS / "planner_system.md").read_text(encoding="utf-8")
+    def __init__(self, filename: str, attr: str):
+        self._path = SYSTEMS / filename
+        self._attr = attr
+
+    def __getattr__(self, name: str) -> str:
+        if name != self._attr:
+            raise AttributeError(name)
+        text = self._path.read_text(encoding="utf-8")
+        setattr(self, name, text)
+        return text
+
+
+router_system = _Prompt("router_system.md", "SYSTEM_PROMPT")
+react_agent = _Prompt("react_agent.md", "REACT_PROMPT")
+planner_system = _Prompt("planner_system.md", "SYSTEM_PROMPT")
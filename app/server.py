@@ -0,0 +1,196 @@
+"""
+Minimal ASGI service.
+
+    POST /route   {"query"}                                   -> router output
+    POST /query   {"query", ...hints}                         -> auto-routed answer
+    POST /weather {"query", "city"?, "start_date"?, "end_date"?}
+    POST /poi     {"query", "city"?, "poi_topic"?}
+    POST /plan    {"query", "city"?, "start_date"?, "end_date"?, "days"?}
+    GET  /healthz, GET /stats
+
+Run with `python -m app.server` (uvicorn) or any ASGI server: `uvicorn app.server:app`.
+Agents and tools run on worker threads; the pooled HTTP clients, thread pools and
+caches are module-level, so they stay warm across requests in one process.
+
+A request that passes its deadline gets 504 and frees its limiter slot, but its
+worker thread cannot be interrupted and runs on. The pool has SERVER_MAX_OVERRUN
+threads on top of SERVER_MAX_CONCURRENCY for such workers. While that many are
+still running, new requests get 503 instead of queueing behind them.
+"""
+import asyncio
+import json
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Dict, Optional, Tuple
+
+from .config import settings
+from .agents import prefetch, prerouter
+from .agents.router import route
+from .llm import cache_stats as llm_cache_stats, stats as llm_stats
+from .pipeline import run_query
+from .tools import transport
+from .utils.concurrency import get_pool
+
+_HINT_FIELDS = ("city", "start_date", "end_date", "days", "poi_topic")
+_AGENT_PATHS = {"/query": "auto", "/weather": "weather", "/poi": "poi", "/plan": "plan"}
+
+_limiter: Optional[asyncio.Semaphore] = None
+_overrun = 0  # timed-out requests whose worker thread is still running
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _get_limiter() -> asyncio.Semaphore:
+    global _limiter
+    if _limiter is None:
+        _limiter = asyncio.Semaphore(settings.server_max_concurrency)
+    return _limiter
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > settings.server_max_body_bytes:
+            raise HTTPError(413, "request body too large")
+        if not message.get("more_body"):
+            break
+    if not body:
+        return {}
+    try:
+        data = json.loads(body)
+    except Exception:
+        raise HTTPError(400, "body must be JSON")
+    if not isinstance(data, dict):
+        raise HTTPError(400, "body must be a JSON object")
+    return data
+
+
+async def _send_json(send, status: int, payload: Any) -> None:
+    body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+def _deadline(data: Dict[str, Any]) -> float:
+    try:
+        requested = float(data.get("timeout_s") or settings.server_request_timeout_s)
+    except (TypeError, ValueError):
+        requested = settings.server_request_timeout_s
+    return max(1.0, min(requested, settings.server_request_timeout_s))
+
+
+def _overrun_done(_: Future) -> None:
+    global _overrun
+    _overrun -= 1
+
+
+async def _run_blocking(fn, *args, deadline: float, **kwargs):
+    """
+    Run a sync agent call on a worker thread, bounded by the service limiter and
+    a deadline that covers the wait for a slot too.
+    """
+    global _overrun
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    limiter = _get_limiter()
+    try:
+        await asyncio.wait_for(limiter.acquire(), timeout=deadline)
+    except asyncio.TimeoutError:
+        raise HTTPError(504, f"deadline of {deadline:g}s exceeded waiting for a worker")
+    try:
+        if _overrun >= settings.server_max_overrun:
+            raise HTTPError(503, "server busy: too many requests still running past their deadline")
+        pool = get_pool("server", settings.server_max_concurrency + settings.server_max_overrun)
+        work = pool.submit(partial(fn, *args, **kwargs))
+        try:
+            left = max(0.0, deadline - (loop.time() - start))
+            return await asyncio.wait_for(asyncio.wrap_future(work), timeout=left)
+        except asyncio.TimeoutError:
+            # A queued call was cancelled with the wrapper. A running thread cannot be
+            # stopped: it finishes in an overrun slot and its result still lands in
+            # the caches. The limiter slot is freed now either way.
+            if not work.done():
+                _overrun += 1
+                work.add_done_callback(lambda f: loop.call_soon_threadsafe(_overrun_done, f))
+            raise HTTPError(504, f"deadline of {deadline:g}s exceeded")
+    finally:
+        limiter.release()
+
+
+async def _handle(method: str, path: str, receive) -> Tuple[int, Any]:
+    if path == "/healthz":
+        return 200, {"ok": True}
+    if path == "/stats":
+        return 200, {
+            "prerouter": prerouter.stats(), "router_llm_cache": llm_cache_stats(),
+            "llm": llm_stats(), "http_coalesced": transport.coalesced_count(), "prefetch": prefetch.stats(),
+            "server_overrun": _overrun,
+        }
+    if path != "/route" and path not in _AGENT_PATHS:
+        raise HTTPError(404, "not found")
+    if method != "POST":
+        raise HTTPError(405, "use POST")
+
+    data = await _read_json(receive)
+    query = data.get("query")
+    if not isinstance(query, str) or not query.strip():
+        raise HTTPError(400, "'query' is required")
+    tz = data.get("tz") or settings.app_tz
+    deadline = _deadline(data)
+
+    if path == "/route":
+        return 200, await _run_blocking(route, query, tz, deadline=deadline)
+
+    hints = {k: data[k] for k in _HINT_FIELDS if data.get(k) not in (None, "")}
+    if "days" in hints:
+        try:
+            hints["days"] = max(1, int(hints["days"]))
+        except (TypeError, ValueError):
+            raise HTTPError(400, "'days' must be an integer")
+    result = await _run_blocking(run_query, query, tz=tz, agent=_AGENT_PATHS[path], hints=hints, deadline=deadline)
+    return (502 if result.get("error") else 200), result
+
+
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                transport.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    try:
+        status, payload = await _handle(scope["method"], scope["path"], receive)
+    except HTTPError as e:
+        status, payload = e.status, {"error": e.message}
+    except Exception as e:
+        status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+    await _send_json(send, status, payload)
+
+
+def main():
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("uvicorn is required to serve: pip install uvicorn")
+    uvicorn.run(app, host=settings.server_host, port=settings.server_port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from ..config import settings
+from ..utils import tracing
+from ..utils.cache import SQLiteCache, normalize_key
+
+_store: Optional[SQLiteCache] = None
+_store_lock = threading.Lock()
+
+
+def _get_store() -> Optional[SQLiteCache]:
+    global _store
+    if not settings.cache_enabled:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteCache(
+                    os.path.join(settings.cache_dir, "geocode.sqlite3"),
+                    table="geocode",
+                    ttl=settings.geocode_cache_ttl_s,
+                    max_entries=settings.geocode_cache_max_entries,
+                )
+    return _store
+
+
+def get(source: str, city: str) -> Optional[Dict[str, Any]]:
+    """
+    Cached geocode for `city` from `source` ('open-meteo', 'otm', 'geoname').
+    Cache problems never break geocoding; they just count as a miss.
+    """
+    store = _get_store()
+    if store is None:
+        return None
+    with tracing.span("cache.geocode", source=source) as sp:
+        try:
+            value = store.get(f"{source}:{normalize_key(city)}")
+        except Exception:
+            value = None
+        sp.set(hit=value is not None)
+        return value
+
+
+def put(source: str, city: str, value: Dict[str, Any]) -> None:
+    store = _get_store()
+    if store is None:
+        return
+    try:
+        store.set(f"{source}:{normalize_key(city)}", value)
+    except Exception:
+        pass
@@ -0,0 +1,227 @@
+"""
+Local OSM POI engine: an optional stand-in for the public Overpass endpoint.
+
+An OSM extract (GeoJSON, or .osm.pbf with the optional `osmium` package) is
+ingested once into a SQLite file with an R-tree index. Only elements matching
+a POI topic are kept, one row per element (ways become their centroid), with
+a bitmask of the topics they belong to.
+
+    python -m app.tools.osm_local ingest india-latest.osm.pbf --db ~/osm/india.sqlite3
+
+Then set OSM_LOCAL_DB to that file. poi.py answers `around:` queries from it
+for points inside the extract and still goes to Overpass for points outside.
+Results are Overpass-shaped elements ({"type", "id", "lat", "lon", "tags"}),
+so the existing parsers produce the same item dicts.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.geo import bbox, haversine_m
+from .osm_tags import TOPIC_BITS, topic_mask
+
+_BATCH = 5000
+
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+_conn_lock = threading.Lock()
+_bbox: Optional[Tuple[float, float, float, float]] = None
+
+
+def _connect(path: str, create: bool = False) -> sqlite3.Connection:
+    db = sqlite3.connect(path, check_same_thread=False)
+    if create:
+        db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pois (
+                id INTEGER PRIMARY KEY, osm_type TEXT, osm_id INTEGER,
+                lat REAL NOT NULL, lon REAL NOT NULL, topics INTEGER NOT NULL, tags TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS pois_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            """
+        )
+    return db
+
+
+def _store() -> Optional[sqlite3.Connection]:
+    global _conn, _conn_path, _bbox
+    path = os.path.expanduser(settings.osm_local_db) if settings.osm_local_db else ""
+    if not path or not os.path.exists(path):
+        return None
+    if _conn is None or _conn_path != path:
+        with _conn_lock:
+            if _conn is None or _conn_path != path:
+                db = _connect(path)
+                row = db.execute("SELECT value FROM meta WHERE key = 'bbox'").fetchone()
+                _bbox = tuple(json.loads(row[0])) if row else None
+                _conn, _conn_path = db, path
+    return _conn
+
+
+def covers(lat: float, lon: float) -> bool:
+    """True if a local extract is configured and (lat, lon) lies inside it."""
+    if _store() is None or _bbox is None:
+        return False
+    min_lat, max_lat, min_lon, max_lon = _bbox
+    return min_lat <= lat <= max_lat and min_lon <= lon <= max_lon
+
+
+def query(lat: float, lon: float, radius_m: float, topic: str = "general", limit: int = 200) -> List[Dict[str, Any]]:
+    """
+    Elements of `topic` ('restaurants', 'nature', 'general', 'foods') within
+    `radius_m` of (lat, lon), nearest first, at most `limit`.
+    """
+    db = _store()
+    if db is None:
+        return []
+    bit = TOPIC_BITS.get(topic, TOPIC_BITS["general"])
+    with _conn_lock:
+        rows = db.execute(
+            """
+            SELECT p.osm_type, p.osm_id, p.lat, p.lon, p.tags
+            FROM pois_rtree r JOIN pois p ON p.id = r.id
+            WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ?
+              AND (p.topics & ?) != 0
+            """,
+            (*bbox(lat, lon, radius_m), bit),
+        ).fetchall()
+    hits = []
+    for row in rows:
+        d = haversine_m(lat, lon, row[2], row[3])
+        if d <= radius_m:
+            hits.append((d, row))
+    hits.sort(key=lambda h: h[0])
+    # Tags are decoded only for the rows actually returned
+    return [
+        {"type": osm_type, "id": osm_id, "lat": plat, "lon": plon, "tags": json.loads(tags)}
+        for _, (osm_type, osm_id, plat, plon, tags) in hits[:limit]
+    ]
+
+
+# Ingestion
+
+def _centroid(geometry: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of a GeoJSON geometry: the point itself, else the mean of its vertices."""
+    coords = geometry.get("coordinates") if geometry else None
+    if coords is None:
+        return None
+    if geometry.get("type") == "Point":
+        return float(coords[1]), float(coords[0])
+    flat: List[Tuple[float, float]] = []
+
+    def _walk(c: Any) -> None:
+        if c and isinstance(c[0], (int, float)):
+            flat.append((float(c[1]), float(c[0])))
+        else:
+            for part in c:
+                _walk(part)
+
+    _walk(coords)
+    if not flat:
+        return None
+    return sum(p[0] for p in flat) / len(flat), sum(p[1] for p in flat) / len(flat)
+
+
+def _geojson_elements(path: str) -> Iterator[Tuple[str, int, float, float, Dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for i, feat in enumerate(data.get("features", [])):
+        props = feat.get("properties") or {}
+        tags = props.get("tags") if isinstance(props.get("tags"), dict) else props
+        point = _centroid(feat.get("geometry") or {})
+        if point is None:
+            continue
+        # osmtogeojson ids look like "node/123"; other exporters put the type in properties
+        raw_id = str(feat.get("id") or props.get("@id") or props.get("id") or i)
+        osm_type, _, num = raw_id.rpartition("/")
+        try:
+            osm_id = int(num)
+        except ValueError:
+            osm_id = i
+        tags = {k: v for k, v in tags.items() if not str(k).startswith("@") and k not in ("id", "tags")}
+        yield osm_type or props.get("type", "node"), osm_id, point[0], point[1], tags
+
+
+def _pbf_elements(path: str) -> Iterator[Tuple[str, int, float, float, Dict[str, Any]]]:
+    try:
+        import osmium
+    except ImportError:
+        raise RuntimeError("Reading .pbf extracts needs the optional osmium package: pip install osmium")
+
+    out: List[Tuple[str, int, float, float, Dict[str, Any]]] = []
+
+    class _Handler(osmium.SimpleHandler):
+        def node(self, n):
+            tags = {t.k: t.v for t in n.tags}
+            if tags and topic_mask(tags) and n.location.valid():
+                out.append(("node", n.id, n.location.lat, n.location.lon, tags))
+
+        def way(self, w):
+            tags = {t.k: t.v for t in w.tags}
+            if not tags or not topic_mask(tags):
+                return
+            pts = [(nd.lat, nd.lon) for nd in w.nodes if nd.location.valid()]
+            if pts:
+                out.append(("way", w.id, sum(p[0] for p in pts) / len(pts), sum(p[1] for p in pts) / len(pts), tags))
+
+    _Handler().apply_file(path, locations=True)
+    return iter(out)
+
+
+def ingest(source: str, db_path: str) -> Dict[str, Any]:
+    """Load a .geojson/.json or .osm.pbf extract into `db_path` (existing rows are replaced)."""
+    elements: Iterable[Tuple[str, int, float, float, Dict[str, Any]]]
+    if source.endswith(".pbf"):
+        elements = _pbf_elements(source)
+    else:
+        elements = _geojson_elements(source)
+
+    db_path = os.path.expanduser(db_path)
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    db = _connect(db_path, create=True)
+    db.execute("DELETE FROM pois")
+    db.execute("DELETE FROM pois_rtree")
+    kept = 0
+    bbox = [90.0, -90.0, 180.0, -180.0]
+    batch: List[Tuple[Any, ...]] = []
+
+    def _flush() -> None:
+        db.executemany("INSERT INTO pois VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+        db.executemany("INSERT INTO pois_rtree VALUES (?, ?, ?, ?, ?)", [(b[0], b[3], b[3], b[4], b[4]) for b in batch])
+        batch.clear()
+
+    for osm_type, osm_id, lat, lon, tags in elements:
+        mask = topic_mask(tags)
+        if not mask:
+            continue
+        kept += 1
+        batch.append((kept, osm_type, osm_id, lat, lon, mask, json.dumps(tags, ensure_ascii=False)))
+        bbox = [min(bbox[0], lat), max(bbox[1], lat), min(bbox[2], lon), max(bbox[3], lon)]
+        if len(batch) >= _BATCH:
+            _flush()
+    if batch:
+        _flush()
+    db.execute("INSERT OR REPLACE INTO meta VALUES ('bbox', ?)", (json.dumps(bbox),))
+    db.execute("INSERT OR REPLACE INTO meta VALUES ('source', ?)", (os.path.basename(source),))
+    db.commit()
+    db.close()
+    return {"pois": kept, "bbox": bbox if kept else None, "db": db_path}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local OSM POI store")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_ingest = sub.add_parser("ingest", help="Load a .geojson or .osm.pbf extract")
+    p_ingest.add_argument("source")
+    p_ingest.add_argument("--db", default=settings.osm_local_db or os.path.join(settings.cache_dir, "osm.sqlite3"))
+    args = parser.parse_args(argv)
+    print(json.dumps(ingest(args.source, args.db)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+OSM tag filters behind each POI topic, mirroring the Overpass QL in poi.py,
+so data filtered locally matches what the public endpoint would return.
+A filter is (key, regex): regex None means "key is present"; otherwise the
+value must contain a match, like Overpass' `["key"~"regex"]`.
+"""
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+_FOOD_AMENITY = "restaurant|cafe|fast_food|food_court|biergarten"
+
+TOPIC_FILTERS: Dict[str, List[Tuple[str, Optional[str]]]] = {
+    "restaurants": [("amenity", _FOOD_AMENITY)],
+    "nature": [
+        ("leisure", "park|garden"),
+        ("natural", None),
+        ("water", "lake|river|reservoir|lagoon|pond"),
+        ("waterway", "waterfall|river"),
+        ("tourism", "^viewpoint$"),
+    ],
+    "general": [
+        ("tourism", "attraction|museum|zoo|theme_park|viewpoint|information"),
+        ("historic", None),
+        ("leisure", "park|garden"),
+        ("natural", None),
+    ],
+}
+
+# Bit per topic, so an element can be stored once with every topic it belongs to
+TOPIC_BITS = {"restaurants": 1, "nature": 2, "general": 4, "foods": 8}
+
+_COMPILED = {
+    topic: [(key, re.compile(rx) if rx else None) for key, rx in filters]
+    for topic, filters in TOPIC_FILTERS.items()
+}
+
+
+def matches(tags: Dict[str, Any], topic: str) -> bool:
+    """True if `tags` satisfy any filter of `topic` ("foods" = restaurants with a cuisine tag)."""
+    if topic == "foods":
+        return bool(tags.get("cuisine")) and matches(tags, "restaurants")
+    for key, rx in _COMPILED.get(topic, _COMPILED["general"]):
+        value = tags.get(key)
+        if value is not None and (rx is None or rx.search(str(value))):
+            return True
+    return False
+
+
+def topic_mask(tags: Dict[str, Any]) -> int:
+    mask = 0
+    for topic, bit in TOPIC_BITS.items():
+        if matches(tags, topic):
+            mask |= bit
+    return mask
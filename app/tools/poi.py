@@ -1,13 +1,36 @@
-import httpx
-from typing import List, Dict, Any, Optional, Set
+import asyncio
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+from functools import partial
+from typing import List, Dict, Any, Optional, Set, Tuple
 from ..config import settings
+from ..utils.cache import LRUCache, SQLiteCache, TieredCache, normalize_key
+from ..utils.geo import haversine_m
+from ..utils.concurrency import first_non_empty, first_non_empty_async, get_pool
+from ..utils.tracing import propagate
 from . import weather as weather_tool
+from . import geocache
+from . import osm_local
+from . import osm_tags
+from . import poi_index
+from . import transport
 
 BASE = "https://api.opentripmap.com/0.1/en"
 API_KEY = settings.opentripmap_api_key
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 WIKI_GEOSEARCH = "https://en.wikipedia.org/w/api.php"
 
+DEFAULT_KINDS = (
+    "interesting_places,architecture,museums,heritage,urban_environment,"
+    "religion,natural,fortifications,monuments,memorial,towers,other_temples,temples,churches,mosques,"
+    "bridges,attractions,amusements,parks,zoos,theatres_and_entertainments,sport"
+)
+
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
 def _require_key():
     if not API_KEY:
         raise RuntimeError(
@@ -15,26 +38,68 @@ def _require_key():
             "Get a free key at https://opentripmap.io"
         )
 
-def _otm_geoname(city: str) -> Optional[Dict[str, Any]]:
-    url = f"{BASE}/places/geoname"
-    r = httpx.get(url, params={"name": city, "apikey": API_KEY}, timeout=20)
-    r.raise_for_status()
-    d = r.json()
+def _parse_otm_geoname(city: str, d: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     if "lat" in d and "lon" in d:
         return {"lat": d["lat"], "lon": d["lon"], "name": d.get("name", city)}
     return None
 
+def _otm_geoname(city: str) -> Optional[Dict[str, Any]]:
+    cached = geocache.get("otm", city)
+    if cached:
+        return cached
+    url = f"{BASE}/places/geoname"
+    r = transport.get(url, params={"name": city, "apikey": API_KEY}, timeout=20)
+    r.raise_for_status()
+    g = _parse_otm_geoname(city, r.json())
+    if g:
+        geocache.put("otm", city, g)
+    return g
+
+async def _otm_geoname_async(city: str) -> Optional[Dict[str, Any]]:
+    # Every cache and index below is SQLite: the async twins reach them via worker threads
+    cached = await asyncio.to_thread(geocache.get, "otm", city)
+    if cached:
+        return cached
+    url = f"{BASE}/places/geoname"
+    r = await transport.aget(url, params={"name": city, "apikey": API_KEY}, timeout=20)
+    r.raise_for_status()
+    g = _parse_otm_geoname(city, r.json())
+    if g:
+        await asyncio.to_thread(geocache.put, "otm", city, g)
+    return g
+
 def geoname(city: str) -> Dict[str, Any]:
+    # Cache the resolved answer too, so a failing OTM lookup isn't retried per request
+    cached = geocache.get("geoname", city)
+    if cached:
+        return cached
+    g = None
     try:
         g = _otm_geoname(city)
-        if g:
-            return g
     except Exception:
         pass
-    g2 = weather_tool.geocode_city(city)  # {'name','lat','lon','country'}
-    return {"lat": g2["lat"], "lon": g2["lon"], "name": g2.get("name", city)}
+    if not g:
+        g2 = weather_tool.geocode_city(city)  # {'name','lat','lon','country'}
+        g = {"lat": g2["lat"], "lon": g2["lon"], "name": g2.get("name", city)}
+    geocache.put("geoname", city, g)
+    return g
 
-def _radius_query_otm(lat: float, lon: float, radius_m: int, kinds: Optional[str], rate: int, limit: int):
+async def geoname_async(city: str) -> Dict[str, Any]:
+    cached = await asyncio.to_thread(geocache.get, "geoname", city)
+    if cached:
+        return cached
+    g = None
+    try:
+        g = await _otm_geoname_async(city)
+    except Exception:
+        pass
+    if not g:
+        g2 = await weather_tool.geocode_city_async(city)
+        g = {"lat": g2["lat"], "lon": g2["lon"], "name": g2.get("name", city)}
+    await asyncio.to_thread(geocache.put, "geoname", city, g)
+    return g
+
+def _otm_radius_params(lat: float, lon: float, radius_m: int, kinds: Optional[str], rate: int, limit: int):
     params = {
         "lat": lat,
         "lon": lon,
@@ -46,62 +111,182 @@ def _radius_query_otm(lat: float, lon: float, radius_m: int, kinds: Optional[str
     }
     if kinds:
         params["kinds"] = kinds
+    return params
+
+def _index_scope(kinds: Optional[str], rate: int) -> str:
+    return f"otm:{rate}:{kinds or '*'}"
+
+def _index_page(lat: float, lon: float, radius_m: int, kinds: Optional[str], rate: int, limit: int, features) -> None:
+    """
+    Remember every OTM page, speculative strategies included, for poi_index.
+    OTM returns nearest first, so a full page covers out to its farthest item
+    and a short page covers the whole radius.
+    """
+    items = [it for it in _otm_results(features, set()) if it.get("lat") is not None]
+    covered = float(radius_m)
+    if len(features) >= limit:
+        covered = min(covered, max((haversine_m(lat, lon, it["lat"], it["lon"]) for it in items), default=0.0))
+    poi_index.add(_index_scope(kinds, rate), lat, lon, covered, items)
+
+def _radius_query_otm(lat: float, lon: float, radius_m: int, kinds: Optional[str], rate: int, limit: int):
     url = f"{BASE}/places/radius"
-    r = httpx.get(url, params=params, timeout=30)
+    r = transport.get(url, params=_otm_radius_params(lat, lon, radius_m, kinds, rate, limit), timeout=30)
     r.raise_for_status()
-    return r.json().get("features", [])
+    features = r.json().get("features", [])
+    _index_page(lat, lon, radius_m, kinds, rate, limit, features)
+    return features
 
-def _overpass_query(lat: float, lon: float, radius_m: int, topic: str = "general") -> List[Dict[str, Any]]:
+async def _radius_query_otm_async(lat: float, lon: float, radius_m: int, kinds: Optional[str], rate: int, limit: int):
+    url = f"{BASE}/places/radius"
+    r = await transport.aget(url, params=_otm_radius_params(lat, lon, radius_m, kinds, rate, limit), timeout=30)
+    r.raise_for_status()
+    features = r.json().get("features", [])
+    await asyncio.to_thread(_index_page, lat, lon, radius_m, kinds, rate, limit, features)
+    return features
+
+# Overpass: a single request per (point, radius) fetches every topic at once.
+# Elements are classified locally with the same tag filters (osm_tags) and each
+# topic bucket is cached on its own, so restaurants, nature, sights and foods
+# for one city cost one Overpass call instead of four.
+
+OVERPASS_BUCKETS = ("restaurants", "nature", "general", "foods")
+# The server gives up on the union query after OVERPASS_TIMEOUT_S; the client waits a
+# little longer so the server's own timeout answer arrives instead of a client error
+OVERPASS_TIMEOUT_S = 40
+_OVERPASS_CLIENT_TIMEOUT_S = OVERPASS_TIMEOUT_S + 5
+_OVERPASS_TAGS = ("name", "amenity", "cuisine", "leisure", "natural", "water", "waterway", "tourism", "historic")
+
+def _ql_filter(key: str, rx: Optional[str]) -> str:
+    return f'["{key}"]' if rx is None else f'["{key}"~"{rx}"]'
+
+def _topic_filters(topic: str) -> List[str]:
+    if topic == "foods":
+        return [_ql_filter(k, rx) + '["cuisine"]' for k, rx in osm_tags.TOPIC_FILTERS["restaurants"]]
+    return [_ql_filter(k, rx) for k, rx in osm_tags.TOPIC_FILTERS[topic]]
+
+def _overpass_union_ql(lat: float, lon: float, radius_m: int) -> str:
     """
-    Live OSM Overpass.
-    topic='restaurants' → restaurant-like amenities
-    topic='nature'      → parks/gardens/natural/water
-    topic='general'     → tourist attractions/historic/sightseeing
+    Every topic's filters in one query, each topic with its own element cap.
+    Ways print with `out tags center`; nodes need plain `out`, since `out tags`
+    drops node coordinates and the buckets are distance-filtered later.
     """
-    if topic == "restaurants":
-        q = f"""
-        [out:json][timeout:25];
-        (
-          node(around:{radius_m},{lat},{lon})["amenity"~"restaurant|cafe|fast_food|food_court|biergarten"];
-          way(around:{radius_m},{lat},{lon})["amenity"~"restaurant|cafe|fast_food|food_court|biergarten"];
-        );
-        out center 200;
-        """
-    elif topic == "nature":
-        q = f"""
-        [out:json][timeout:25];
-        (
-          node(around:{radius_m},{lat},{lon})["leisure"~"park|garden"];
-          way(around:{radius_m},{lat},{lon})["leisure"~"park|garden"];
-          node(around:{radius_m},{lat},{lon})["natural"];
-          way(around:{radius_m},{lat},{lon})["natural"];
-          node(around:{radius_m},{lat},{lon})["water"~"lake|river|reservoir|lagoon|pond"];
-          way(around:{radius_m},{lat},{lon})["water"~"lake|river|reservoir|lagoon|pond"];
-          node(around:{radius_m},{lat},{lon})["waterway"~"waterfall|river"];
-          way(around:{radius_m},{lat},{lon})["waterway"~"waterfall|river"];
-          node(around:{radius_m},{lat},{lon})["tourism"="viewpoint"];
-          way(around:{radius_m},{lat},{lon})["tourism"="viewpoint"];
-        );
-        out center 200;
-        """
-    else:
-        q = f"""
-        [out:json][timeout:25];
-        (
-          node(around:{radius_m},{lat},{lon})["tourism"~"attraction|museum|zoo|theme_park|viewpoint|information"];
-          way(around:{radius_m},{lat},{lon})["tourism"~"attraction|museum|zoo|theme_park|viewpoint|information"];
-          node(around:{radius_m},{lat},{lon})["historic"];
-          way(around:{radius_m},{lat},{lon})["historic"];
-          node(around:{radius_m},{lat},{lon})["leisure"~"park|garden"];
-          way(around:{radius_m},{lat},{lon})["leisure"~"park|garden"];
-          node(around:{radius_m},{lat},{lon})["natural"];
-          way(around:{radius_m},{lat},{lon})["natural"];
-        );
-        out center 200;
-        """
-    r = httpx.post(OVERPASS_URL, data={"data": q}, timeout=40)
+    around = f"(around:{radius_m},{lat},{lon})"
+    n = settings.overpass_element_limit
+    parts = [f"[out:json][timeout:{OVERPASS_TIMEOUT_S}];"]
+    for topic in OVERPASS_BUCKETS:
+        for element, verbosity in (("node", "out"), ("way", "out tags center")):
+            clauses = " ".join(f"{element}{around}{f};" for f in _topic_filters(topic))
+            parts.append(f"({clauses}); {verbosity} {n};")
+    return "\n".join(parts)
+
+def _overpass_buckets(elements: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Union response -> {topic: [compact element]}; one element can land in several topics."""
+    buckets: Dict[str, List[Dict[str, Any]]] = {b: [] for b in OVERPASS_BUCKETS}
+    seen: Set[Tuple[str, Any]] = set()
+    for el in elements:
+        ident = (el.get("type"), el.get("id"))
+        center = el.get("center") or el
+        if ident in seen or center.get("lat") is None or center.get("lon") is None:
+            continue
+        seen.add(ident)
+        tags = {k: v for k, v in (el.get("tags") or {}).items() if k in _OVERPASS_TAGS}
+        compact = {"type": el.get("type"), "id": el.get("id"), "lat": center["lat"], "lon": center["lon"], "tags": tags}
+        for topic in OVERPASS_BUCKETS:
+            if osm_tags.matches(tags, topic):
+                buckets[topic].append(compact)
+    return buckets
+
+def _overpass_key(lat: float, lon: float, radius_m: int, topic: str) -> str:
+    return f"overpass:{round(lat, 4)},{round(lon, 4)}:{radius_m}:{topic}"
+
+def _store_buckets(lat: float, lon: float, radius_m: int, payload: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    buckets = _overpass_buckets(payload.get("elements", []))
+    cache = _result_cache()
+    # Overpass reports timeouts as a 200 with a "remark"; an empty union is not worth pinning either
+    if cache is not None and not payload.get("remark") and any(buckets.values()):
+        for topic, els in buckets.items():
+            cache.store(_overpass_key(lat, lon, radius_m, topic), {"elements": els})
+    return buckets
+
+def _fetch_buckets(lat: float, lon: float, radius_m: int) -> Dict[str, List[Dict[str, Any]]]:
+    # A timed-out union query is not retried: running it again would take just as long
+    r = transport.post(
+        OVERPASS_URL,
+        data={"data": _overpass_union_ql(lat, lon, radius_m)},
+        timeout=_OVERPASS_CLIENT_TIMEOUT_S,
+        coalesce=True,
+        retry_timeouts=False,
+    )
+    r.raise_for_status()
+    return _store_buckets(lat, lon, radius_m, r.json())
+
+async def _fetch_buckets_async(lat: float, lon: float, radius_m: int) -> Dict[str, List[Dict[str, Any]]]:
+    r = await transport.apost(
+        OVERPASS_URL,
+        data={"data": _overpass_union_ql(lat, lon, radius_m)},
+        timeout=_OVERPASS_CLIENT_TIMEOUT_S,
+        coalesce=True,
+        retry_timeouts=False,
+    )
     r.raise_for_status()
-    elements = r.json().get("elements", [])
+    return await asyncio.to_thread(_store_buckets, lat, lon, radius_m, r.json())
+
+def _cached_bucket(lat: float, lon: float, radius_m: int, topic: str) -> Optional[List[Dict[str, Any]]]:
+    cache = _result_cache()
+    if cache is None:
+        return None
+    key = _overpass_key(lat, lon, radius_m, topic)
+    value, needs_refresh = cache.lookup(key)
+    if value is None:
+        return None
+    if needs_refresh:
+        cache.refresh_in_background(
+            key, lambda: {"elements": _fetch_buckets(lat, lon, radius_m)[topic]}, lambda v: True
+        )
+    return value["elements"]
+
+def _within(elements: List[Dict[str, Any]], lat: float, lon: float, radius_m: int) -> List[Dict[str, Any]]:
+    return [el for el in elements if haversine_m(lat, lon, el["lat"], el["lon"]) <= radius_m]
+
+def _local_elements(lat: float, lon: float, radius_m: int, topic: str) -> List[Dict[str, Any]]:
+    """
+    Elements from the local OSM extract, or [] when it does not cover the point.
+    `covers` only checks the extract's bounding box, so an empty answer may
+    just mean the area inside the box was never extracted.
+    """
+    if not osm_local.covers(lat, lon):
+        return []
+    return osm_local.query(lat, lon, radius_m, topic)
+
+def _overpass_elements(lat: float, lon: float, radius_m: int, topic: str) -> List[Dict[str, Any]]:
+    """
+    Elements of `topic` within `radius_m`: local extract, else a cached or
+    fresh union fetch. The union is fetched for at least
+    settings.overpass_radius_m, whatever the caller asked for, so one query
+    serves every topic and the growing radii of a search; `_within` then
+    drops what lies beyond `radius_m`.
+    """
+    local = _local_elements(lat, lon, radius_m, topic)
+    if local:
+        return local
+    union_radius = max(radius_m, settings.overpass_radius_m)
+    elements = _cached_bucket(lat, lon, union_radius, topic)
+    if elements is None:
+        elements = _fetch_buckets(lat, lon, union_radius)[topic]
+    return _within(elements, lat, lon, radius_m)
+
+async def _overpass_elements_async(lat: float, lon: float, radius_m: int, topic: str) -> List[Dict[str, Any]]:
+    """Async twin of `_overpass_elements` (same radius widening), with SQLite in a worker thread."""
+    local = await asyncio.to_thread(_local_elements, lat, lon, radius_m, topic)
+    if local:
+        return local
+    union_radius = max(radius_m, settings.overpass_radius_m)
+    elements = await asyncio.to_thread(_cached_bucket, lat, lon, union_radius, topic)
+    if elements is None:
+        elements = (await _fetch_buckets_async(lat, lon, union_radius))[topic]
+    return _within(elements, lat, lon, radius_m)
+
+def _parse_overpass(elements: List[Dict[str, Any]], topic: str) -> List[Dict[str, Any]]:
     out: List[Dict[str, Any]] = []
     for el in elements:
         tags = el.get("tags", {}) or {}
@@ -122,11 +307,28 @@ def _overpass_query(lat: float, lon: float, radius_m: int, topic: str = "general
                 if tags.get(k):
                     parts.append(f"{k}:{tags.get(k)}")
             kind = ",".join(parts)
-        out.append({"name": name, "kinds": kind or None, "rate": None, "source": "overpass"})
+        center = el.get("center") or el
+        out.append({
+            "name": name, "kinds": kind or None, "rate": None, "source": "overpass",
+            "lat": center.get("lat"), "lon": center.get("lon"),
+        })
     return out
 
-def _wikipedia_geosearch(lat: float, lon: float, radius_m: int, limit: int) -> List[Dict[str, Any]]:
-    params = {
+def _overpass_query(lat: float, lon: float, radius_m: int, topic: str = "general") -> List[Dict[str, Any]]:
+    """
+    Live OSM Overpass.
+    topic='restaurants' → restaurant-like amenities
+    topic='nature'      → parks/gardens/natural/water
+    topic='general'     → tourist attractions/historic/sightseeing
+    Served from the local OSM extract instead when it covers (lat, lon).
+    """
+    return _parse_overpass(_overpass_elements(lat, lon, radius_m, topic), topic)
+
+async def _overpass_query_async(lat: float, lon: float, radius_m: int, topic: str = "general") -> List[Dict[str, Any]]:
+    return _parse_overpass(await _overpass_elements_async(lat, lon, radius_m, topic), topic)
+
+def _wiki_params(lat: float, lon: float, radius_m: int, limit: int) -> Dict[str, Any]:
+    return {
         "action": "query",
         "list": "geosearch",
         "gscoord": f"{lat}|{lon}",
@@ -134,29 +336,26 @@ def _wikipedia_geosearch(lat: float, lon: float, radius_m: int, limit: int) -> L
         "gslimit": limit,
         "format": "json",
     }
-    r = httpx.get(WIKI_GEOSEARCH, params=params, timeout=20)
-    r.raise_for_status()
-    pages = r.json().get("query", {}).get("geosearch", [])
+
+def _parse_wiki(d: Dict[str, Any]) -> List[Dict[str, Any]]:
+    pages = d.get("query", {}).get("geosearch", [])
     return [
-        {"name": p.get("title"), "kinds": "wikipedia", "rate": None, "source": "wikipedia"}
+        {"name": p.get("title"), "kinds": "wikipedia", "rate": None, "source": "wikipedia", "lat": p.get("lat"), "lon": p.get("lon")}
         for p in pages if p.get("title")
     ]
 
-def list_pois(
-    city: str,
-    limit: int = 18,
-    kinds: str = (
-        "interesting_places,architecture,museums,heritage,urban_environment,"
-        "religion,natural,fortifications,monuments,memorial,towers,other_temples,temples,churches,mosques,"
-        "bridges,attractions,amusements,parks,zoos,theatres_and_entertainments,sport"
-    ),
-    initial_radius_m: int = 12000,
-    topic: str = "general",  
-) -> Dict[str, Any]:
-    _require_key()
-    g = geoname(city)
-    lat, lon = g["lat"], g["lon"]
+def _wikipedia_geosearch(lat: float, lon: float, radius_m: int, limit: int) -> List[Dict[str, Any]]:
+    r = transport.get(WIKI_GEOSEARCH, params=_wiki_params(lat, lon, radius_m, limit), timeout=20)
+    r.raise_for_status()
+    return _parse_wiki(r.json())
+
+async def _wikipedia_geosearch_async(lat: float, lon: float, radius_m: int, limit: int) -> List[Dict[str, Any]]:
+    r = await transport.aget(WIKI_GEOSEARCH, params=_wiki_params(lat, lon, radius_m, limit), timeout=20)
+    r.raise_for_status()
+    return _parse_wiki(r.json())
 
+def _otm_plan(kinds: str, initial_radius_m: int, topic: str) -> Tuple[int, List[Tuple[int, Optional[str], int]]]:
+    """Topic-adjusted starting radius plus the OTM (radius, kinds, rate) strategies in priority order."""
     if topic == "restaurants":
         kinds = "catering,restaurants,cafes,fast_food"
         initial_radius_m = max(3000, min(initial_radius_m, 8000))
@@ -173,86 +372,169 @@ def list_pois(
         (25000, None, 1),
         (50000, None, 1),
     ]
-    items: List[Dict[str, Any]] = []
-    for radius_m, k_filter, rate in otm_strategies:
-        try:
-            feats = _radius_query_otm(lat, lon, radius_m, k_filter, rate, limit)
-            if feats:
-                items = feats
-                break
-        except Exception:
-            continue
+    return initial_radius_m, otm_strategies
 
+def _otm_results(items: List[Dict[str, Any]], seen: Set[str]) -> List[Dict[str, Any]]:
     results: List[Dict[str, Any]] = []
-    seen: Set[str] = set()
+    for it in items or []:
+        p = it.get("properties", {})
+        coords = (it.get("geometry") or {}).get("coordinates") or [None, None]
+        name = p.get("name") or p.get("wikidata") or p.get("xid")
+        if not name:
+            continue
+        key = str(name).strip().lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        results.append({
+            "name": str(name),
+            "kinds": p.get("kinds"),
+            "rate": p.get("rate"),
+            "otm": f"https://opentripmap.com/en/card/{p.get('xid')}" if p.get("xid") else None,
+            "source": "opentripmap",
+            "lat": coords[1],
+            "lon": coords[0],
+        })
+    return results
 
-    if items:
-        for it in items:
-            p = it.get("properties", {})
-            name = p.get("name") or p.get("wikidata") or p.get("xid")
-            if not name:
-                continue
-            key = str(name).strip().lower()
-            if key in seen:
-                continue
-            seen.add(key)
-            results.append({
-                "name": str(name),
-                "kinds": p.get("kinds"),
-                "rate": p.get("rate"),
-                "otm": f"https://opentripmap.com/en/card/{p.get('xid')}" if p.get("xid") else None,
-                "source": "opentripmap",
-            })
-
-    if len(results) < max(6, limit // 2):
-        try:
-            overpass_items = _overpass_query(lat, lon, max(initial_radius_m, 20000), topic=topic)
-            for it in overpass_items:
-                key = str(it["name"]).strip().lower()
-                if key in seen:
-                    continue
-                seen.add(key)
-                results.append(it)
-        except Exception:
-            pass
+def _merge_new(results: List[Dict[str, Any]], seen: Set[str], items: List[Dict[str, Any]]) -> None:
+    for it in items:
+        key = str(it["name"]).strip().lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        results.append(it)
 
-    if len(results) < max(6, limit // 2):
-        try:
-            wiki_items = _wikipedia_geosearch(lat, lon, max(initial_radius_m, 20000), limit=limit)
-            for it in wiki_items:
-                key = str(it["name"]).strip().lower()
-                if key in seen:
-                    continue
-                seen.add(key)
-                results.append(it)
-        except Exception:
-            pass
+def _finish_pois(g: Dict[str, Any], city: str, results: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    # Merge cross-source spellings of one place and rank on one score; numpy loads on first use
+    from .poi_rank import dedupe_and_rank
 
-    results.sort(key=lambda x: (x.get("rate") or 0), reverse=True)
-    if len(results) > limit:
-        results = results[:limit]
+    results = dedupe_and_rank(results, center=(g["lat"], g["lon"]))[:limit]
 
     return {"city": g.get("name", city), "items": results, "source": ["opentripmap","overpass","wikipedia"]}
 
-def list_foods(city: str, limit: int = 16, initial_radius_m: int = 12000) -> Dict[str, Any]:
+def _from_index(lat: float, lon: float, otm_strategies, limit: int) -> Optional[List[Dict[str, Any]]]:
     """
-    Live OSM-based 'foods to try' using restaurant cuisine tags near the city.
-    Returns unique cuisine/dish names (normalized).
+    POIs already fetched around here, when they provably equal what the first OTM
+    strategy would return and are plentiful enough that no fallback would run.
     """
+    radius_m, k_filter, rate = otm_strategies[0]
+    items = poi_index.lookup(_index_scope(k_filter, rate), lat, lon, radius_m, limit)
+    if items and len(items) >= max(6, limit // 2):
+        return items
+    return None
+
+def _list_pois_live(
+    city: str,
+    limit: int = 18,
+    kinds: str = DEFAULT_KINDS,
+    initial_radius_m: int = 12000,
+    topic: str = "general",
+) -> Dict[str, Any]:
+    _require_key()
     g = geoname(city)
     lat, lon = g["lat"], g["lon"]
+    initial_radius_m, otm_strategies = _otm_plan(kinds, initial_radius_m, topic)
+    indexed = _from_index(lat, lon, otm_strategies, limit)
+    if indexed:
+        return _finish_pois(g, city, indexed, limit)
+
+    pool = get_pool("poi", settings.poi_workers)
+    fallback_radius = max(initial_radius_m, 20000)
+    fallbacks: Dict[str, Future] = {}
+
+    def _start_fallbacks() -> None:
+        if not fallbacks:
+            fallbacks["overpass"] = pool.submit(propagate(_overpass_query, lat, lon, fallback_radius, topic))
+            fallbacks["wikipedia"] = pool.submit(propagate(_wikipedia_geosearch, lat, lon, fallback_radius, limit))
+
+    def _on_miss(i: int) -> None:
+        # An empty first strategy means a sparse city: start Overpass/Wikipedia speculatively
+        if i == 0:
+            _start_fallbacks()
+
+    # Race the OTM strategies in waves; the highest-priority non-empty result still wins
+    _, items = first_non_empty(
+        [
+            (lambda r=radius_m, k=k_filter, rt=rate: _radius_query_otm(lat, lon, r, k, rt, limit))
+            for radius_m, k_filter, rate in otm_strategies
+        ],
+        pool,
+        wave_size=settings.poi_strategy_wave,
+        on_miss=_on_miss,
+    )
 
-    q = f"""
-    [out:json][timeout:25];
-    (
-      node(around:{max(initial_radius_m,8000)},{lat},{lon})["amenity"~"restaurant|cafe|fast_food|food_court|biergarten"]["cuisine"];
-      way(around:{max(initial_radius_m,8000)},{lat},{lon})["amenity"~"restaurant|cafe|fast_food|food_court|biergarten"]["cuisine"];
-    );
-    out tags 200;
-    """
-    r = httpx.post(OVERPASS_URL, data={"data": q}, timeout=40)
-    r.raise_for_status()
-    elements = r.json().get("elements", [])
+    seen: Set[str] = set()
+    results = _otm_results(items, seen)
+
+    for source in ("overpass", "wikipedia"):
+        if len(results) >= max(6, limit // 2):
+            break
+        _start_fallbacks()
+        try:
+            _merge_new(results, seen, fallbacks[source].result())
+        except Exception:
+            pass
+    for f in fallbacks.values():
+        f.cancel()
+
+    return _finish_pois(g, city, results, limit)
+
+async def _list_pois_live_async(
+    city: str,
+    limit: int = 18,
+    kinds: str = DEFAULT_KINDS,
+    initial_radius_m: int = 12000,
+    topic: str = "general",
+) -> Dict[str, Any]:
+    _require_key()
+    g = await geoname_async(city)
+    lat, lon = g["lat"], g["lon"]
+    initial_radius_m, otm_strategies = _otm_plan(kinds, initial_radius_m, topic)
+    indexed = await asyncio.to_thread(_from_index, lat, lon, otm_strategies, limit)
+    if indexed:
+        return _finish_pois(g, city, indexed, limit)
+
+    fallback_radius = max(initial_radius_m, 20000)
+    fallbacks: Dict[str, asyncio.Task] = {}
+
+    def _start_fallbacks() -> None:
+        if not fallbacks:
+            fallbacks["overpass"] = asyncio.ensure_future(_overpass_query_async(lat, lon, fallback_radius, topic))
+            fallbacks["wikipedia"] = asyncio.ensure_future(_wikipedia_geosearch_async(lat, lon, fallback_radius, limit))
+
+    def _on_miss(i: int) -> None:
+        if i == 0:
+            _start_fallbacks()
+
+    _, items = await first_non_empty_async(
+        [
+            (lambda r=radius_m, k=k_filter, rt=rate: _radius_query_otm_async(lat, lon, r, k, rt, limit))
+            for radius_m, k_filter, rate in otm_strategies
+        ],
+        wave_size=settings.poi_strategy_wave,
+        on_miss=_on_miss,
+    )
+
+    seen: Set[str] = set()
+    results = _otm_results(items, seen)
+
+    try:
+        for source in ("overpass", "wikipedia"):
+            if len(results) >= max(6, limit // 2):
+                break
+            _start_fallbacks()
+            try:
+                _merge_new(results, seen, await fallbacks[source])
+            except Exception:
+                pass
+    finally:
+        for t in fallbacks.values():
+            t.cancel()
+
+    return _finish_pois(g, city, results, limit)
+
+def _parse_foods(g: Dict[str, Any], city: str, elements: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
     seen: Set[str] = set()
     foods: List[str] = []
     for el in elements:
@@ -275,3 +557,110 @@ def list_foods(city: str, limit: int = 16, initial_radius_m: int = 12000) -> Dic
         "city": g.get("name", city),
         "items": [{"name": f, "kinds": "cuisine", "rate": None, "source": "overpass"} for f in foods],
     }
+
+def _list_foods_live(city: str, limit: int, initial_radius_m: int) -> Dict[str, Any]:
+    g = geoname(city)
+    elements = _overpass_elements(g["lat"], g["lon"], max(initial_radius_m, 8000), "foods")
+    return _parse_foods(g, city, elements, limit)
+
+async def _list_foods_live_async(city: str, limit: int, initial_radius_m: int) -> Dict[str, Any]:
+    g = await geoname_async(city)
+    elements = await _overpass_elements_async(g["lat"], g["lon"], max(initial_radius_m, 8000), "foods")
+    return _parse_foods(g, city, elements, limit)
+
+
+# Cached public API: POIs change on a scale of weeks, so serve cached lists
+# (stale ones too, refreshed in the background) before going live.
+
+def _result_cache() -> Optional[TieredCache]:
+    global _cache
+    if not settings.cache_enabled:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TieredCache(
+                    LRUCache(settings.poi_cache_memory_entries, ttl=settings.poi_cache_stale_s),
+                    SQLiteCache(
+                        os.path.join(settings.cache_dir, "poi.sqlite3"),
+                        table="poi_results",
+                        max_entries=settings.poi_cache_max_entries,
+                    ),
+                    fresh_s=settings.poi_cache_fresh_s,
+                    stale_s=settings.poi_cache_stale_s,
+                    refresh_pool=get_pool("poi-refresh", 4),
+                    name="poi",
+                )
+    return _cache
+
+def _has_items(obs: Dict[str, Any]) -> bool:
+    return bool(obs.get("items")) and not obs.get("error")
+
+def _pois_key(city: str, topic: str, limit: int, initial_radius_m: int, kinds: str) -> str:
+    kinds_tag = "" if kinds == DEFAULT_KINDS else hashlib.sha1(kinds.encode("utf-8")).hexdigest()[:8]
+    return f"pois:{normalize_key(city)}:{topic}:{limit}:{initial_radius_m}:{kinds_tag}"
+
+def _foods_key(city: str, limit: int, initial_radius_m: int) -> str:
+    return f"foods:{normalize_key(city)}:{limit}:{initial_radius_m}"
+
+def list_pois(
+    city: str,
+    limit: int = 18,
+    kinds: str = DEFAULT_KINDS,
+    initial_radius_m: int = 12000,
+    topic: str = "general",
+) -> Dict[str, Any]:
+    fetch = partial(_list_pois_live, city, limit, kinds, initial_radius_m, topic)
+    cache = _result_cache()
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(_pois_key(city, topic, limit, initial_radius_m, kinds), fetch, _has_items)
+
+async def list_pois_async(
+    city: str,
+    limit: int = 18,
+    kinds: str = DEFAULT_KINDS,
+    initial_radius_m: int = 12000,
+    topic: str = "general",
+) -> Dict[str, Any]:
+    """Async twin of `list_pois` (same return shape, same cache)."""
+    cache = _result_cache()
+    if cache is None:
+        return await _list_pois_live_async(city, limit, kinds, initial_radius_m, topic)
+    key = _pois_key(city, topic, limit, initial_radius_m, kinds)
+    value, needs_refresh = await asyncio.to_thread(cache.lookup, key)
+    if value is not None:
+        if needs_refresh:
+            cache.refresh_in_background(key, partial(_list_pois_live, city, limit, kinds, initial_radius_m, topic), _has_items)
+        return value
+    value = await _list_pois_live_async(city, limit, kinds, initial_radius_m, topic)
+    if _has_items(value):
+        await asyncio.to_thread(cache.store, key, value)
+    return value
+
+def list_foods(city: str, limit: int = 16, initial_radius_m: int = 12000) -> Dict[str, Any]:
+    """
+    Live OSM-based 'foods to try' using restaurant cuisine tags near the city.
+    Returns unique cuisine/dish names (normalized).
+    """
+    fetch = partial(_list_foods_live, city, limit, initial_radius_m)
+    cache = _result_cache()
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(_foods_key(city, limit, initial_radius_m), fetch, _has_items)
+
+async def list_foods_async(city: str, limit: int = 16, initial_radius_m: int = 12000) -> Dict[str, Any]:
+    """Async twin of `list_foods`."""
+    cache = _result_cache()
+    if cache is None:
+        return await _list_foods_live_async(city, limit, initial_radius_m)
+    key = _foods_key(city, limit, initial_radius_m)
+    value, needs_refresh = await asyncio.to_thread(cache.lookup, key)
+    if value is not None:
+        if needs_refresh:
+            cache.refresh_in_background(key, partial(_list_foods_live, city, limit, initial_radius_m), _has_items)
+        return value
+    value = await _list_foods_live_async(city, limit, initial_radius_m)
+    if _has_items(value):
+        await asyncio.to_thread(cache.store, key, value)
+    return value
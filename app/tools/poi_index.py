@@ -0,0 +1,167 @@
+"""
+Spatial index of already-fetched POIs.
+
+Every POI is stored with its coordinates under a "scope" (topic + kinds
+filter), in SQLite with an R-tree. Each fetch also records a coverage circle:
+the area in which that fetch saw every matching POI the upstream would return.
+
+`within` and `nearest` are plain radius / k-nearest queries. `lookup` answers
+a list_pois request only when the answer is certain. That is the case when the
+circle around the query point, out to the k-th nearest item (or to the full
+radius if fewer items exist), lies inside one fresh coverage circle. Then no
+unseen POI could be closer, and a nearby city or a smaller radius is served
+with no network calls.
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import settings
+from ..utils.cache import normalize_key
+from ..utils.geo import bbox, haversine_m
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def _db() -> Optional[sqlite3.Connection]:
+    global _conn
+    if not settings.cache_enabled:
+        return None
+    if _conn is None:
+        with _lock:
+            if _conn is None:
+                path = os.path.join(settings.cache_dir, "poi_index.sqlite3")
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(
+                    """
+                    CREATE TABLE IF NOT EXISTS items (
+                        id INTEGER PRIMARY KEY, scope TEXT NOT NULL, key TEXT NOT NULL,
+                        lat REAL NOT NULL, lon REAL NOT NULL, rate REAL,
+                        name TEXT NOT NULL, kinds TEXT, otm TEXT, source TEXT,
+                        fetched_at REAL NOT NULL, UNIQUE (scope, key)
+                    );
+                    CREATE VIRTUAL TABLE IF NOT EXISTS items_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon);
+                    CREATE TABLE IF NOT EXISTS coverage (
+                        scope TEXT NOT NULL, lat REAL NOT NULL, lon REAL NOT NULL,
+                        radius_m REAL NOT NULL, fetched_at REAL NOT NULL
+                    );
+                    CREATE INDEX IF NOT EXISTS coverage_scope ON coverage(scope, fetched_at);
+                    """
+                )
+                _conn = conn
+    return _conn
+
+
+def _item_key(item: Dict[str, Any]) -> str:
+    # Same name ~100 m apart is the same place; same name across town is not
+    return f"{normalize_key(str(item['name']))}@{round(item['lat'], 3)},{round(item['lon'], 3)}"
+
+
+def add(scope: str, lat: float, lon: float, covered_radius_m: float, items: List[Dict[str, Any]]) -> None:
+    """
+    Store `items` that carry "lat"/"lon" and record that, around (lat, lon),
+    everything in `scope` out to `covered_radius_m` has now been seen.
+    """
+    db = _db()
+    if db is None:
+        return
+    now = time.time()
+    rows = [it for it in items if it.get("lat") is not None and it.get("lon") is not None]
+    with _lock:
+        try:
+            for it in rows:
+                key = _item_key(it)
+                db.execute(
+                    "INSERT INTO items (scope, key, lat, lon, rate, name, kinds, otm, source, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (scope, key) DO UPDATE SET lat = excluded.lat, lon = excluded.lon, "
+                    "rate = excluded.rate, kinds = excluded.kinds, otm = excluded.otm, fetched_at = excluded.fetched_at",
+                    (scope, key, it["lat"], it["lon"], it.get("rate"), it["name"],
+                     it.get("kinds"), it.get("otm"), it.get("source"), now),
+                )
+                (row_id,) = db.execute("SELECT id FROM items WHERE scope = ? AND key = ?", (scope, key)).fetchone()
+                db.execute(
+                    "INSERT OR REPLACE INTO items_rtree VALUES (?, ?, ?, ?, ?)",
+                    (row_id, it["lat"], it["lat"], it["lon"], it["lon"]),
+                )
+            if covered_radius_m > 0:
+                db.execute(
+                    "INSERT INTO coverage (scope, lat, lon, radius_m, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (scope, lat, lon, covered_radius_m, now),
+                )
+            _prune(db, now)
+            db.commit()
+        except Exception:
+            db.rollback()  # the index is an optimisation; a failed write is just a future miss
+
+
+def _prune(db: sqlite3.Connection, now: float) -> None:
+    cutoff = now - settings.poi_cache_stale_s
+    db.execute("DELETE FROM coverage WHERE fetched_at < ?", (cutoff,))
+    db.execute("DELETE FROM items_rtree WHERE id IN (SELECT id FROM items WHERE fetched_at < ?)", (cutoff,))
+    db.execute("DELETE FROM items WHERE fetched_at < ?", (cutoff,))
+
+
+def _as_item(row: Tuple[Any, ...]) -> Dict[str, Any]:
+    _, _, lat, lon, rate, name, kinds, otm, source = row
+    return {"name": name, "kinds": kinds, "rate": rate, "otm": otm, "source": source, "lat": lat, "lon": lon}
+
+
+def _distances(scope: str, lat: float, lon: float, radius_m: float) -> List[Tuple[float, Dict[str, Any]]]:
+    db = _db()
+    if db is None:
+        return []
+    min_lat, max_lat, min_lon, max_lon = bbox(lat, lon, radius_m)
+    with _lock:
+        rows = db.execute(
+            "SELECT i.id, i.scope, i.lat, i.lon, i.rate, i.name, i.kinds, i.otm, i.source "
+            "FROM items_rtree r JOIN items i ON i.id = r.id "
+            "WHERE r.min_lat >= ? AND r.max_lat <= ? AND r.min_lon >= ? AND r.max_lon <= ? AND i.scope = ?",
+            (min_lat, max_lat, min_lon, max_lon, scope),
+        ).fetchall()
+    hits = [(haversine_m(lat, lon, r[2], r[3]), r) for r in rows]
+    hits = [(d, _as_item(r)) for d, r in hits if d <= radius_m]
+    hits.sort(key=lambda h: h[0])
+    return hits
+
+
+def within(scope: str, lat: float, lon: float, radius_m: float) -> List[Dict[str, Any]]:
+    """Indexed POIs in `scope` within `radius_m` of (lat, lon), nearest first."""
+    return [it for _, it in _distances(scope, lat, lon, radius_m)]
+
+
+def nearest(scope: str, lat: float, lon: float, k: int, max_radius_m: float = 50000) -> List[Dict[str, Any]]:
+    """The `k` indexed POIs in `scope` nearest to (lat, lon), searched out to `max_radius_m`."""
+    return [it for _, it in _distances(scope, lat, lon, max_radius_m)[:k]]
+
+
+def _covered(scope: str, lat: float, lon: float, radius_m: float) -> bool:
+    db = _db()
+    if db is None:
+        return False
+    fresh_after = time.time() - settings.poi_cache_fresh_s
+    with _lock:
+        circles = db.execute(
+            "SELECT lat, lon, radius_m FROM coverage WHERE scope = ? AND fetched_at >= ?", (scope, fresh_after)
+        ).fetchall()
+    return any(haversine_m(clat, clon, lat, lon) + radius_m <= cr for clat, clon, cr in circles)
+
+
+def lookup(scope: str, lat: float, lon: float, radius_m: float, limit: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    The `limit` nearest POIs within `radius_m`, or None unless fresh coverage
+    proves no unseen POI could be among them.
+    """
+    try:
+        hits = _distances(scope, lat, lon, radius_m)[:limit]
+        needed = hits[-1][0] if len(hits) >= limit else radius_m
+        if not _covered(scope, lat, lon, needed):
+            return None
+    except Exception:
+        return None
+    return [it for _, it in hits]
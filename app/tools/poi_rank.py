@@ -0,0 +1,350 @@
+"""
+Cross-source POI dedupe and ranking.
+
+OpenTripMap, Overpass and Wikipedia name one place in different ways
+("Red Fort", "Lal Qila (Red Fort)", "Lodi Gardens" / "Lodhi Garden"). Names
+are normalized into tokens (casefolded, apostrophes dropped, other
+punctuation and stopwords removed) and into a spelling skeleton (tokens
+without vowels, "h", doubled letters or a plural "s"), which absorbs
+transliteration variants but keeps consonants apart ("Mary's" / "Mark's").
+Two items count as the same place when:
+
+  - their tokens are equal, wherever they are (the exact-name dedupe this
+    replaces)
+  - they are within FAR_M (big parks and forts whose centroids disagree) and
+    their skeletons are equal
+  - they are within NEAR_M, share a token that is not a generic place word
+    (museum, church, park, ...), and one token set contains the other or
+    their Jaccard is >= 0.5 -- unless the tokens they do not share name
+    different kinds of place ("Hauz Khas Lake" / "Hauz Khas Fort")
+
+Names, skeletons and sources become integer ids in one pass each, and
+candidate pairs come from one vectorized latitude sweep, so skeleton matches
+are compared over all candidate pairs at once. Only the few pairs within
+NEAR_M with different skeletons that share a specific token are checked in
+Python. Clusters are found by label propagation over the linked pairs, the
+member that represents each one and its bonus are picked with sorts over
+the member arrays, and clusters are ranked by one score that spans all
+sources.
+"""
+import math
+import operator
+import string
+from itertools import count, repeat
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+NEAR_M = 300.0
+FAR_M = 1500.0
+_EARTH_M = 6371000.0
+
+_PUNCT = str.maketrans({**{c: " " for c in string.punctuation + "\r\t"}, "'": None, "’": None})
+_ASCII_PUNCT = bytes.maketrans(
+    (string.punctuation + "\r\t").encode(), b" " * len(string.punctuation + "\r\t")
+)  # same as _PUNCT, for bytes.translate(_ASCII_PUNCT, b"'")
+_STOPWORDS = frozenset({"the", "of", "and", "a", "an", "at", "in"})
+_SKELETON = str.maketrans("", "", "aeiouh")
+_DOUBLED = [c + c for c in "lmnprst"]  # the doubled consonants transliterations disagree on most
+_BLANK = " "
+
+# Words that say what kind of place it is, not which one; sharing only these proves nothing
+_GENERIC = frozenset(
+    "museum museums church temple mandir masjid mosque cathedral gurdwara park parks garden gardens "
+    "market bazaar fort palace lake river beach zoo gallery station square bridge tower gate "
+    "monument memorial tomb restaurant cafe hotel hall house centre center road street "
+    "st saint sri shri national city old new".split()
+)
+_UNSPECIFIC = _GENERIC | _STOPWORDS
+
+# Which member's name/fields represent a merged cluster
+_SOURCE_PRIORITY = {"opentripmap": 3, "wikipedia": 2, "overpass": 1}
+_SOURCE_BONUS = {"wikipedia": 0.15, "opentripmap": 0.1}
+
+
+def _squeeze(text: str) -> str:
+    while "  " in text:
+        text = text.replace("  ", " ")
+    return text
+
+
+def _names(raw: List[str]) -> Tuple[List[str], List[str]]:
+    """
+    Normalized name and spelling skeleton per name: tokens with one space
+    before, between and after them (" red fort "), so equal token sequences
+    are equal strings and a name without tokens is _BLANK. All the work is
+    str-method passes over every name joined into one text, which is several
+    times faster than per-name processing or regexes; ASCII text (the usual
+    case) goes through the table-driven bytes.translate instead.
+    """
+    text = " " + " \n ".join(raw) + " "
+    if text.isascii():
+        text = _squeeze(text.lower().encode().translate(_ASCII_PUNCT, b"'").decode())
+        skeleton = text.encode().translate(None, b"aeiouh").decode()
+    else:
+        text = _squeeze(text.casefold().translate(_PUNCT))
+        skeleton = text.translate(_SKELETON)
+    for pair in _DOUBLED:
+        skeleton = skeleton.replace(pair, pair[0])
+    skeleton = _squeeze(skeleton.replace("s ", " "))
+    return text.split("\n"), skeleton.split("\n")
+
+
+def _positions(items: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(items)
+    lat = np.fromiter(map(dict.get, items, repeat("lat")), dtype=np.float64, count=n)  # None -> nan
+    lon = np.fromiter(map(dict.get, items, repeat("lon")), dtype=np.float64, count=n)
+    return lat, lon
+
+
+def _candidate_pairs(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (i, j, metres) for every pair with both positions known and at most FAR_M
+    apart. A sweep over items sorted by latitude only measures pairs inside one
+    FAR_M band instead of all n^2.
+    """
+    empty = np.empty(0, dtype=np.intp)
+    idx = np.flatnonzero(np.isfinite(lat + lon))
+    if len(idx) < 2:
+        return empty, empty, np.empty(0)
+    # Equirectangular metres; fine at city scale
+    lat0 = lat[idx[0]]
+    y = (lat[idx] - lat0) * (math.pi / 180 * _EARTH_M)
+    order = np.argsort(y, kind="stable")
+    idx, y = idx[order], y[order]
+    x = lon[idx] * (math.pi / 180 * _EARTH_M * math.cos(math.radians(lat0)))
+
+    # Partners of sorted item a are a+1 .. end[a]-1 (same latitude band)
+    start = np.arange(1, len(y) + 1)
+    counts = np.searchsorted(y, y + FAR_M, side="right") - start
+    total = int(counts.sum())
+    if not total:
+        return empty, empty, np.empty(0)
+    a = np.repeat(np.arange(len(y)), counts)
+    b = np.arange(total) + np.repeat(start - (np.cumsum(counts) - counts), counts)
+    d2 = (x[a] - x[b]) ** 2 + (y[a] - y[b]) ** 2
+    keep = np.flatnonzero(d2 <= FAR_M * FAR_M)
+    return idx[a[keep]], idx[b[keep]], np.sqrt(d2[keep])
+
+
+def _same_place(a: FrozenSet[str], b: FrozenSet[str]) -> bool:
+    """Token rule for two token sets within NEAR_M (see the module docstring)."""
+    shared = a & b
+    if shared <= _UNSPECIFIC:  # most pairs stop here
+        return False
+    ta = a - _STOPWORDS
+    tb = b - _STOPWORDS
+    if (ta - tb) & _GENERIC and (tb - ta) & _GENERIC:
+        return False
+    shared -= _STOPWORDS
+    return len(shared) == min(len(ta), len(tb)) or 2 * len(shared) >= len(ta | tb)
+
+
+def _first_index(keys: List[str]) -> np.ndarray:
+    """
+    For each key, the index of its first occurrence (a stable id for equality
+    tests). _BLANK keys match nothing, so each one keeps its own index.
+    """
+    first: Dict[str, int] = {}
+    ids = np.fromiter(map(first.setdefault, keys, count()), dtype=np.intp, count=len(keys))
+    if _BLANK in first:
+        blank = ids == first[_BLANK]
+        ids[blank] = np.flatnonzero(blank)
+    return ids
+
+
+def _links(raw: List[str], lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Name id per item (equal names are the same place wherever they are), and
+    index arrays (i, j) of the other pairs of items that name the same place.
+    """
+    names, skeletons = _names(raw)
+    name_id = _first_index(names)
+    i, j, dist = _candidate_pairs(lat, lon)
+    if not len(i):
+        return name_id, i, j
+    skel_id = _first_index(skeletons)
+    same = skel_id[i] == skel_id[j]
+    near = np.flatnonzero((dist <= NEAR_M) & ~same)
+    near_i, near_j = i[near].tolist(), j[near].tolist()
+    # Token sets only for the items that take part in a near pair; most pairs
+    # share no specific token and are ruled out before `_same_place`
+    tokens = {k: frozenset(names[k].split()) for k in {*near_i, *near_j}}
+    specific = {k: t - _UNSPECIFIC for k, t in tokens.items()}
+    hits = [
+        n for n, a, b in zip(near.tolist(), near_i, near_j)
+        if not specific[a].isdisjoint(specific[b]) and _same_place(tokens[a], tokens[b])
+    ]
+    same[hits] = True
+    return name_id, i[same], j[same]
+
+
+def _clusters(label: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    """
+    Connected components of the items linked by (i, j), starting from `label`
+    (an index per item, equal for items already known to be together). Each
+    item ends up labelled with the first item of its component.
+    """
+    while len(i):
+        li, lj = label[i], label[j]
+        if np.array_equal(li, lj):
+            break
+        # Point every label at the smallest label it is linked to, then follow the pointers
+        low = np.arange(len(label))
+        lo = np.minimum(li, lj)
+        np.minimum.at(low, li, lo)
+        np.minimum.at(low, lj, lo)
+        while True:
+            nxt = low[low]
+            if np.array_equal(nxt, low):
+                break
+            low = nxt
+        label = low[label]
+    return label
+
+
+def _rate(item: Dict[str, Any]) -> float:
+    try:
+        return float(item.get("rate") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _sources(items: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per item: a source id (the index of the first item from the same source),
+    the source's priority and its score bonus.
+    """
+    first: Dict[Any, int] = {}
+    source = np.fromiter(map(first.setdefault, map(dict.get, items, repeat("source")), count()), dtype=np.intp, count=len(items))
+    prio = np.zeros(len(items), dtype=np.intp)
+    bonus = np.zeros(len(items))
+    at = list(first.values())
+    prio[at] = [_SOURCE_PRIORITY.get(s, 0) for s in first]
+    bonus[at] = [_SOURCE_BONUS.get(s, 0.0) for s in first]
+    return source, prio[source], bonus[source]
+
+
+def _rates(items: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """`_rate` of every item (one conversion unless some rate is malformed), and which have no rate."""
+    raw = [it.get("rate") for it in items]
+    unrated = np.fromiter(map(operator.is_, raw, repeat(None)), dtype=bool, count=len(raw))
+    try:
+        rate = np.fromiter(raw, dtype=np.float64, count=len(raw))
+    except (TypeError, ValueError):
+        return np.array([_rate(it) for it in items]), unrated
+    rate[unrated | (rate == 0)] = 0.0  # None -> 0, and no -0.0
+    return rate, unrated
+
+
+def _merge(
+    items: List[Dict[str, Any]],
+    label: np.ndarray,
+    names: List[str],
+    source: np.ndarray,
+    prio: np.ndarray,
+    bonus: np.ndarray,
+    rate: np.ndarray,
+    unrated: np.ndarray,
+) -> Tuple[List[int], List[Dict[str, Any]], np.ndarray, np.ndarray]:
+    """
+    For every cluster of two or more items (by `label`, see `_clusters`): its
+    first index, the merged row, the row's rate and the score bonus for the
+    sources that list it. The row is the best-sourced member (source
+    priority, then rate, then the shorter name, then input order) with gaps
+    (position, kinds, link) filled from the others in input order and the best
+    rate any member has. The other arguments are per-item columns (see
+    `_sources` and `_rates`).
+    """
+    n = len(items)
+    joined = label != np.arange(n)
+    member = joined.copy()
+    member[label[joined]] = True
+    m = np.flatnonzero(member)
+    m = m[np.argsort(label[m], kind="stable")]  # cluster by cluster, each in input order
+    cluster = label[m]
+    starts = np.concatenate(([True], cluster[1:] != cluster[:-1]))
+    gid = np.cumsum(starts) - 1
+    first_slot = np.flatnonzero(starts)
+
+    length = np.fromiter(map(len, names), dtype=np.intp, count=n)
+    # The cluster is the primary sort key, so each winner lands on its cluster's first slot
+    best = m[np.lexsort((m, length[m], -rate[m], -prio[m], gid))[first_slot]]
+    top = m[np.lexsort((m, -rate[m], unrated[m], gid))[first_slot]]
+
+    # Bonus: 0.3 per extra source plus each distinct source's own bonus
+    # (a source id is an item from that source, so bonus[source_of] is that source's bonus)
+    gid_of, source_of = np.divmod(np.unique(gid * n + source[m]), n)
+    groups = len(first_slot)
+    extra = 0.3 * (np.bincount(gid_of, minlength=groups) - 1) + np.bincount(gid_of, bonus[source_of], groups)
+
+    rows: List[Dict[str, Any]] = []
+    members = m.tolist()
+    bounds = first_slot.tolist() + [len(members)]
+    rated = ~unrated[top]
+    for lo, hi, b, t, has_rate in zip(bounds, bounds[1:], best.tolist(), top.tolist(), rated.tolist()):
+        merged = dict(items[b])
+        for key in ("lat", "lon", "kinds", "otm"):
+            if merged.get(key) is None:
+                for k in members[lo:hi]:
+                    value = items[k].get(key)
+                    if value is not None:
+                        merged[key] = value
+                        break
+        if has_rate:
+            merged["rate"] = items[t]["rate"]
+        rows.append(merged)
+    # An unrated top means no member has a rate, so the row's rate counts as 0 either way
+    return cluster[first_slot].tolist(), rows, rate[top], extra
+
+
+def _scores(
+    rate: np.ndarray,
+    bonus: np.ndarray,
+    center: Optional[Tuple[float, float]],
+    lat: np.ndarray,
+    lon: np.ndarray,
+) -> np.ndarray:
+    """
+    One scale for every source: OTM rating (0-7) as the base, plus `bonus`
+    (sources that list the place) and a bonus for being close to the city
+    centre.
+    """
+    score = np.minimum(rate, 7.0) / 7.0 + bonus
+    if center is not None:
+        metres = math.pi / 180 * _EARTH_M
+        dy = (lat - center[0]) * metres
+        dx = (lon - center[1]) * (metres * math.cos(math.radians(center[0])))
+        score += np.fmax(0.1 * np.exp(np.hypot(dx, dy) * -1e-4), 0.0)  # fmax: no position (nan) -> 0
+    return score
+
+
+def dedupe_and_rank(
+    items: List[Dict[str, Any]], center: Optional[Tuple[float, float]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Merge items that are the same place across sources and return the merged
+    items best first (ties keep their input order). Items are never mutated.
+    """
+    items = [it for it in items if it.get("name")]
+    if len(items) < 2:
+        return [dict(it) for it in items]
+    names = list(map(str, map(operator.itemgetter("name"), items)))
+    source, prio, bonus = _sources(items)
+    lat, lon = _positions(items)
+    rate, unrated = _rates(items)
+
+    # Clusters are represented by their first member; the others drop out
+    label = _clusters(*_links(names, lat, lon))
+    keep = label == np.arange(len(items))
+    merged: Dict[int, Dict[str, Any]] = {}
+    if not keep.all():
+        firsts, rows, row_rate, row_bonus = _merge(items, label, names, source, prio, bonus, rate, unrated)
+        merged = dict(zip(firsts, rows))
+        rate[firsts], bonus[firsts] = row_rate, row_bonus
+        lat[firsts], lon[firsts] = _positions(rows)
+
+    kept = np.flatnonzero(keep)
+    score = _scores(rate, bonus, center, lat, lon)[kept]
+    order = kept[np.argsort(-score, kind="stable")].tolist()
+    return [merged[k] if k in merged else dict(items[k]) for k in order]
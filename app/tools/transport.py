@@ -0,0 +1,268 @@
+"""
+Shared HTTP transport for every tool.
+
+One long-lived httpx.Client (and one httpx.AsyncClient per event loop) per
+upstream host, so repeat calls reuse keep-alive connections instead of paying
+a TCP+TLS handshake each time. Each host gets its own connection limit.
+"""
+import asyncio
+import importlib.util
+import json
+import random
+import threading
+import time
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from ..config import settings
+from ..utils import tracing
+from ..utils.singleflight import SingleFlight
+
+if TYPE_CHECKING:  # imported on first request instead: httpx alone is a large share of CLI cold start
+    import httpx
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_transport_override: Optional[Any] = None
+_flights = SingleFlight()
+_clients: "Dict[str, httpx.Client]" = {}
+_clients_lock = threading.Lock()
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_enabled() -> bool:
+    # HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+    return settings.http2 and importlib.util.find_spec("h2") is not None
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    import httpx
+
+    if _transport_override is not None:
+        return {
+            "transport": _transport_override,
+            "timeout": httpx.Timeout(settings.http_timeout_s),
+            "headers": {"User-Agent": settings.http_user_agent},
+            "follow_redirects": True,
+        }
+    return {
+        "http2": _http2_enabled(),
+        "timeout": httpx.Timeout(settings.http_timeout_s),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections_per_host,
+            max_keepalive_connections=settings.http_max_connections_per_host,
+            keepalive_expiry=settings.http_keepalive_s,
+        ),
+        "headers": {"User-Agent": settings.http_user_agent},
+        "follow_redirects": True,
+    }
+
+
+def get_client(url: str) -> "httpx.Client":
+    host = urlsplit(url).netloc
+    client = _clients.get(host)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(host)
+            if client is None:
+                import httpx
+
+                client = httpx.Client(**_client_kwargs())
+                _clients[host] = client
+    return client
+
+
+def get_async_client(url: str) -> "httpx.AsyncClient":
+    # AsyncClients are bound to the loop that created them
+    loop = asyncio.get_running_loop()
+    per_loop = _async_clients.setdefault(loop, {})
+    host = urlsplit(url).netloc
+    client = per_loop.get(host)
+    if client is None:
+        import httpx
+
+        client = httpx.AsyncClient(**_client_kwargs())
+        per_loop[host] = client
+    return client
+
+
+def _retry_delay(attempt: int, resp: "Optional[httpx.Response]") -> float:
+    if resp is not None:
+        retry_after = resp.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), settings.http_max_backoff_s)
+            except ValueError:
+                pass
+    backoff = settings.http_backoff_s * (2 ** attempt)
+    return min(backoff, settings.http_max_backoff_s) * (0.5 + random.random() / 2)
+
+
+def _flight_key(method: str, url: str, kwargs: Dict[str, Any]) -> str:
+    parts = [method, url]
+    for name in ("params", "data", "json"):
+        value = kwargs.get(name)
+        if value is not None:
+            parts.append(f"{name}={json.dumps(value, sort_keys=True, default=str)}")
+    return "\0".join(parts)
+
+
+def _send(method: str, url: str, kwargs: Dict[str, Any], retry_timeouts: bool = True) -> "httpx.Response":
+    import httpx
+
+    client = get_client(url)
+    for attempt in range(settings.http_retries + 1):
+        last = attempt == settings.http_retries
+        try:
+            resp = client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if last or (not retry_timeouts and isinstance(e, httpx.TimeoutException)):
+                raise
+            time.sleep(_retry_delay(attempt, None))
+            continue
+        retry = resp.status_code in RETRY_STATUSES and (retry_timeouts or resp.status_code != 504)
+        if retry and not last:
+            time.sleep(_retry_delay(attempt, resp))
+            continue
+        tracing.annotate(status=resp.status_code, bytes=len(resp.content), attempts=attempt + 1)
+        return resp
+    raise RuntimeError("unreachable")
+
+
+async def _asend(method: str, url: str, kwargs: Dict[str, Any], retry_timeouts: bool = True) -> "httpx.Response":
+    import httpx
+
+    client = get_async_client(url)
+    for attempt in range(settings.http_retries + 1):
+        last = attempt == settings.http_retries
+        try:
+            resp = await client.request(method, url, **kwargs)
+        except httpx.TransportError as e:
+            if last or (not retry_timeouts and isinstance(e, httpx.TimeoutException)):
+                raise
+            await asyncio.sleep(_retry_delay(attempt, None))
+            continue
+        retry = resp.status_code in RETRY_STATUSES and (retry_timeouts or resp.status_code != 504)
+        if retry and not last:
+            await asyncio.sleep(_retry_delay(attempt, resp))
+            continue
+        tracing.annotate(status=resp.status_code, bytes=len(resp.content), attempts=attempt + 1)
+        return resp
+    raise RuntimeError("unreachable")
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[float] = None,
+    coalesce: Optional[bool] = None,
+    retry_timeouts: bool = True,
+    **kwargs: Any,
+) -> "httpx.Response":
+    """
+    Send a request on the pooled client for `url`'s host.
+    Transport errors and 429/5xx are retried with jittered backoff (Retry-After wins).
+    The final response is returned as-is; callers still call raise_for_status().
+
+    Identical requests already in flight are joined rather than re-sent
+    (single-flight): GETs by default, read-only POSTs with `coalesce=True`.
+    Joined callers share the leader's response or exception.
+
+    `retry_timeouts=False` returns a 504 and raises a client timeout without
+    retrying them. Use it where the server enforces its own time limit, since a
+    retry would just spend that time again.
+    """
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if coalesce is None:
+        coalesce = method == "GET"
+    with tracing.span(f"http {method}", host=urlsplit(url).netloc) as sp:
+        if not coalesce:
+            return _send(method, url, kwargs, retry_timeouts)
+        led = []
+        resp = _flights.do(
+            _flight_key(method, url, kwargs), lambda: led.append(1) or _send(method, url, kwargs, retry_timeouts)
+        )
+        if not led:
+            sp.set(coalesced=True)
+        return resp
+
+
+async def arequest(
+    method: str,
+    url: str,
+    *,
+    timeout: Optional[float] = None,
+    coalesce: Optional[bool] = None,
+    retry_timeouts: bool = True,
+    **kwargs: Any,
+) -> "httpx.Response":
+    """Async twin of `request`."""
+    if timeout is not None:
+        kwargs["timeout"] = timeout
+    if coalesce is None:
+        coalesce = method == "GET"
+    with tracing.span(f"http {method}", host=urlsplit(url).netloc) as sp:
+        if not coalesce:
+            return await _asend(method, url, kwargs, retry_timeouts)
+        led = []
+
+        def _lead():
+            led.append(1)
+            return _asend(method, url, kwargs, retry_timeouts)
+
+        resp = await _flights.do_async(_flight_key(method, url, kwargs), _lead)
+        if not led:
+            sp.set(coalesced=True)
+        return resp
+
+
+def coalesced_count() -> int:
+    """How many requests were served by joining an identical in-flight one."""
+    return _flights.coalesced
+
+
+def get(url: str, **kwargs: Any) -> "httpx.Response":
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> "httpx.Response":
+    return request("POST", url, **kwargs)
+
+
+async def aget(url: str, **kwargs: Any) -> "httpx.Response":
+    return await arequest("GET", url, **kwargs)
+
+
+async def apost(url: str, **kwargs: Any) -> "httpx.Response":
+    return await arequest("POST", url, **kwargs)
+
+
+def use_transport(transport: Optional[Any]) -> None:
+    """
+    Send every request through `transport` (an httpx sync+async transport, e.g.
+    recorded fixtures for benchmarks) instead of the network; None restores it.
+    Existing pooled clients are dropped.
+    """
+    global _transport_override
+    close()
+    _async_clients.clear()
+    _transport_override = transport
+
+
+def close() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose() -> None:
+    """Close the AsyncClients that belong to the running loop."""
+    per_loop = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in per_loop.values():
+        await client.aclose()
@@ -1,18 +1,28 @@
-import httpx
-from typing import Dict, Any, List
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+from ..config import settings
+from ..utils import tracing
+from ..utils.cache import SQLiteCache
+from ..utils.concurrency import get_pool
+from ..utils.tracing import propagate
+from . import geocache
+from . import transport
 
 GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
 FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
 
+_forecast_store: Optional[SQLiteCache] = None
+_forecast_lock = threading.Lock()
 
-def geocode_city(city: str) -> Dict[str, Any]:
-    """
-    Geocode a city name using Open-Meteo geocoding.
-    Returns: {"name": str, "lat": float, "lon": float, "country": str?}
-    """
-    r = httpx.get(GEOCODE_URL, params={"name": city, "count": 1}, timeout=15)
-    r.raise_for_status()
-    d = r.json()
+
+def _parse_geocode(city: str, d: Dict[str, Any]) -> Dict[str, Any]:
     results = d.get("results", [])
     if not results:
         raise ValueError(f"City not found: {city}")
@@ -25,6 +35,172 @@ def geocode_city(city: str) -> Dict[str, Any]:
     }
 
 
+def geocode_city(city: str) -> Dict[str, Any]:
+    """
+    Geocode a city name using Open-Meteo geocoding.
+    Returns: {"name": str, "lat": float, "lon": float, "country": str?}
+    Results are kept in the shared on-disk geocode cache.
+    """
+    cached = geocache.get("open-meteo", city)
+    if cached:
+        return cached
+    r = transport.get(GEOCODE_URL, params={"name": city, "count": 1}, timeout=15)
+    r.raise_for_status()
+    g = _parse_geocode(city, r.json())
+    geocache.put("open-meteo", city, g)
+    return g
+
+
+async def geocode_city_async(city: str) -> Dict[str, Any]:
+    # The geocode cache is SQLite: look it up on a worker thread, not on the loop
+    cached = await asyncio.to_thread(geocache.get, "open-meteo", city)
+    if cached:
+        return cached
+    r = await transport.aget(GEOCODE_URL, params={"name": city, "count": 1}, timeout=15)
+    r.raise_for_status()
+    g = _parse_geocode(city, r.json())
+    await asyncio.to_thread(geocache.put, "open-meteo", city, g)
+    return g
+
+
+def _daily_params(lat: float, lon: float, start_date: str, end_date: str) -> Dict[str, Any]:
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "weathercode"],
+        "timezone": "auto",
+        "start_date": start_date,
+        "end_date": end_date,
+    }
+
+
+def _current_params(lat: float, lon: float) -> Dict[str, Any]:
+    return {
+        "latitude": lat,
+        "longitude": lon,
+        "current": "temperature_2m,apparent_temperature,precipitation",
+        "timezone": "auto",
+    }
+
+
+def _parse_daily(d: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    daily = d.get("daily", {})
+    times: List[str] = daily.get("time", []) or []
+
+    tmin = daily.get("temperature_2m_min", []) or []
+    tmax = daily.get("temperature_2m_max", []) or []
+    precip = daily.get("precipitation_sum", []) or []
+    codes = daily.get("weathercode", []) or []
+
+    if not (times and (tmin or tmax or precip or codes)):
+        return None
+    days = []
+    n = len(times)
+    for i in range(n):
+        days.append(
+            {
+                "date": times[i],
+                "tmin_c": _safe_get(tmin, i),
+                "tmax_c": _safe_get(tmax, i),
+                "precip_mm": _safe_get(precip, i),
+                "summary": _weather_code_to_summary(_safe_get(codes, i)),
+            }
+        )
+    return days
+
+
+def _current_as_day(d: Dict[str, Any], start_date: str) -> Dict[str, Any]:
+    cur = d.get("current", {}) or {}
+    temp = cur.get("temperature_2m")
+    prec = cur.get("precipitation")
+    # Use start date as the row date 
+    return {
+        "date": start_date,
+        "tmin_c": temp,
+        "tmax_c": temp,
+        "precip_mm": prec,
+        "summary": f"{temp}°C" if temp is not None else "",
+    }
+
+
+# Forecast cache: one row per (rounded lat/lon, date), expiring at the next model update
+
+def _forecast_cache() -> Optional[SQLiteCache]:
+    global _forecast_store
+    if not settings.cache_enabled:
+        return None
+    if _forecast_store is None:
+        with _forecast_lock:
+            if _forecast_store is None:
+                _forecast_store = SQLiteCache(
+                    os.path.join(settings.cache_dir, "forecast.sqlite3"),
+                    table="forecast_days",
+                    max_entries=settings.forecast_cache_max_entries,
+                )
+    return _forecast_store
+
+
+def _forecast_ttl(now: Optional[float] = None) -> float:
+    """Seconds until the next Open-Meteo model update (UTC-aligned cycles + publish lag)."""
+    now = time.time() if now is None else now
+    period = settings.forecast_update_hours * 3600
+    lag = settings.forecast_update_lag_min * 60
+    next_update = ((now - lag) // period + 1) * period + lag
+    return max(60.0, next_update - now)
+
+
+def _day_key(lat: float, lon: float, day: str) -> str:
+    p = settings.forecast_coord_precision
+    return f"{round(lat, p):.{p}f},{round(lon, p):.{p}f}:{day}"
+
+
+def _window_dates(start_date: str, end_date: str) -> List[str]:
+    """ISO dates in the window, or [] if the window can't be parsed (cache is bypassed)."""
+    try:
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+    except (TypeError, ValueError):
+        return []
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def _cached_days(lat: float, lon: float, dates: List[str]) -> Dict[str, Dict[str, Any]]:
+    store = _forecast_cache()
+    found: Dict[str, Dict[str, Any]] = {}
+    if store is None:
+        return found
+    with tracing.span("cache.forecast", days=len(dates)) as sp:
+        for d in dates:
+            try:
+                day = store.get(_day_key(lat, lon, d))
+            except Exception:
+                day = None
+            if day:
+                found[d] = day
+        sp.set(hit=len(found))
+    return found
+
+
+def _store_days(lat: float, lon: float, days: List[Dict[str, Any]]) -> None:
+    store = _forecast_cache()
+    if store is None:
+        return
+    ttl = _forecast_ttl()
+    for day in days:
+        try:
+            store.set(_day_key(lat, lon, day["date"]), day, ttl=ttl)
+        except Exception:
+            pass
+
+
+def _merge_days(
+    dates: List[str], cached: Dict[str, Dict[str, Any]], fetched: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    if not dates:
+        return fetched
+    by_date = {**cached, **{d["date"]: d for d in fetched}}
+    return [by_date[d] for d in dates if d in by_date]
+
+
 def daily_summary(city: str, start_date: str, end_date: str) -> Dict[str, Any]:
     """
     Live daily weather summary using Open-Meteo.
@@ -37,82 +213,215 @@ def daily_summary(city: str, start_date: str, end_date: str) -> Dict[str, Any]:
          ...
       ]
     }
+    Days already in the forecast cache are not re-downloaded.
     Falls back to current weather if daily arrays are unavailable.
     """
     g = geocode_city(city)
     lat, lon = g["lat"], g["lon"]
 
-    params = {
-        "latitude": lat,
-        "longitude": lon,
-        "daily": ["temperature_2m_max", "temperature_2m_min", "precipitation_sum", "weathercode"],
-        "timezone": "auto",
-        "start_date": start_date,
-        "end_date": end_date,
-    }
+    # Only the days missing from the forecast cache go over the wire, in one ranged call
+    dates = _window_dates(start_date, end_date)
+    cached = _cached_days(lat, lon, dates)
+    missing = [d for d in dates if d not in cached]
+    fetched: List[Dict[str, Any]] = []
+    if missing or not dates:
+        try:
+            lo, hi = (missing[0], missing[-1]) if missing else (start_date, end_date)
+            r = transport.get(FORECAST_URL, params=_daily_params(lat, lon, lo, hi), timeout=20)
+            r.raise_for_status()
+            fetched = _parse_daily(r.json()) or []
+            _store_days(lat, lon, fetched)
+        except Exception:
+            pass
+    days = _merge_days(dates, cached, fetched)
+    if days:
+        return {"city": g.get("name", city), "days": days}
 
+    # Fallback
     try:
-        r = httpx.get(FORECAST_URL, params=params, timeout=20)
-        r.raise_for_status()
-        d = r.json()
-        daily = d.get("daily", {})
-        times: List[str] = daily.get("time", []) or []
-
-        tmin = daily.get("temperature_2m_min", []) or []
-        tmax = daily.get("temperature_2m_max", []) or []
-        precip = daily.get("precipitation_sum", []) or []
-        codes = daily.get("weathercode", []) or []
-
-        if times and (tmin or tmax or precip or codes):
-            days = []
-            n = len(times)
-            for i in range(n):
-                days.append(
-                    {
-                        "date": times[i],
-                        "tmin_c": _safe_get(tmin, i),
-                        "tmax_c": _safe_get(tmax, i),
-                        "precip_mm": _safe_get(precip, i),
-                        "summary": _weather_code_to_summary(_safe_get(codes, i)),
-                    }
-                )
-            return {"city": g.get("name", city), "days": days}
-    except Exception:
-        pass
+        rc = transport.get(FORECAST_URL, params=_current_params(lat, lon), timeout=15)
+        rc.raise_for_status()
+        return {"city": g.get("name", city), "days": [_current_as_day(rc.json(), start_date)]}
+    except Exception as e:
+        return {"city": g.get("name", city), "error": f"weather fetch failed: {e}", "days": []}
+
+
+async def daily_summary_async(city: str, start_date: str, end_date: str) -> Dict[str, Any]:
+    """Async twin of `daily_summary` (same return shape)."""
+    g = await geocode_city_async(city)
+    lat, lon = g["lat"], g["lon"]
+
+    dates = _window_dates(start_date, end_date)
+    cached = await asyncio.to_thread(_cached_days, lat, lon, dates)
+    missing = [d for d in dates if d not in cached]
+    fetched: List[Dict[str, Any]] = []
+    if missing or not dates:
+        try:
+            lo, hi = (missing[0], missing[-1]) if missing else (start_date, end_date)
+            r = await transport.aget(FORECAST_URL, params=_daily_params(lat, lon, lo, hi), timeout=20)
+            r.raise_for_status()
+            fetched = _parse_daily(r.json()) or []
+            await asyncio.to_thread(_store_days, lat, lon, fetched)
+        except Exception:
+            pass
+    days = _merge_days(dates, cached, fetched)
+    if days:
+        return {"city": g.get("name", city), "days": days}
 
-    # Fallback
     try:
-        rc = httpx.get(
-            FORECAST_URL,
-            params={
-                "latitude": lat,
-                "longitude": lon,
-                "current": "temperature_2m,apparent_temperature,precipitation",
-                "timezone": "auto",
-            },
-            timeout=15,
-        )
+        rc = await transport.aget(FORECAST_URL, params=_current_params(lat, lon), timeout=15)
         rc.raise_for_status()
-        cur = rc.json().get("current", {}) or {}
-        temp = cur.get("temperature_2m")
-        prec = cur.get("precipitation")
-        # Use start date as the row date 
-        return {
-            "city": g.get("name", city),
-            "days": [
-                {
-                    "date": start_date,
-                    "tmin_c": temp,
-                    "tmax_c": temp,
-                    "precip_mm": prec,
-                    "summary": f"{temp}°C" if temp is not None else "",
-                }
-            ],
-        }
+        return {"city": g.get("name", city), "days": [_current_as_day(rc.json(), start_date)]}
     except Exception as e:
         return {"city": g.get("name", city), "error": f"weather fetch failed: {e}", "days": []}
 
 
+# Batched forecasts: Open-Meteo takes comma-separated latitude/longitude lists
+# and answers with one object per location, in order.
+
+Geo = Union[Dict[str, Any], Exception]
+
+
+def _batch_params(geos: List[Dict[str, Any]], start_date: str, end_date: str) -> Dict[str, Any]:
+    params = _daily_params(0.0, 0.0, start_date, end_date)
+    params["latitude"] = ",".join(str(g["lat"]) for g in geos)
+    params["longitude"] = ",".join(str(g["lon"]) for g in geos)
+    return params
+
+
+def _split_batch(payload: Any, n: int) -> List[Dict[str, Any]]:
+    """Per-location forecasts from a batched response (a lone location comes back as a bare object)."""
+    parts = payload if isinstance(payload, list) else [payload]
+    if len(parts) != n:
+        raise ValueError(f"forecast batch returned {len(parts)} locations for {n}")
+    return parts
+
+
+def _batch_plan(
+    geos: List[Geo], dates: List[str], start_date: str, end_date: str
+) -> Tuple[List[Dict[str, Dict[str, Any]]], List[Tuple[str, str, List[int]]]]:
+    """
+    Cached days per city, and the forecast requests still needed: one
+    (start, end, city indexes) per window of missing days, chunked to
+    FORECAST_BATCH_SIZE locations.
+    """
+    cached: List[Dict[str, Dict[str, Any]]] = []
+    windows: Dict[Tuple[str, str], List[int]] = {}
+    for k, g in enumerate(geos):
+        if isinstance(g, Exception):
+            cached.append({})
+            continue
+        found = _cached_days(g["lat"], g["lon"], dates)
+        cached.append(found)
+        missing = [d for d in dates if d not in found]
+        if missing or not dates:
+            window = (missing[0], missing[-1]) if missing else (start_date, end_date)
+            windows.setdefault(window, []).append(k)
+    size = max(1, settings.forecast_batch_size)
+    requests = [
+        (lo, hi, ks[i:i + size])
+        for (lo, hi), ks in windows.items()
+        for i in range(0, len(ks), size)
+    ]
+    return cached, requests
+
+
+def _store_batch(geos: List[Geo], chunk: List[int], payload: Any, fetched: Dict[int, List[Dict[str, Any]]]) -> None:
+    for k, d in zip(chunk, _split_batch(payload, len(chunk))):
+        days = _parse_daily(d) or []
+        _store_days(geos[k]["lat"], geos[k]["lon"], days)
+        fetched[k] = days
+
+
+def _batch_results(
+    cities: List[str],
+    geos: List[Geo],
+    dates: List[str],
+    cached: List[Dict[str, Dict[str, Any]]],
+    fetched: Dict[int, List[Dict[str, Any]]],
+) -> List[Optional[Dict[str, Any]]]:
+    """`daily_summary` shapes in input order; None where the city needs the single-city fallback."""
+    out: List[Optional[Dict[str, Any]]] = []
+    for k, city in enumerate(cities):
+        g = geos[k]
+        if isinstance(g, Exception):
+            out.append({"city": city, "error": f"geocode failed: {g}", "days": []})
+            continue
+        days = _merge_days(dates, cached[k], fetched.get(k, []))
+        out.append({"city": g.get("name", city), "days": days} if days else None)
+    return out
+
+
+def _geocode_or_error(city: str) -> Geo:
+    try:
+        return geocode_city(city)
+    except Exception as e:
+        return e
+
+
+def daily_summary_many(cities: List[str], start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """
+    `daily_summary` for several cities, in input order, with a fraction of the
+    round-trips. Geocodes go through the geocode cache (misses in parallel),
+    days already in the forecast cache are skipped, and the rest is fetched in
+    one comma-separated forecast request per window of missing days.
+    A city that cannot be geocoded gets an error entry instead of failing the
+    batch. A city the batch leaves without days goes through `daily_summary`,
+    with its current-weather fallback.
+    """
+    if not cities:
+        return []
+    with tracing.span("weather.many", cities=len(cities)) as sp:
+        pool = get_pool("geocode", 8)
+        geos = [f.result() for f in [pool.submit(propagate(_geocode_or_error, c)) for c in cities]]
+        dates = _window_dates(start_date, end_date)
+        cached, requests = _batch_plan(geos, dates, start_date, end_date)
+        sp.set(requests=len(requests))
+
+        fetched: Dict[int, List[Dict[str, Any]]] = {}
+        for lo, hi, chunk in requests:
+            try:
+                params = _batch_params([geos[k] for k in chunk], lo, hi)
+                r = transport.get(FORECAST_URL, params=params, timeout=20)
+                r.raise_for_status()
+                _store_batch(geos, chunk, r.json(), fetched)
+            except Exception:
+                pass
+        results = _batch_results(cities, geos, dates, cached, fetched)
+        return [res or daily_summary(city, start_date, end_date) for city, res in zip(cities, results)]
+
+
+async def _geocode_or_error_async(city: str) -> Geo:
+    try:
+        return await geocode_city_async(city)
+    except Exception as e:
+        return e
+
+
+async def daily_summary_many_async(cities: List[str], start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    """Async twin of `daily_summary_many` (same return shape)."""
+    if not cities:
+        return []
+    geos = list(await asyncio.gather(*(_geocode_or_error_async(c) for c in cities)))
+    dates = _window_dates(start_date, end_date)
+    cached, requests = await asyncio.to_thread(_batch_plan, geos, dates, start_date, end_date)
+
+    async def _fetch(lo: str, hi: str, chunk: List[int]) -> Tuple[List[int], Any]:
+        r = await transport.aget(FORECAST_URL, params=_batch_params([geos[k] for k in chunk], lo, hi), timeout=20)
+        r.raise_for_status()
+        return chunk, r.json()
+
+    fetched: Dict[int, List[Dict[str, Any]]] = {}
+    for outcome in await asyncio.gather(*(_fetch(*req) for req in requests), return_exceptions=True):
+        try:
+            if not isinstance(outcome, BaseException):
+                await asyncio.to_thread(_store_batch, geos, outcome[0], outcome[1], fetched)
+        except Exception:
+            pass
+    results = _batch_results(cities, geos, dates, cached, fetched)
+    return [res or await daily_summary_async(city, start_date, end_date) for city, res in zip(cities, results)]
+
+
 def _safe_get(arr, i):
     try:
         v = arr[i]
@@ -157,3 +466,19 @@ def _weather_code_to_summary(code: Any) -> str:
         99: "Thunderstorm with heavy hail",
     }
     return mapping.get(c, "")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Open-Meteo forecast tools")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_warm = sub.add_parser("warm", help="Fill the forecast cache for many cities in batched requests")
+    p_warm.add_argument("cities", nargs="+")
+    p_warm.add_argument("--start", default=date.today().isoformat())
+    p_warm.add_argument("--end", default=(date.today() + timedelta(days=6)).isoformat())
+    args = parser.parse_args(argv)
+    results = daily_summary_many(args.cities, args.start, args.end)
+    print(json.dumps([{"city": r.get("city"), "days": len(r.get("days") or []), "error": r.get("error")} for r in results]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional, Set, Tuple
+
+from . import tracing
+
+
+def normalize_key(text: str) -> str:
+    """Lowercase + collapse whitespace so 'New  Delhi ' and 'new delhi' share a key."""
+    return " ".join((text or "").lower().split())
+
+
+class LRUCache:
+    """Thread-safe in-process LRU with a per-cache TTL (0/None = never expires)."""
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_with_age(self, key: str) -> Optional[Tuple[Any, float]]:
+        now = time.time()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            value, created_at = hit
+            if self.ttl and now - created_at >= self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return value, now - created_at
+
+    def get(self, key: str) -> Optional[Any]:
+        hit = self.get_with_age(key)
+        return hit[0] if hit else None
+
+    def set(self, key: str, value: Any, created_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (value, time.time() if created_at is None else created_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Small on-disk JSON key/value store.
+
+    - Every entry has an expiry (per-entry `ttl` or the cache default; 0/None = never).
+    - `max_entries` caps the table; least-recently-read rows are evicted first.
+    - One connection guarded by a lock, so it is safe to share across threads.
+    """
+
+    def __init__(self, path: str, table: str = "cache", ttl: Optional[float] = None, max_entries: int = 0):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_accessed ON {self.table}(accessed_at)")
+            self._conn = conn
+        return self._conn
+
+    def get_with_age(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, age_seconds) for a live entry, else None."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                f"SELECT value, created_at, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                db.commit()
+                return None
+            db.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+            db.commit()
+        return json.loads(value), now - created_at
+
+    def get(self, key: str) -> Optional[Any]:
+        hit = self.get_with_age(key)
+        return hit[0] if hit else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            db = self._db()
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, expires_at, now),
+            )
+            if self.max_entries:
+                self._evict(db, now)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        db.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        (count,) = db.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            db.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY accessed_at ASC LIMIT ?)",
+                (excess,),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            db.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(f"DELETE FROM {self.table}")
+            db.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        return count
+
+
+class TieredCache:
+    """
+    In-process LRU in front of an optional SQLite store, with stale-while-revalidate.
+
+    - age < fresh_s          -> served as-is
+    - fresh_s <= age < stale_s -> served immediately, refreshed once in the background
+    - older / missing        -> caller fetches live
+    """
+
+    def __init__(
+        self,
+        memory: LRUCache,
+        disk: Optional[SQLiteCache],
+        fresh_s: float,
+        stale_s: float,
+        refresh_pool: Optional[Executor] = None,
+        name: str = "tiered",
+    ):
+        self.memory = memory
+        self.disk = disk
+        self.fresh_s = fresh_s
+        self.stale_s = stale_s
+        self.refresh_pool = refresh_pool
+        self.name = name
+        self._refreshing: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """(value or None, needs_refresh)."""
+        with tracing.span(f"cache.{self.name}", hit=False) as sp:
+            hit = self.memory.get_with_age(key)
+            tier = "memory"
+            if hit is None and self.disk is not None:
+                tier = "disk"
+                try:
+                    hit = self.disk.get_with_age(key)
+                except Exception:
+                    hit = None
+                if hit is not None:
+                    self.memory.set(key, hit[0], created_at=time.time() - hit[1])
+            if hit is None:
+                return None, False
+            value, age = hit
+            if age >= self.stale_s:
+                return None, False
+            sp.set(hit=True, tier=tier, stale=age >= self.fresh_s)
+            return value, age >= self.fresh_s
+
+    def store(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, ttl=self.stale_s)
+            except Exception:
+                pass
+
+    def refresh_in_background(self, key: str, fetch: Callable[[], Any], should_cache: Callable[[Any], bool]) -> None:
+        if self.refresh_pool is None:
+            return
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh() -> None:
+            try:
+                value = fetch()
+                if should_cache(value):
+                    self.store(key, value)
+            except Exception:
+                pass  # keep serving the stale copy
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self.refresh_pool.submit(_refresh)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        should_cache: Callable[[Any], bool] = lambda v: True,
+    ) -> Any:
+        value, needs_refresh = self.lookup(key)
+        if value is not None:
+            if needs_refresh:
+                self.refresh_in_background(key, fetch, should_cache)
+            return value
+        value = fetch()
+        if should_cache(value):
+            self.store(key, value)
+        return value
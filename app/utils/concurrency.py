@@ -0,0 +1,95 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .tracing import propagate
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """
+    Long-lived, bounded thread pool shared by everything that asks for `name`.
+    Separate names keep nested fan-outs (planner -> tools) from starving each other.
+    """
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-")
+                _pools[name] = pool
+    return pool
+
+
+def first_non_empty(
+    tasks: Sequence[Callable[[], Any]],
+    pool: ThreadPoolExecutor,
+    wave_size: int = 3,
+    on_miss: Optional[Callable[[int], None]] = None,
+) -> Tuple[Optional[int], Any]:
+    """
+    Race `tasks` (listed in priority order) while keeping that priority.
+
+    Up to `wave_size` tasks are in flight at once. A result is accepted only when
+    every higher-priority task has already come back empty (falsy or raised), so
+    the answer is the same one a sequential loop would pick. Once it is known,
+    queued tasks are cancelled and running ones are left to finish unobserved.
+
+    `on_miss(i)` fires each time priority slot `i` resolves empty.
+    Returns (index, result), or (None, None) if every task came back empty.
+    """
+    futures: List[Future] = []
+    wave_size = max(1, wave_size)
+
+    def _launch_upto(n: int) -> None:
+        while len(futures) < min(n, len(tasks)):
+            futures.append(pool.submit(propagate(tasks[len(futures)])))
+
+    try:
+        for i in range(len(tasks)):
+            _launch_upto(i + wave_size)
+            try:
+                result = futures[i].result()
+            except Exception:
+                result = None
+            if result:
+                return i, result
+            if on_miss:
+                on_miss(i)
+        return None, None
+    finally:
+        for f in futures:
+            f.cancel()
+
+
+async def first_non_empty_async(
+    factories: Sequence[Callable[[], Awaitable[Any]]],
+    wave_size: int = 3,
+    on_miss: Optional[Callable[[int], None]] = None,
+) -> Tuple[Optional[int], Any]:
+    """Async twin of `first_non_empty`; outstanding tasks are really cancelled."""
+    tasks: List[asyncio.Task] = []
+    wave_size = max(1, wave_size)
+
+    def _launch_upto(n: int) -> None:
+        while len(tasks) < min(n, len(factories)):
+            tasks.append(asyncio.ensure_future(factories[len(tasks)]()))
+
+    try:
+        for i in range(len(factories)):
+            _launch_upto(i + wave_size)
+            try:
+                result = await tasks[i]
+            except Exception:
+                result = None
+            if result:
+                return i, result
+            if on_miss:
+                on_miss(i)
+        return None, None
+    finally:
+        for t in tasks:
+            t.cancel()
@@ -0,0 +1,34 @@
+import re
+
+# Common regex patterns
+RESTAURANT_RE = re.compile(
+    r"\b(rest(?:a|e)?ur(?:a|e)?n(?:t|ts)?|resto|dining|food\s+places|best\s+rest|top\s+rest)\b",
+    re.IGNORECASE,
+)
+FOODS_RE = re.compile(
+    r"\b(foods?\s+to\s+try|local\s+dishes|must[-\s]*try\s+foods?|what\s+to\s+eat|famous\s+foods?)\b",
+    re.IGNORECASE,
+)
+NATURE_RE = re.compile(
+    r"\b(nature|park(s)?|garden(s)?|lake(s)?|waterfall(s)?|beach(es)?|viewpoint(s)?|hiking|trail(s)?|valley|forest)\b",
+    re.IGNORECASE,
+)
+
+# Intent cues for the rule-based pre-router
+WEATHER_RE = re.compile(
+    r"\b(weather|forecast|rain(s|ing|y)?|temperature|temp|hot|cold|humid(ity)?|sunny|snow(ing|fall)?|storm|climate)\b",
+    re.IGNORECASE,
+)
+PLAN_RE = re.compile(
+    r"\b(plan|planning|trip|itinerary|vacation|holiday|getaway|weekend\s+in|tour|\d+\s*-?\s*days?\s+in)\b",
+    re.IGNORECASE,
+)
+SIGHTS_RE = re.compile(
+    r"\b(places?\s+to\s+(visit|see)|things\s+to\s+(do|see)|tourist|attractions?|sightseeing|spots?|landmarks?|must[-\s]*see|museums?|temples?)\b",
+    re.IGNORECASE,
+)
+BUDGET_RE = re.compile(r"\b(budget|cheap|low[-\s]*cost|affordable|backpack(ing|er)?)\b", re.IGNORECASE)
+DAYS_RE = re.compile(
+    r"\b(\d{1,2}|one|two|three|four|five|six|seven|eight|nine|ten)\s*[-\s]?\s*(day|night)s?\b",
+    re.IGNORECASE,
+)
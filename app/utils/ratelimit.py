@@ -0,0 +1,74 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute / 60` per second,
+    holding at most `per_minute` tokens.
+
+    `reserve` never blocks: it takes the tokens (the level may go negative) and
+    returns how long the caller must wait before using them. Callers queue up in
+    reservation order, so every thread can share one bucket.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        if self.capacity <= 0:
+            return 0.0
+        # A single request larger than the whole bucket can still go once it is full
+        amount = min(float(amount), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._level -= amount
+            delay = -self._level / self.rate if self._level < 0 else 0.0
+            return max(delay, self._blocked_until - now)
+
+    def refund(self, amount: float) -> None:
+        """Give back (or with a negative amount, take) tokens, e.g. after the real usage is known."""
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._refill(time.monotonic())
+            self._level = min(self.capacity, self._level + amount)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every new reservation for `seconds` (upstream said so via Retry-After)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets reserved together. 0 disables a bucket."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def reserve(self, tokens: float) -> float:
+        return max(self.requests.reserve(1), self.tokens.reserve(tokens))
+
+    def refund(self, tokens: float, requests: float = 1) -> None:
+        self.requests.refund(requests)
+        self.tokens.refund(tokens)
+
+    def settle(self, reserved: float, used: float) -> None:
+        """Correct the token bucket once the response reports what the call really cost."""
+        self.tokens.refund(reserved - used)
+
+    def pause(self, seconds: float) -> None:
+        self.requests.pause(seconds)
+        self.tokens.pause(seconds)
+
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+import weakref
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Flight:
+    """One in-flight async call and how many callers are waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: while a call for `key` is in flight,
+    later callers wait for it and get the same result (or the same exception)
+    instead of starting their own. Nothing is cached once the call finishes.
+
+    Sync callers share among threads; async callers share within their event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, _Flight]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            leader = self._calls.get(key)
+            if leader is None:
+                fut: Future = Future()
+                self._calls[key] = fut
+            else:
+                self.coalesced += 1
+        if leader is not None:
+            return leader.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def do_async(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async twin of `do`. The shared task is shielded from any one caller being
+        cancelled, and cancelled itself once every caller waiting on it has gone.
+        """
+        loop = asyncio.get_running_loop()
+        calls = self._tasks.setdefault(loop, {})
+        flight = calls.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(factory()))
+            calls[key] = flight
+
+            def _done(t: asyncio.Future) -> None:
+                if calls.get(key) is flight:
+                    del calls[key]
+                if not t.cancelled():
+                    t.exception()  # mark retrieved even if every caller went away
+
+            flight.task.add_done_callback(_done)
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # The last caller was cancelled: nobody wants the result any more
+                if calls.get(key) is flight:
+                    del calls[key]
+                flight.task.cancel()
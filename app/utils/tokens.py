@@ -0,0 +1,11 @@
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count for Llama-style BPE tokenizers (~4 characters per token
+    for English/JSON). Good enough for budgeting prompts; not billing-exact.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
@@ -0,0 +1,224 @@
+"""
+Lightweight request tracing.
+
+    with tracing.trace("query", query=q) as t:      # root: starts collecting
+        with tracing.span("http GET", host=h) as s: # nested anywhere below
+            s.set(status=200)
+    print(tracing.waterfall(t.spans))
+
+Spans are recorded only inside an active trace, so untraced code pays one
+ContextVar lookup per span. The current span travels in a ContextVar: asyncio
+tasks inherit it automatically; thread-pool work must be submitted through
+`propagate(fn)`. Finished traces are appended to TRACE_FILE (if set) as one
+JSON object per span ("jsonl") or one OTLP/JSON document per trace ("otlp").
+"""
+import contextvars
+import functools
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from ..config import settings
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attrs", "error", "_t0")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attrs = attrs
+        self.error: Optional[str] = None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.time()
+        return round((end - self.start) * 1000, 2)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id, "span_id": self.span_id, "parent_id": self.parent_id,
+            "name": self.name, "start": self.start, "duration_ms": self.duration_ms,
+            "attrs": self.attrs, "error": self.error,
+        }
+
+
+class _Trace:
+    def __init__(self) -> None:
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+class _NoopSpan:
+    def set(self, **attrs: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+_trace: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar("trace", default=None)
+_parent: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("span", default=None)
+_export_lock = threading.Lock()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Any]:
+    """Time the enclosed block as a child of the current span (no-op outside a trace)."""
+    tr = _trace.get()
+    if tr is None:
+        yield _NOOP
+        return
+    parent = _parent.get()
+    s = Span(name, tr.trace_id, parent.span_id if parent else None, attrs)
+    tr.add(s)
+    token = _parent.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        # perf_counter for the duration, wall clock only for the start timestamp
+        s.end = s.start + (time.perf_counter() - s._t0)
+        _parent.reset(token)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of `span`."""
+    def deco(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def annotate(**attrs: Any) -> None:
+    """Attach attributes to the current span, e.g. cache hits inside a tool call."""
+    s = _parent.get()
+    if s is not None and _trace.get() is not None:
+        s.set(**attrs)
+
+
+def propagate(fn: Callable, *args: Any, **kwargs: Any) -> Callable[[], Any]:
+    """Bind `fn(*args, **kwargs)` to a copy of the caller's context, for pool.submit()."""
+    ctx = contextvars.copy_context()
+    return functools.partial(ctx.run, fn, *args, **kwargs)
+
+
+def enabled() -> bool:
+    return bool(settings.trace_file)
+
+
+@contextmanager
+def trace(name: str, force: bool = False, **attrs: Any) -> Iterator[Optional[_Trace]]:
+    """
+    Root span. Collects spans when TRACE_FILE is set or `force` is true and
+    exports them on exit; yields the trace (or None when not collecting).
+    Nested calls join the outer trace instead of starting a new one.
+    """
+    if _trace.get() is not None or not (force or enabled()):
+        with span(name, **attrs):
+            yield _trace.get()
+        return
+    tr = _Trace()
+    token = _trace.set(tr)
+    try:
+        with span(name, **attrs):
+            yield tr
+    finally:
+        _trace.reset(token)
+        if enabled():
+            try:
+                export(tr.spans)
+            except Exception:
+                pass  # tracing must never break a request
+
+
+def _otlp_value(v: Any) -> Dict[str, Any]:
+    if isinstance(v, bool):
+        return {"boolValue": v}
+    if isinstance(v, int):
+        return {"intValue": str(v)}
+    if isinstance(v, float):
+        return {"doubleValue": v}
+    return {"stringValue": str(v)}
+
+
+def _otlp(spans: List[Span]) -> Dict[str, Any]:
+    out = []
+    for s in spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "startTimeUnixNano": str(int(s.start * 1e9)),
+            "endTimeUnixNano": str(int((s.end or s.start) * 1e9)),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attrs.items() if v is not None],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        out.append(item)
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "agentic-travel-planner"}}]},
+        "scopeSpans": [{"scope": {"name": "app.utils.tracing"}, "spans": out}],
+    }]}
+
+
+def export(spans: List[Span], path: Optional[str] = None) -> None:
+    path = os.path.expanduser(path or settings.trace_file)
+    if settings.trace_format == "otlp":
+        lines = [json.dumps(_otlp(spans), default=str)]
+    else:
+        lines = [json.dumps(s.as_dict(), ensure_ascii=False, default=str) for s in spans]
+    with _export_lock:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def waterfall(spans: List[Span], width: int = 40) -> str:
+    """Text timing chart: one row per span, indented by depth, bar placed on the trace timeline."""
+    if not spans:
+        return ""
+    by_id = {s.span_id: s for s in spans}
+    children: Dict[Optional[str], List[Span]] = {}
+    for s in spans:
+        parent = s.parent_id if s.parent_id in by_id else None
+        children.setdefault(parent, []).append(s)
+
+    t0 = min(s.start for s in spans)
+    total = max((s.end or s.start) for s in spans) - t0 or 1e-9
+    rows: List[str] = []
+
+    def _walk(parent: Optional[str], depth: int) -> None:
+        for s in sorted(children.get(parent, []), key=lambda x: x.start):
+            lo = int((s.start - t0) / total * width)
+            hi = max(lo + 1, int(((s.end or s.start) - t0) / total * width))
+            bar = " " * lo + "█" * (hi - lo) + " " * (width - hi)
+            attrs = " ".join(f"{k}={v}" for k, v in s.attrs.items() if v is not None)
+            label = ("  " * depth + s.name)[:38]
+            flag = " !" if s.error else ""
+            rows.append(f"{label:<38} {s.duration_ms:>9.1f} ms |{bar}| {attrs}{flag}")
+            _walk(s.span_id, depth + 1)
+
+    _walk(None, 0)
+    return "\n".join(rows)
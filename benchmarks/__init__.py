@@ -0,0 +1 @@
+"""Offline benchmarks: recorded fixtures, injected latency, p50/p95/p99 and allocation reports."""
@@ -0,0 +1,125 @@
+"""
+Micro-benchmark for the cross-source POI dedupe/ranking engine (app/tools/poi_rank.py).
+
+    python -m benchmarks.dedupe
+    python -m benchmarks.dedupe --n 200 --otm 40 --wiki 20 --repeat 500 --budget-us 1000
+
+Builds a synthetic Overpass response of --n named elements around one point.
+Some names are spelling or alias variants of others, and some are
+re-positioned copies. The elements go through the real Overpass parser, with
+OpenTripMap/Wikipedia-shaped duplicates mixed in. `dedupe_and_rank` is timed
+over --repeat runs. The exit status is 1 when the median run exceeds
+--budget-us. The default workload (200 items) has a median of about 0.7-0.85 ms
+on a quiet single core, under the default budget of 1 ms; a busy machine can
+push a run over it, so rerun before reading OVER BUDGET as a regression.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+_PREFIXES = [
+    "Shiv", "Hanuman", "Lakshmi", "Gandhi", "Nehru", "Rose", "Lotus", "Old", "Royal", "Green",
+    "Lodhi", "Birla", "Jama", "Qutub", "Raj", "Sunder", "Kamala", "Chandni", "Hauz", "Mehrauli",
+]
+_SUFFIXES = ["Temple", "Park", "Garden", "Market", "Museum", "Fort", "Lake", "Gate", "Tomb", "Baoli", "Mandir", "Chowk"]
+_KINDS = [("tourism", "attraction"), ("historic", "monument"), ("leisure", "park"), ("tourism", "museum"), ("natural", "water")]
+
+
+def _variant(name: str, rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.3:
+        return f"{name} ({rng.choice(['Delhi', 'New Delhi', 'Old City'])})"
+    if roll < 0.6 and len(name) > 6:
+        i = rng.randrange(1, len(name) - 1)
+        return name[:i] + name[i + 1:]  # dropped letter, like "Qutub" / "Qutb"
+    return name + "s"
+
+
+def _workload(n: int, otm: int, wiki: int, seed: int) -> List[Dict[str, Any]]:
+    sys.path.insert(0, os.path.dirname(HERE))
+    from app.tools.poi import _parse_overpass
+
+    rng = random.Random(seed)
+    lat0, lon0 = 28.6139, 77.2090
+    places = []
+    for _ in range(n):
+        name = f"{rng.choice(_PREFIXES)} {rng.choice(_SUFFIXES)}"
+        lat, lon = lat0 + rng.uniform(-0.12, 0.12), lon0 + rng.uniform(-0.12, 0.12)
+        if places and rng.random() < 0.25:  # the same place again, slightly moved and renamed
+            base = rng.choice(places)
+            name, lat, lon = _variant(base[0], rng), base[1] + rng.uniform(-0.001, 0.001), base[2] + rng.uniform(-0.001, 0.001)
+        places.append((name, lat, lon))
+
+    elements = []
+    for i, (name, lat, lon) in enumerate(places):
+        key, value = rng.choice(_KINDS)
+        elements.append({"type": "node", "id": i, "lat": lat, "lon": lon, "tags": {"name": name, key: value}})
+    items = _parse_overpass(elements, "general")
+    for name, lat, lon in rng.sample(places, min(otm, len(places))):
+        items.append({"name": name, "kinds": "interesting_places", "rate": rng.choice([1, 2, 3, 7]),
+                      "otm": None, "source": "opentripmap", "lat": lat + 0.0003, "lon": lon})
+    for name, lat, lon in rng.sample(places, min(wiki, len(places))):
+        items.append({"name": _variant(name, rng), "kinds": "wikipedia", "rate": None, "source": "wikipedia",
+                      "lat": lat, "lon": lon - 0.0004})
+    rng.shuffle(items)
+    return items
+
+
+def _exact_dedupe(items: List[Dict[str, Any]]) -> int:
+    return len({str(it["name"]).strip().lower() for it in items})
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="POI dedupe/ranking micro-benchmark")
+    parser.add_argument("--n", type=int, default=200, help="Overpass elements in the synthetic response")
+    parser.add_argument("--otm", type=int, default=0, help="OpenTripMap duplicates mixed in")
+    parser.add_argument("--wiki", type=int, default=0, help="Wikipedia duplicates mixed in")
+    parser.add_argument("--repeat", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-us", type=float, default=1000.0, help="Median time allowed per call")
+    parser.add_argument("--json", metavar="OUT.json", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    items = _workload(args.n, args.otm, args.wiki, args.seed)
+    from app.tools.poi_rank import dedupe_and_rank
+
+    center = (28.6139, 77.2090)
+    for _ in range(20):  # warm-up: numpy dispatch, regex caches
+        out = dedupe_and_rank(items, center=center)
+    samples = []
+    for _ in range(max(1, args.repeat)):
+        t = time.perf_counter()
+        dedupe_and_rank(items, center=center)
+        samples.append((time.perf_counter() - t) * 1e6)
+    samples.sort()
+
+    result = {
+        "items_in": len(items),
+        "exact_name_unique": _exact_dedupe(items),
+        "fuzzy_unique": len(out),
+        "median_us": round(statistics.median(samples), 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(0.95 * len(samples)))], 1),
+        "min_us": round(samples[0], 1),
+        "budget_us": args.budget_us,
+    }
+    print(
+        f"{result['items_in']} items -> {result['fuzzy_unique']} places "
+        f"(exact-name dedupe keeps {result['exact_name_unique']})"
+    )
+    print(f"median {result['median_us']} us  p95 {result['p95_us']} us  min {result['min_us']} us  "
+          f"budget {args.budget_us:g} us  {'ok' if result['median_us'] <= args.budget_us else 'OVER BUDGET'}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0 if result["median_us"] <= args.budget_us else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,198 @@
+"""
+Recorded HTTP fixtures and a stand-in httpx transport that replays them.
+
+A fixture file is JSONL, one recorded exchange per line:
+
+    {"method": "GET", "host": "geocoding-api.open-meteo.com", "path": "/v1/search",
+     "query": {"name": "Jaipur"}, "status": 200, "json": {...}}
+
+Optional match fields narrow an entry: "query" (a subset of the request's
+query params), "body_contains" (substring of the request body) and "body_sha"
+(exact request body hash, written by `RecordingTransport`). The most specific
+matching entry wins; no match is a 404, which the tools already treat as a miss.
+An entry with "relative_coords": true has element lat/lon given as offsets
+from the request's `around:` point, so one Overpass fixture fits every city.
+Groq chat calls are ordinary POSTs to api.groq.com, so LLM answers are
+fixtures too.
+"""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+FORECAST_HOST = "api.open-meteo.com"
+_AROUND_RE = re.compile(rb"around(?::|%3A)[\d.]+(?:,|%2C)(-?[\d.]+)(?:,|%2C)(-?[\d.]+)")
+
+
+class Latency:
+    """
+    Per-request delay drawn from a named distribution:
+    "0", "const:40", "uniform:20,80", "lognormal:60,0.5" (median ms, sigma)
+    or "normal:50,10". Seeded so runs are comparable.
+    """
+
+    def __init__(self, spec: str = "0", seed: int = 0):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        self.kind = kind if args else "const"
+        self.args = [float(a) for a in (args or kind).split(",")]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample_s(self) -> float:
+        with self._lock:
+            if self.kind == "const":
+                ms = self.args[0]
+            elif self.kind == "uniform":
+                ms = self._rng.uniform(self.args[0], self.args[1])
+            elif self.kind == "lognormal":
+                ms = self.args[0] * math.exp(self._rng.gauss(0.0, self.args[1]))
+            elif self.kind == "normal":
+                ms = self._rng.gauss(self.args[0], self.args[1])
+            else:
+                raise ValueError(f"unknown latency distribution: {self.spec}")
+        return max(0.0, ms) / 1000.0
+
+
+def load(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _body_sha(body: bytes) -> str:
+    return hashlib.sha256(body).hexdigest()[:16]
+
+
+def _score(entry: Dict[str, Any], request: httpx.Request, body: bytes) -> Optional[int]:
+    """Specificity of `entry` for `request`, or None if it does not match."""
+    if entry.get("method", "GET") != request.method or entry.get("host") != request.url.host:
+        return None
+    if entry.get("path", request.url.path) != request.url.path:
+        return None
+    score = 0
+    params = request.url.params
+    for k, v in (entry.get("query") or {}).items():
+        if params.get(k, "").lower() != str(v).lower():
+            return None
+        score += 1
+    if "body_contains" in entry:
+        if entry["body_contains"].encode("utf-8") not in body:
+            return None
+        score += 1
+    if "body_sha" in entry:
+        if entry["body_sha"] != _body_sha(body):
+            return None
+        score += 100
+    return score
+
+
+def _rebase_daily(payload: Any, request: httpx.Request) -> Any:
+    """Shift a recorded open-meteo daily forecast onto the requested dates so fixtures never go stale."""
+    start, end = request.url.params.get("start_date"), request.url.params.get("end_date")
+    daily = payload.get("daily") if isinstance(payload, dict) else None
+    if not (start and end and daily and daily.get("time")):
+        return payload
+    lo, hi = date.fromisoformat(start), date.fromisoformat(end)
+    n, recorded = (hi - lo).days + 1, len(daily["time"])
+    rebased = {k: [v[i % recorded] for i in range(n)] for k, v in daily.items() if isinstance(v, list)}
+    rebased["time"] = [(lo + timedelta(days=i)).isoformat() for i in range(n)]
+    return {**payload, "daily": rebased}
+
+
+def _rebase_around(payload: Any, body: bytes) -> Any:
+    """Move offset-coordinate Overpass elements around the point the request asked about."""
+    m = _AROUND_RE.search(body)
+    if not m or not isinstance(payload, dict):
+        return payload
+    lat, lon = float(m.group(1)), float(m.group(2))
+    elements = []
+    for el in payload.get("elements", []):
+        el = dict(el)
+        for holder in (el, el.get("center")):
+            if isinstance(holder, dict) and "lat" in holder:
+                holder["lat"], holder["lon"] = holder["lat"] + lat, holder["lon"] + lon
+        elements.append(el)
+    return {**payload, "elements": elements}
+
+
+class FixtureTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Answers sync and async httpx requests from recorded fixtures after an injected delay."""
+
+    def __init__(self, entries: List[Dict[str, Any]], latency: Optional[Dict[str, Latency]] = None):
+        self.entries = entries
+        self.latency = latency or {}
+        self.misses: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _delay(self, request: httpx.Request) -> float:
+        lat = self.latency.get(request.url.host) or self.latency.get("*")
+        return lat.sample_s() if lat else 0.0
+
+    def _respond(self, request: httpx.Request, body: bytes) -> httpx.Response:
+        best, best_score = None, -1
+        for entry in self.entries:
+            score = _score(entry, request, body)
+            if score is not None and score > best_score:
+                best, best_score = entry, score
+        if best is None:
+            key = f"{request.method} {request.url.host}{request.url.path}"
+            with self._lock:
+                self.misses[key] = self.misses.get(key, 0) + 1
+            return httpx.Response(404, json={"error": "no fixture"}, request=request)
+        headers = best.get("headers") or {}
+        if "json" in best:
+            payload = best["json"]
+            if request.url.host == FORECAST_HOST:
+                payload = _rebase_daily(payload, request)
+            if best.get("relative_coords"):
+                payload = _rebase_around(payload, body)
+            return httpx.Response(best.get("status", 200), json=payload, headers=headers, request=request)
+        return httpx.Response(best.get("status", 200), text=best.get("text", ""), headers=headers, request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        time.sleep(self._delay(request))
+        return self._respond(request, body)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = await request.aread()
+        await asyncio.sleep(self._delay(request))
+        return self._respond(request, body)
+
+
+class RecordingTransport(httpx.BaseTransport):
+    """Passes requests to the network and appends each exchange to a fixture file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._inner = httpx.HTTPTransport()
+        self._lock = threading.Lock()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        body = request.read()
+        resp = self._inner.handle_request(request)
+        resp.read()
+        entry: Dict[str, Any] = {
+            "method": request.method,
+            "host": request.url.host,
+            "path": request.url.path,
+            "query": {k: v for k, v in request.url.params.items() if k not in ("apikey", "api_key")},
+            "status": resp.status_code,
+        }
+        if body:
+            entry["body_sha"] = _body_sha(body)
+        try:
+            entry["json"] = json.loads(resp.content)
+        except Exception:
+            entry["text"] = resp.text
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return resp
@@ -0,0 +1,137 @@
+"""
+Cold-start benchmark: how long the CLI spends importing before it does anything.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --budget-ms 120 --repeat 7 --top 15
+    python -m benchmarks.importtime --json importtime.json
+
+Each scenario runs in a fresh interpreter under `python -X importtime`, and
+the cumulative time of its top-level imports is summed, leaving out
+interpreter startup (everything up to and including `site`). The median over
+--repeat runs must stay under --budget-ms, and none of the heavy modules (the
+Groq SDK, httpx, rich, the agents) may be loaded on a path that does not use
+them. The exit status is 1 on any violation, so this can gate CI.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# name -> (python args, modules that must not be imported on that path)
+SCENARIOS: Dict[str, Tuple[List[str], Tuple[str, ...]]] = {
+    "import": (["-c", "import app.main"], ("groq", "httpx", "rich", "app.agents")),
+    "help": (["-m", "app.main", "--help"], ("groq", "httpx", "rich", "app.agents")),
+    "chitchat": (["-m", "app.main", "hello"], ("groq", "httpx", "app.agents")),
+    "batch": (["-c", "import app.io.batch"], ("groq", "httpx", "rich", "app.agents")),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _parse(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for every `-X importtime` line after interpreter startup."""
+    out = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            out.append((m.group(4), int(m.group(1)), int(m.group(2)), (len(m.group(3)) - 1) // 2))
+    # `site` (and whatever .pth files pull in) is imported before the command runs
+    starts = [i for i, row in enumerate(out) if row[0] == "site" and row[3] == 0]
+    return out[starts[-1] + 1:] if starts else out
+
+
+def _run(argv: List[str]) -> Dict[str, Any]:
+    env = dict(os.environ)
+    env.setdefault("GROQ_API_KEY", "importtime")
+    t = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120,
+    )
+    wall_ms = (time.perf_counter() - t) * 1000
+    rows = _parse(proc.stderr)
+    return {
+        "returncode": proc.returncode,
+        "wall_ms": wall_ms,
+        "import_ms": sum(cum for _, _, cum, depth in rows if depth == 0) / 1000,
+        "rows": rows,
+    }
+
+
+def _measure(name: str, repeat: int, budget_ms: float, top: int) -> Dict[str, Any]:
+    argv, forbidden = SCENARIOS[name]
+    _run(argv)  # warm the bytecode cache so runs compare like with like
+    runs = [_run(argv) for _ in range(repeat)]
+    median = statistics.median(r["import_ms"] for r in runs)
+    rows = runs[-1]["rows"]
+    loaded = [f for f in forbidden if any(mod == f or mod.startswith(f + ".") for mod, _, _, _ in rows)]
+    slowest = sorted(rows, key=lambda r: r[2], reverse=True)[:top]
+    return {
+        "scenario": name,
+        "command": " ".join(["python", *argv]),
+        "import_ms_median": round(median, 1),
+        "import_ms_min": round(min(r["import_ms"] for r in runs), 1),
+        "wall_ms_median": round(statistics.median(r["wall_ms"] for r in runs), 1),
+        "budget_ms": budget_ms,
+        "over_budget": median > budget_ms,
+        "heavy_modules": loaded,
+        "failed": any(r["returncode"] != 0 for r in runs),
+        "slowest": [{"module": m, "self_ms": s / 1000, "cumulative_ms": c / 1000} for m, s, c, _ in slowest],
+    }
+
+
+def _print(results: List[Dict[str, Any]]) -> None:
+    header = f"{'scenario':<9} {'import':>8} {'min':>8} {'wall':>8} {'budget':>7}  status"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        problems = []
+        if r["over_budget"]:
+            problems.append("over budget")
+        if r["heavy_modules"]:
+            problems.append("loads " + ", ".join(r["heavy_modules"]))
+        if r["failed"]:
+            problems.append("command failed")
+        print(
+            f"{r['scenario']:<9} {r['import_ms_median']:>8.1f} {r['import_ms_min']:>8.1f} "
+            f"{r['wall_ms_median']:>8.1f} {r['budget_ms']:>7.0f}  {'; '.join(problems) or 'ok'}"
+        )
+    for r in results:
+        if r["slowest"]:
+            print(f"\nslowest imports ({r['scenario']}: {r['command']}), cumulative ms:")
+            for row in r["slowest"]:
+                print(f"  {row['cumulative_ms']:>8.1f}  {row['module']}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CLI cold-start import-time budget")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="Median import time allowed per scenario")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list per scenario (0 = none)")
+    parser.add_argument("--json", metavar="OUT.json", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.scenarios.split(",") if n]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = [_measure(n, max(1, args.repeat), args.budget_ms, args.top) for n in names]
+    _print(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if any(r["over_budget"] or r["heavy_modules"] or r["failed"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+"""
+Offline benchmark harness.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --targets planner --concurrency 1,8,32 \\
+        --latency '*=lognormal:80,0.6' --latency api.groq.com=lognormal:450,0.35
+    python -m benchmarks.run --corpus my_queries.jsonl --json results.json
+    python -m benchmarks.run --record benchmarks/fixtures/new.jsonl   # live, needs keys + network
+
+Every HTTP call, tools and Groq alike, is answered from recorded fixtures
+(benchmarks/fixtures/recorded.jsonl) after an injected delay, so no network is
+needed. The corpus is any batch-mode JSONL file (see app/io/batch.py). Caches
+live in a throwaway directory and are off unless --warm-cache is given, so
+every call does the full work.
+
+Reports per target: p50/p95/p99 latency and throughput at each concurrency
+level, plus tracemalloc peak memory per call.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Tuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FIXTURES = os.path.join(HERE, "fixtures", "recorded.jsonl")
+DEFAULT_CORPUS = os.path.join(HERE, "corpus.jsonl")
+TARGETS = ("route", "weather", "poi", "planner")
+
+
+def _prepare_env(args: argparse.Namespace) -> None:
+    # Settings are read at import time, so this has to run before `app` is imported
+    os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="bench-cache-"))
+    os.environ.setdefault("LLM_RPM", "0")
+    os.environ.setdefault("LLM_TPM", "0")
+    os.environ.setdefault("HTTP2", "0")
+    if not args.warm_cache:
+        os.environ["CACHE_ENABLED"] = "0"
+        os.environ["LLM_CACHE_MAX_ENTRIES"] = "0"
+    if not args.record:
+        os.environ.setdefault("GROQ_API_KEY", "fixture")
+        os.environ.setdefault("OPENTRIPMAP_API_KEY", "fixture")
+
+
+def _latencies(specs: List[str], seed: int):
+    from .fixtures import Latency
+
+    out = {}
+    for spec in specs:
+        host, _, dist = spec.partition("=")
+        out[host] = Latency(dist, seed=seed + len(out))
+    return out
+
+
+def _percentile(sorted_ms: List[float], p: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    k = max(0, min(len(sorted_ms) - 1, int(round(p / 100.0 * len(sorted_ms) + 0.5)) - 1))
+    return sorted_ms[k]
+
+
+def _load_corpus(path: str, limit: int) -> List[Tuple[str, str]]:
+    from app.io.batch import iter_queries
+
+    out = [(qid, q) for qid, q, err in iter_queries(path) if q and not err]
+    return out[:limit] if limit else out
+
+
+def _calls(target: str, corpus: List[Tuple[str, str]], tz: str) -> List[Callable[[], Any]]:
+    """One zero-arg callable per query; routing for the agent targets happens here, untimed."""
+    from app.agents import planner_agent, poi_agent, weather_agent
+    from app.agents.router import route
+
+    calls: List[Callable[[], Any]] = []
+    for _, q in corpus:
+        if target == "route":
+            calls.append(lambda q=q: route(q, tz))
+            continue
+        r = route(q, tz)
+        city = r.get("city") or "Delhi"
+        if target == "weather":
+            calls.append(lambda q=q, r=r, c=city: weather_agent.run(q, c, r["start_date"], r["end_date"]))
+        elif target == "poi":
+            calls.append(lambda q=q, r=r, c=city: poi_agent.run(q, c, topic=r.get("poi_topic")))
+        else:
+            calls.append(lambda q=q, r=r, c=city: planner_agent.run(
+                q, c, r["start_date"], r["end_date"], r.get("days", 2),
+                budget_amount=r.get("budget_amount"), budget_currency=r.get("budget_currency"),
+                budget_mode=r.get("budget_mode", False), poi_topic=r.get("poi_topic"),
+            ))
+    return calls
+
+
+def _timed(fn: Callable[[], Any]) -> Tuple[float, bool]:
+    t = time.perf_counter()
+    try:
+        fn()
+        ok = True
+    except Exception:
+        ok = False
+    return (time.perf_counter() - t) * 1000, ok
+
+
+def _run_level(calls: List[Callable[[], Any]], concurrency: int, repeat: int) -> Dict[str, Any]:
+    work = calls * repeat
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(_timed, work))
+    wall = time.perf_counter() - t0
+    ms = sorted(r[0] for r in results)
+    return {
+        "concurrency": concurrency,
+        "calls": len(work),
+        "errors": sum(1 for r in results if not r[1]),
+        "p50_ms": round(_percentile(ms, 50), 1),
+        "p95_ms": round(_percentile(ms, 95), 1),
+        "p99_ms": round(_percentile(ms, 99), 1),
+        "mean_ms": round(sum(ms) / len(ms), 1) if ms else 0.0,
+        "throughput_qps": round(len(work) / wall, 2) if wall else 0.0,
+    }
+
+
+def _allocations(calls: List[Callable[[], Any]]) -> Dict[str, Any]:
+    """Sequential pass under tracemalloc: peak traced memory per call and what the pass left behind."""
+    tracemalloc.start()
+    try:
+        base, _ = tracemalloc.get_traced_memory()
+        peaks = []
+        for fn in calls:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            _timed(fn)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib_mean": round(sum(peaks) / len(peaks) / 1024, 1) if peaks else 0.0,
+        "peak_kib_max": round(max(peaks) / 1024, 1) if peaks else 0.0,
+        "retained_kib": round((retained - base) / 1024, 1),
+    }
+
+
+def _record(corpus: List[Tuple[str, str]], targets: List[str], path: str, tz: str) -> None:
+    from app import llm
+    from app.tools import transport
+    from .fixtures import RecordingTransport
+
+    recorder = RecordingTransport(path)
+    transport.use_transport(recorder)
+    llm.use_transport(recorder)
+    for target in targets:
+        for fn in _calls(target, corpus, tz):
+            _timed(fn)
+    print(f"recorded fixtures appended to {path}")
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"corpus={report['corpus_size']} queries  latency={report['latency'] or 'none'}")
+    header = f"{'target':<9} {'conc':>4} {'calls':>6} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'qps':>8}"
+    print(header)
+    print("-" * len(header))
+    for target, res in report["targets"].items():
+        for lvl in res["levels"]:
+            print(
+                f"{target:<9} {lvl['concurrency']:>4} {lvl['calls']:>6} {lvl['errors']:>4} "
+                f"{lvl['p50_ms']:>8.1f} {lvl['p95_ms']:>8.1f} {lvl['p99_ms']:>8.1f} {lvl['throughput_qps']:>8.2f}"
+            )
+        if res.get("alloc"):
+            a = res["alloc"]
+            print(f"{'':<9} alloc/call: peak mean {a['peak_kib_mean']} KiB, max {a['peak_kib_max']} KiB; "
+                  f"retained {a['retained_kib']} KiB")
+    if report["fixture_misses"]:
+        print("fixture misses (answered 404):", json.dumps(report["fixture_misses"], indent=2))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline latency/throughput/allocation benchmarks")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="Batch-style JSONL query file")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Recorded HTTP fixtures (JSONL)")
+    parser.add_argument("--targets", default=",".join(TARGETS), help=f"Comma-separated subset of {','.join(TARGETS)}")
+    parser.add_argument("--concurrency", default="1,8", help="Comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=1, help="Passes over the corpus per concurrency level")
+    parser.add_argument("--limit", type=int, default=0, help="Use only the first N corpus queries")
+    parser.add_argument("--latency", action="append", default=[], metavar="HOST=DIST",
+                        help="Injected delay per host ('*' for any), e.g. '*=lognormal:60,0.5' or api.groq.com=const:400")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warm-cache", action="store_true", help="Keep tool/LLM caches on (measures the warm path)")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--json", metavar="OUT.json", help="Also write the report as JSON")
+    parser.add_argument("--record", metavar="FIXTURES.jsonl", help="Hit the live APIs once and append fixtures")
+    args = parser.parse_args(argv)
+
+    _prepare_env(args)
+    sys.path.insert(0, os.path.dirname(HERE))
+    from app import llm
+    from app.config import settings
+    from app.tools import transport
+    from .fixtures import FixtureTransport, load
+
+    targets = [t for t in args.targets.split(",") if t]
+    unknown = set(targets) - set(TARGETS)
+    if unknown:
+        parser.error(f"unknown targets: {', '.join(sorted(unknown))}")
+    corpus = _load_corpus(args.corpus, args.limit)
+    tz = settings.app_tz
+
+    if args.record:
+        _record(corpus, targets, args.record, tz)
+        return 0
+
+    fake = FixtureTransport(load(args.fixtures), _latencies(args.latency, args.seed))
+    transport.use_transport(fake)
+    llm.use_transport(fake)
+
+    report: Dict[str, Any] = {"corpus_size": len(corpus), "latency": args.latency, "targets": {}}
+    for target in targets:
+        calls = _calls(target, corpus, tz)
+        for fn in calls:  # warm-up: imports, pools, pooled clients
+            _timed(fn)
+        levels = [_run_level(calls, max(1, int(c)), args.repeat) for c in args.concurrency.split(",") if c]
+        report["targets"][target] = {
+            "levels": levels,
+            "alloc": None if args.no_alloc else _allocations(calls),
+        }
+    report["fixture_misses"] = fake.misses
+
+    _print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from app.io import batch
+
+
+@pytest.fixture
+def fake_run(monkeypatch):
+    seen = []
+
+    def run_query(query, tz=None, agent="auto"):
+        seen.append(query)
+        return {"query": query, "intent": "poi", "final": query.upper(), "error": None}
+
+    monkeypatch.setattr(batch, "run_query", run_query)
+    return seen
+
+
+def _write(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _read(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+def test_iter_queries_fields_and_errors(tmp_path):
+    src = tmp_path / "in.jsonl"
+    _write(src, [
+        '{"id": "a", "query": "weather in goa"}',
+        '"plan a trip to jaipur"',
+        '{"request_id": 7, "prompt": "cafes in pune"}',
+        '{"id": "t", "title": "not a query field"}',
+        "{broken",
+        "",
+        "[1, 2]",
+    ])
+    rows = list(batch.iter_queries(str(src)))
+    assert rows[:4] == [
+        ("a", "weather in goa", None),
+        ("2", "plan a trip to jaipur", None),
+        ("7", "cafes in pune", None),
+        ("t", None, "no query field"),
+    ]
+    assert rows[4][:2] == ("5", None) and rows[4][2].startswith("invalid JSON")
+    assert rows[5] == ("7", None, "expected an object or a string")
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_run_batch_writes_one_result_per_input(tmp_path, fake_run, ordered):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write(src, [json.dumps({"id": f"q{i}", "query": f"query {i}"}) for i in range(10)] + ['{"id": "bad"}'])
+    counts = batch.run_batch(str(src), str(out), concurrency=3, ordered=ordered)
+    assert counts == {"written": 11, "skipped": 0, "errors": 1}
+    rows = _read(out)
+    ids = [r["id"] for r in rows]
+    if ordered:
+        assert ids == [f"q{i}" for i in range(10)] + ["bad"]
+    else:
+        assert sorted(ids) == sorted([f"q{i}" for i in range(10)] + ["bad"])
+    assert {r["id"]: r.get("final") for r in rows}["q3"] == "QUERY 3"
+
+
+def test_resume_skips_done_ids_and_redoes_torn_line(tmp_path, fake_run):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write(src, [json.dumps({"id": f"q{i}", "query": f"query {i}"}) for i in range(4)])
+    # An interrupted run: q0 and q1 finished, q2 was cut off mid-line
+    out.write_text(
+        json.dumps({"id": "q0", "final": "old"}) + "\n" + json.dumps({"id": "q1", "final": "old"}) + '\n{"id": "q2", "fin',
+        encoding="utf-8",
+    )
+    counts = batch.run_batch(str(src), str(out), resume=True)
+    assert counts == {"written": 2, "skipped": 2, "errors": 0}
+    assert fake_run == ["query 2", "query 3"]
+    assert [r["id"] for r in _read(out)] == ["q0", "q1", "q2", "q3"]
+
+
+def test_without_resume_output_is_rewritten(tmp_path, fake_run):
+    src, out = tmp_path / "in.jsonl", tmp_path / "out.jsonl"
+    _write(src, ['{"id": "q0", "query": "x"}'])
+    out.write_text(json.dumps({"id": "q0", "final": "old"}) + "\n", encoding="utf-8")
+    batch.run_batch(str(src), str(out))
+    assert _read(out) == [{"id": "q0", "query": "x", "intent": "poi", "final": "X", "error": None}]
+
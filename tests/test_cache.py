@@ -0,0 +1,103 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils import cache
+from app.utils.cache import LRUCache, SQLiteCache, TieredCache, normalize_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def disk(tmp_path):
+    return SQLiteCache(str(tmp_path / "c" / "test.sqlite3"), table="t", ttl=100)
+
+
+def test_normalize_key():
+    assert normalize_key("  New   Delhi ") == normalize_key("new delhi") == "new delhi"
+
+
+def test_sqlite_roundtrip_ttl_and_age(disk, clock):
+    disk.set("k", {"items": [1, "two"]})
+    disk.set("forever", "v", ttl=0)
+    clock[0] += 40
+    assert disk.get_with_age("k") == ({"items": [1, "two"]}, 40)
+    clock[0] += 60
+    assert disk.get("k") is None and len(disk) == 1  # expired rows are dropped on read
+    assert disk.get("forever") == "v"
+
+
+def test_sqlite_evicts_least_recently_read(tmp_path, clock):
+    db = SQLiteCache(str(tmp_path / "lru.sqlite3"), max_entries=2)
+    db.set("a", 1)
+    clock[0] += 1
+    db.set("b", 2)
+    clock[0] += 1
+    db.get("a")  # a is now fresher than b
+    clock[0] += 1
+    db.set("c", 3)
+    assert (db.get("a"), db.get("b"), db.get("c")) == (1, None, 3)
+
+
+def test_sqlite_persists_across_instances(tmp_path):
+    path = str(tmp_path / "p.sqlite3")
+    SQLiteCache(path).set("k", [1, 2])
+    assert SQLiteCache(path).get("k") == [1, 2]
+
+
+def test_lru_cache_bounds_and_ttl(clock):
+    lru = LRUCache(max_entries=2, ttl=10)
+    lru.set("a", 1)
+    lru.set("b", 2)
+    lru.get("a")
+    lru.set("c", 3)
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == (1, None, 3)
+    clock[0] += 10
+    assert lru.get("a") is None
+
+
+def test_tiered_fresh_stale_and_expired(disk, clock):
+    tiers = TieredCache(LRUCache(8), disk, fresh_s=10, stale_s=100)
+    tiers.store("k", "v")
+    assert tiers.lookup("k") == ("v", False)
+    clock[0] += 50
+    assert tiers.lookup("k") == ("v", True)
+    clock[0] += 50
+    assert tiers.lookup("k") == (None, False)
+
+
+def test_tiered_disk_hit_keeps_its_age_in_memory(disk, clock):
+    disk.set("k", "v")
+    clock[0] += 20
+    memory = LRUCache(8)
+    tiers = TieredCache(memory, disk, fresh_s=10, stale_s=100)
+    assert tiers.lookup("k") == ("v", True)
+    assert memory.get_with_age("k") == ("v", 20)  # promoted, not made fresh
+
+
+def test_get_or_fetch_serves_stale_and_refreshes_once(disk, clock):
+    with ThreadPoolExecutor(1) as pool:
+        tiers = TieredCache(LRUCache(8), disk, fresh_s=10, stale_s=100, refresh_pool=pool)
+        fetched = []
+
+        def fetch():
+            fetched.append(1)
+            return f"v{len(fetched)}"
+
+        assert tiers.get_or_fetch("k", fetch) == "v1"
+        assert tiers.get_or_fetch("k", fetch) == "v1"
+        clock[0] += 20
+        assert tiers.get_or_fetch("k", fetch) == "v1"  # stale copy now, refresh behind it
+    assert fetched == [1, 1]
+    assert tiers.lookup("k") == ("v2", False)
+
+
+def test_get_or_fetch_skips_values_that_should_not_be_cached(clock):
+    tiers = TieredCache(LRUCache(8), None, fresh_s=10, stale_s=100)
+    assert tiers.get_or_fetch("k", lambda: [], should_cache=bool) == []
+    assert tiers.lookup("k") == (None, False)
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+
+from app.utils.concurrency import first_non_empty, first_non_empty_async, get_pool
+
+
+def test_get_pool_is_shared_by_name():
+    assert get_pool("test-shared", 2) is get_pool("test-shared", 8)
+
+
+def test_first_non_empty_keeps_priority_order():
+    pool = get_pool("test-race", 4)
+    tasks = [
+        lambda: time.sleep(0.05) or [],   # slow miss
+        lambda: time.sleep(0.02) or ["second"],
+        lambda: ["third"],                # fastest, but lower priority
+    ]
+    missed = []
+    assert first_non_empty(tasks, pool, wave_size=3, on_miss=missed.append) == (1, ["second"])
+    assert missed == [0]
+
+
+def test_errors_count_as_misses_and_all_empty_gives_none():
+    pool = get_pool("test-race", 4)
+
+    def boom():
+        raise RuntimeError("upstream down")
+
+    assert first_non_empty([boom, lambda: ["ok"]], pool) == (1, ["ok"])
+    assert first_non_empty([lambda: None, lambda: {}], pool) == (None, None)
+
+
+def test_waves_bound_in_flight_tasks():
+    pool = get_pool("test-waves", 8)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def task():
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return None
+
+    assert first_non_empty([task] * 6, pool, wave_size=2) == (None, None)
+    assert peak[0] <= 2
+
+
+def test_async_race_keeps_priority_and_cancels_the_rest():
+    cancelled = []
+
+    async def result(delay, value):
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    async def scenario():
+        factories = [
+            lambda: result(0.03, []),
+            lambda: result(0.01, ["second"]),
+            lambda: result(0.0, ["third"]),
+            lambda: result(1.0, ["slow"]),
+        ]
+        missed = []
+        won = await first_non_empty_async(factories, wave_size=4, on_miss=missed.append)
+        await asyncio.sleep(0)
+        return won, missed
+
+    assert asyncio.run(scenario()) == ((1, ["second"]), [0])
+    assert cancelled == [["slow"]]
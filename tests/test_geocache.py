@@ -0,0 +1,49 @@
+import httpx
+import pytest
+
+from app.config import settings
+from app.tools import geocache, transport, weather
+
+PANAJI = {"name": "Panaji", "lat": 15.4909, "lon": 73.8278}
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(geocache, "_store", None)
+    return tmp_path
+
+
+def test_miss_then_hit_by_normalized_name_and_source(store):
+    assert geocache.get("otm", "Panaji") is None
+    geocache.put("otm", "Panaji", PANAJI)
+    assert geocache.get("otm", "  panaji ") == PANAJI
+    assert geocache.get("open-meteo", "Panaji") is None
+    assert (store / "geocode.sqlite3").exists()
+
+
+def test_disabled_cache_and_broken_store_are_misses(store, monkeypatch):
+    geocache.put("otm", "Panaji", PANAJI)
+    monkeypatch.setattr(geocache._store, "get", lambda key: 1 / 0)
+    assert geocache.get("otm", "Panaji") is None
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    geocache.put("otm", "Goa", PANAJI)  # no store, no error
+    assert geocache.get("otm", "Goa") is None
+
+
+def test_second_geocode_is_served_from_the_cache(store):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json={"results": [{"name": "Panaji", "latitude": 15.4909, "longitude": 73.8278}]})
+
+    transport.use_transport(httpx.MockTransport(handler))
+    try:
+        first = weather.geocode_city("Panaji")
+        assert weather.geocode_city("PANAJI") == first
+    finally:
+        transport.use_transport(None)
+    assert len(calls) == 1
+    assert geocache.get("open-meteo", "panaji") == first
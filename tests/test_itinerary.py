@@ -0,0 +1,70 @@
+import pytest
+
+from app.agents import itinerary
+from app.agents.itinerary import compose
+
+
+def _poi(name, kinds="", lat=None, lon=None):
+    return {"name": name, "kinds": kinds, "lat": lat, "lon": lon}
+
+
+def _rows(table):
+    lines = table.splitlines()
+    assert lines[0] == "| Day | Morning | Afternoon | Evening | Notes |"
+    return [[c.strip() for c in line.strip("|").split("|")] for line in lines[2:]]
+
+
+@pytest.mark.parametrize("item, setting", [
+    (_poi("National Museum", "tourism:museum"), "indoor"),
+    (_poi("Lodhi Garden", "leisure:park"), "outdoor"),
+    (_poi("Adventure Island", "tourism:theme_park"), "outdoor"),
+    (_poi("Small Plates Bistro"), "either"),            # not a mall
+    (_poi("Data Aggregate Labs"), "either"),             # not a gate
+    (_poi("Waterfront Café"), "either"),                 # not water
+    (_poi("Chill Lounge"), "either"),                    # not a hill
+    (_poi("India Gate"), "outdoor"),
+    (_poi("St. Mary's Church", "religion,churches"), "indoor"),
+])
+def test_setting_matches_whole_words(item, setting):
+    assert itinerary._setting(item) == setting
+
+
+def test_exactly_days_rows_with_dates_and_placeholders():
+    pois = [_poi(f"Place {i}") for i in range(4)]
+    rows = _rows(compose(pois, {"days": []}, 3, "2026-11-02"))
+    assert [r[0] for r in rows] == ["Day 1 (2026-11-02)", "Day 2 (2026-11-03)", "Day 3 (2026-11-04)"]
+    assert rows[1][1:4] == ["Place 3", "-", "-"]
+    assert rows[2][1:4] == ["-", "-", "-"]
+    assert rows[0][4].startswith("Forecast unavailable")
+
+
+def test_rainy_day_gets_indoor_stops_and_outdoor_goes_to_dry_day():
+    pois = [
+        _poi("Lodhi Garden", "leisure:park", 28.593, 77.219),
+        _poi("Humayun Tomb", "historic:tomb", 28.593, 77.250),
+        _poi("Hauz Khas Lake", "natural:water", 28.554, 77.194),
+        _poi("National Museum", "tourism:museum", 28.611, 77.219),
+        _poi("Crafts Museum", "tourism:museum", 28.613, 77.242),
+        _poi("Kiran Nadar Museum", "tourism:gallery", 28.528, 77.218),
+    ]
+    weather = {"days": [
+        {"date": "2026-07-01", "summary": "Heavy rain", "precip_mm": 30.0, "tmin_c": 26, "tmax_c": 31},
+        {"date": "2026-07-02", "summary": "Clear sky", "precip_mm": 0.0, "tmin_c": 27, "tmax_c": 36},
+    ]}
+    rows = _rows(compose(pois, weather, 2, "2026-07-01", budget_mode=True))
+    assert set(rows[0][1:4]) == {"National Museum", "Crafts Museum", "Kiran Nadar Museum"}
+    assert set(rows[1][1:4]) == {"Lodhi Garden", "Humayun Tomb", "Hauz Khas Lake"}
+    assert rows[0][4] == "Heavy rain, 26-31°C, Rain 30.0 mm: indoor stops; public transit"
+    assert rows[1][4] == "Clear sky, 27-36°C, No rain expected; public transit"
+
+
+def test_dedupes_names_and_escapes_pipes():
+    pois = [_poi("Red Fort"), _poi("red-fort"), _poi("A | B")]
+    rows = _rows(compose(pois, {}, 1, "not a date"))
+    assert rows[0][:4] == ["Day 1", "Red Fort", "A / B", "-"]
+
+
+def test_same_input_same_table():
+    pois = [_poi(f"P{i}", "tourism:museum" if i % 2 else "leisure:park", 28.6 + i / 100, 77.2) for i in range(9)]
+    weather = {"days": [{"date": "2026-01-0%d" % d, "summary": "Drizzle" if d == 2 else "Sunny"} for d in (1, 2, 3)]}
+    assert compose(pois, weather, 3, "2026-01-01") == compose(list(pois), dict(weather), 3, "2026-01-01")
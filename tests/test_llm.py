@@ -0,0 +1,164 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from app import llm
+from app.utils.ratelimit import RateLimiter
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class _Stream:
+    def __init__(self, parts):
+        self.parts = parts
+        self.closed = False
+
+    def __iter__(self):
+        return iter(_chunk(p) for p in self.parts)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    streams = []
+
+    def create(**kwargs):
+        streams.append(_Stream(["Hel", "", "lo"]))
+        return streams[-1]
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(llm, "get_client", lambda: client)
+    monkeypatch.setattr(llm, "_limiter", RateLimiter(0, 0))
+    monkeypatch.setattr(llm, "_slots", threading.BoundedSemaphore(1))
+    return streams
+
+
+def test_stream_holds_its_slot_until_exhausted(fake_groq):
+    gen = llm.chat_stream([{"role": "user", "content": "hi"}])
+    assert next(gen) == "Hel"
+    assert not llm._slots.acquire(blocking=False)  # still held while streaming
+    assert list(gen) == ["lo"]
+    assert llm._slots.acquire(blocking=False)
+    llm._slots.release()
+    assert fake_groq[0].closed
+
+
+def test_abandoned_stream_releases_slot(fake_groq):
+    gen = llm.chat_stream([{"role": "user", "content": "hi"}])
+    next(gen)
+    gen.close()
+    assert fake_groq[0].closed
+    assert llm._slots.acquire(blocking=False)
+    llm._slots.release()
+
+
+def test_busy_slots_time_out_instead_of_waiting_forever(fake_groq):
+    llm._slots.acquire()
+    try:
+        with pytest.raises(TimeoutError, match="slot"):
+            llm.chat([{"role": "user", "content": "hi"}], timeout=0.05)
+    finally:
+        llm._slots.release()
+    assert not fake_groq
+
+
+@pytest.fixture
+def fake_async_groq(monkeypatch):
+    sent = []
+
+    async def create(**kwargs):
+        sent.append(kwargs["messages"][-1]["content"])
+        await asyncio.sleep(0.01)
+        message = SimpleNamespace(content=f" re: {sent[-1]} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    def get_async_client():
+        llm._async_slots.setdefault(asyncio.get_running_loop(), asyncio.Semaphore(1))
+        return client
+
+    monkeypatch.setattr(llm, "get_async_client", get_async_client)
+    monkeypatch.setattr(llm, "_limiter", RateLimiter(0, 0))
+    return sent
+
+
+def test_chat_async_answers_and_queues_on_its_slot(fake_async_groq):
+    async def scenario():
+        return await asyncio.gather(*(llm.chat_async([{"role": "user", "content": q}]) for q in ("a", "b")))
+
+    assert asyncio.run(scenario()) == ["re: a", "re: b"]
+    assert fake_async_groq == ["a", "b"]
+
+
+def test_chat_async_slot_wait_is_bounded_by_the_deadline(fake_async_groq):
+    async def scenario():
+        llm.get_async_client()
+        slots = llm._async_slots[asyncio.get_running_loop()]
+        await slots.acquire()
+        with pytest.raises(TimeoutError, match="slot"):
+            await llm.chat_async([{"role": "user", "content": "hi"}], timeout=0.05)
+        slots.release()
+
+    asyncio.run(scenario())
+    assert fake_async_groq == []
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    calls = []
+
+    def chat(messages, temperature=0.2, model=None):
+        calls.append(messages[-1]["content"])
+        return '{"intent": "plan"}' if "trip" in messages[-1]["content"] else "not json"
+
+    monkeypatch.setattr(llm, "chat", chat)
+    monkeypatch.setattr(llm.settings, "llm_cache_persist", False)
+    monkeypatch.setattr(llm.settings, "llm_cache_max_entries", 16)
+    monkeypatch.setattr(llm, "_memory_cache", None)
+    monkeypatch.setattr(llm, "_disk_cache", None)
+    monkeypatch.setattr(llm, "_cache_stats", {"hits": 0, "misses": 0})
+    return calls
+
+
+def test_normalize_query():
+    assert llm.normalize_query("Plan a 3-day trip to Goa!") == llm.normalize_query("plan 3 day trip to goa")
+    assert llm.normalize_query("Zürich weather") == "zürich weather"
+    assert llm.normalize_query("दिल्ली का मौसम") == "दिल्ली का मौसम"
+    assert llm.normalize_query("दिल्ली का मौसम") != llm.normalize_query("मुंबई में रेस्टोरेंट")
+    assert llm.normalize_query("?!") == ""
+
+
+def test_cached_chat_shares_answers_and_counts(memory_cache):
+    def ask(text):
+        return llm.cached_chat([{"role": "system", "content": "router"}, {"role": "user", "content": text}],
+                               cache_text=text, validate=lambda out: out.startswith("{"))
+
+    assert ask("Plan a trip to Goa") == ask("plan the trip to goa!") == '{"intent": "plan"}'
+    ask("hello")
+    ask("hello")  # invalid output is not stored
+    assert memory_cache == ["Plan a trip to Goa", "hello", "hello"]
+    assert llm.cache_stats() == {"hits": 1, "misses": 3, "hit_rate": 0.25}
+
+
+def test_non_latin_queries_get_their_own_entries(memory_cache):
+    def ask(text):
+        return llm.cached_chat([{"role": "user", "content": text}], cache_text=text)
+
+    ask("दिल्ली का मौसम")
+    ask("मुंबई में रेस्टोरेंट")
+    ask("दिल्ली का मौसम")
+    assert memory_cache == ["दिल्ली का मौसम", "मुंबई में रेस्टोरेंट"]
+
+
+def test_unkeyable_queries_bypass_the_cache(memory_cache):
+    for text in ("?!", "🙂", "?!"):
+        llm.cached_chat([{"role": "user", "content": text}], cache_text=text)
+    assert memory_cache == ["?!", "🙂", "?!"]
+    assert llm.cache_stats()["hits"] == 0
@@ -0,0 +1,34 @@
+from app import pipeline
+from app.agents import poi_agent
+
+
+def test_chitchat_short_circuits():
+    out = pipeline.run_query("hello there")
+    assert out["intent"] == "chitchat" and out["final"] == pipeline.HELP_TEXT and out["route"] is None
+
+
+def test_forced_agent_with_city_skips_router_and_streams(monkeypatch):
+
+    def run(query, city, topic=None, on_token=None):
+        on_token("| row |")
+        return "| row |", {"city": city, "topic": topic}
+
+    monkeypatch.setattr(poi_agent, "run", run)
+    routes, tokens = [], []
+    out = pipeline.run_query(
+        "museums", agent="poi", hints={"city": "Pune", "poi_topic": "museums"},
+        on_route=lambda intent, r: routes.append((intent, r["city"])), on_token=tokens.append,
+    )
+    assert out["error"] is None and out["intent"] == "poi"
+    assert out["observations"] == {"city": "Pune", "topic": "museums"}
+    assert routes == [("poi", "Pune")] and tokens == ["| row |"]
+
+
+def test_agent_errors_are_captured(monkeypatch):
+    def run(*_a, **_kw):
+        raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(poi_agent, "run", run)
+    out = pipeline.run_query("museums", agent="poi", hints={"city": "Pune"})
+    assert out["error"] == "RuntimeError: upstream down"
+    assert "total_ms" in out["timings"]
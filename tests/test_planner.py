@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from app.agents import planner_agent
+from app.config import settings
+
+WEATHER = {"city": "Goa", "days": [{"date": "2026-10-18", "tmin_c": 24, "tmax_c": 31, "precip_mm": 0.0}]}
+POIS = {"city": "Goa", "items": [{"name": "Fort Aguada"}, {"name": "Basilica of Bom Jesus"}]}
+
+
+@pytest.fixture
+def branches(monkeypatch):
+    """Stand-in weather/POI agents; each waits for the other, so they must run concurrently."""
+    both_started = threading.Barrier(2, timeout=5)
+    behaviour = {"weather": lambda: WEATHER, "poi": lambda: POIS}
+
+    def fake(name):
+        def run(*args, **kwargs):
+            both_started.wait()
+            return "", behaviour[name]()
+        return run
+
+    monkeypatch.setattr(settings, "planner_llm_polish", False)
+    monkeypatch.setattr(planner_agent, "weather_run", fake("weather"))
+    monkeypatch.setattr(planner_agent, "poi_run", fake("poi"))
+    return behaviour
+
+
+def _plan():
+    return planner_agent.run("2 days in goa", "Goa", "2026-10-18", "2026-10-19", days=2)
+
+
+def test_branches_run_concurrently_into_one_context(branches):
+    table, ctx = _plan()
+    assert ctx["weather"] == WEATHER and ctx["pois"] == POIS
+    assert "Fort Aguada" in table and len(table.splitlines()) == 4
+
+
+def test_failed_branch_becomes_an_error_observation(branches):
+    def boom():
+        raise RuntimeError("upstream 502")
+
+    branches["poi"] = boom
+    table, ctx = _plan()
+    assert ctx["pois"] == {"error": "poi failed: upstream 502", "items": []}
+    assert ctx["weather"] == WEATHER
+    assert len(table.splitlines()) == 4
+
+
+def test_slow_branch_times_out_without_holding_the_other(branches, monkeypatch):
+    monkeypatch.setattr(settings, "planner_branch_timeout_s", 0.2)
+    release = threading.Event()
+    branches["weather"] = lambda: release.wait(5) and WEATHER
+    try:
+        table, ctx = _plan()
+    finally:
+        release.set()
+    assert ctx["weather"] == {"error": "weather failed: timed out after 0.2s", "days": []}
+    assert ctx["pois"] == POIS
+    assert "Fort Aguada" in table
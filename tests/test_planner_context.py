@@ -0,0 +1,47 @@
+from app.agents.planner_context import compact_context
+from app.utils.tokens import estimate_tokens
+
+WEATHER = {"days": [
+    {"date": "2026-10-18", "summary": "Clear | sunny", "tmin_c": 24.4, "tmax_c": 31.6, "precip_mm": 0.04},
+    {"date": "2026-10-19", "summary": None, "tmin_c": None, "tmax_c": 30, "precip_mm": None},
+]}
+CONSTRAINTS = {"days": 2, "date_window": ["2026-10-18", "2026-10-19"], "budget": {"amount": 5000, "currency": "INR"}}
+
+
+def _ctx(n):
+    items = [{"name": f"Place {i}", "kinds": "tourism:theme_park,other", "rate": 3, "wikidata": "Q" * 40} for i in range(n)]
+    return {"weather": WEATHER, "pois": {"items": items}, "constraints": CONSTRAINTS}
+
+
+def test_projection_is_terse_and_deduped():
+    ctx = _ctx(0)
+    ctx["pois"]["items"] = [{"name": "Fort | Aguada", "kinds": "historic:fort"}, {"name": "fort/aguada"}, {"name": ""}]
+    text, stats = compact_context(ctx, 1000)
+    assert text.splitlines() == [
+        "WEATHER date|sky|min-max C|rain mm",
+        "2026-10-18|Clear / sunny|24-32|0.0",
+        "2026-10-19|?|?|?",
+        "POIS name|kind",
+        "Fort / Aguada|fort",
+        "CONSTRAINTS days=2 window=2026-10-18..2026-10-19 budget=~5000 INR",
+    ]
+    assert stats["pois_kept"] == stats["pois_total"] == 1
+
+
+def test_lowest_ranked_pois_are_dropped_to_fit_the_budget():
+    full, full_stats = compact_context(_ctx(40), 10_000)
+    assert full_stats["pois_kept"] == 40 and full_stats["compact_tokens"] < full_stats["raw_tokens"]
+
+    text, stats = compact_context(_ctx(40), full_stats["compact_tokens"] // 2)
+    assert 0 < stats["pois_kept"] < 40 and stats["pois_total"] == 40
+    assert estimate_tokens(text) == stats["compact_tokens"] <= full_stats["compact_tokens"] // 2
+    assert text.splitlines()[-2] == f"Place {stats['pois_kept'] - 1}|theme park"
+    assert full.startswith(text.rsplit("\n", 1)[0])
+
+
+def test_min_pois_wins_over_the_budget():
+    text, stats = compact_context(_ctx(10), 1, min_pois=6)
+    assert stats["pois_kept"] == 6 and stats["compact_tokens"] > 1
+    assert "Place 5|theme park" in text and "Place 6" not in text
+    text, stats = compact_context(_ctx(10), 1)
+    assert stats["pois_kept"] == 0 and "POIS none" in text
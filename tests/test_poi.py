@@ -0,0 +1,108 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.tools import poi, transport
+
+LAT, LON = 15.4909, 73.8278  # Panaji
+M = 1 / 111_000  # about one metre of latitude, in degrees
+
+
+def _element(ident, north_m, **tags):
+    return {"type": "node", "id": ident, "lat": LAT + north_m * M, "lon": LON, "tags": tags}
+
+
+ELEMENTS = [
+    _element(1, 100, name="Ritz Classic", amenity="restaurant", cuisine="goan;seafood"),
+    _element(2, 900, name="Cafe Bodega", amenity="cafe", cuisine="coffee_shop"),
+    _element(3, 300, name="Fontainhas", historic="district"),
+    _element(4, 15_000, name="Far Thali", amenity="restaurant", cuisine="thali"),
+]
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """OpenTripMap geoname and Overpass stand-ins; yields the Overpass queries sent."""
+    queries = []
+
+    def handler(request):
+        if request.url.host == "api.opentripmap.com":
+            return httpx.Response(200, json={"name": "Panaji", "lat": LAT, "lon": LON})
+        queries.append(request)
+        return httpx.Response(200, json={"elements": ELEMENTS})
+
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    monkeypatch.setattr(settings, "osm_local_db", "")
+    transport.use_transport(httpx.MockTransport(handler))
+    yield queries
+    transport.use_transport(None)
+
+
+def test_foods_async_twin_matches_sync(upstream):
+    sync = poi.list_foods("Panaji", initial_radius_m=8000)
+
+    async def scenario():
+        try:
+            return await poi.list_foods_async("Panaji", initial_radius_m=8000)
+        finally:
+            await transport.aclose()
+
+    assert asyncio.run(scenario()) == sync
+    assert [it["name"] for it in sync["items"]] == ["Goan", "Seafood", "Coffee Shop"]
+    assert len(upstream) == 2
+
+
+@pytest.mark.parametrize("local", [[], ELEMENTS[:1]])
+def test_empty_local_extract_falls_back_to_overpass(upstream, monkeypatch, local):
+    monkeypatch.setattr(poi.osm_local, "covers", lambda lat, lon: True)
+    monkeypatch.setattr(poi.osm_local, "query", lambda lat, lon, radius_m, topic: local)
+
+    async def scenario():
+        try:
+            return await poi._overpass_elements_async(LAT, LON, 1000, "general")
+        finally:
+            await transport.aclose()
+
+    sync = poi._overpass_elements(LAT, LON, 1000, "general")
+    assert asyncio.run(scenario()) == sync
+    if local:
+        assert sync == local and not upstream
+    else:
+        assert [el["id"] for el in sync] == [3] and len(upstream) == 2
+
+
+def test_union_query_has_every_topic_with_its_own_cap(monkeypatch):
+    monkeypatch.setattr(settings, "overpass_element_limit", 50)
+    lines = poi._overpass_union_ql(LAT, LON, 2000).split("\n")
+    assert lines[0] == f"[out:json][timeout:{poi.OVERPASS_TIMEOUT_S}];"
+    assert len(lines) == 1 + 2 * len(poi.OVERPASS_BUCKETS)
+    assert [line.rsplit(";", 2)[-2].strip() for line in lines[1:]] == ["out 50", "out tags center 50"] * 4
+    assert all(f"(around:2000,{LAT},{LON})" in line for line in lines[1:])
+    nodes, ways = lines[7], lines[8]  # foods
+    assert nodes.startswith("(node(around") and ways.startswith("(way(around")
+    assert nodes.count('["cuisine"]') == nodes.count("node(") == 1
+
+
+def test_union_response_splits_into_topic_buckets():
+    way = {"type": "way", "id": 7, "center": {"lat": LAT, "lon": LON},
+           "tags": {"name": "Miramar Park", "leisure": "park", "wheelchair": "yes"}}
+    buckets = poi._overpass_buckets([
+        *ELEMENTS, ELEMENTS[0], way,
+        {"type": "node", "id": 8, "tags": {"name": "No Position", "historic": "ruins"}},
+    ])
+    ids = {topic: [el["id"] for el in els] for topic, els in buckets.items()}
+    assert ids == {"restaurants": [1, 2, 4], "nature": [7], "general": [3, 7], "foods": [1, 2, 4]}
+    assert buckets["nature"][0] == {"type": "way", "id": 7, "lat": LAT, "lon": LON,
+                                    "tags": {"name": "Miramar Park", "leisure": "park"}}
+
+
+@pytest.mark.parametrize("radius_m, fetched_m, ids", [(1000, 20_000, [1, 2]), (30_000, 30_000, [1, 2, 4])])
+def test_union_is_fetched_wide_and_filtered_to_the_radius(upstream, monkeypatch, radius_m, fetched_m, ids):
+    monkeypatch.setattr(settings, "overpass_radius_m", 20_000)
+    elements = poi._overpass_elements(LAT, LON, radius_m, "restaurants")
+    assert [el["id"] for el in elements] == ids
+    (ql,) = parse_qs(upstream[0].content.decode())["data"]
+    assert f"(around:{fetched_m},{LAT},{LON})" in ql
@@ -0,0 +1,68 @@
+import pytest
+
+from app.config import settings
+from app.tools import poi_index
+
+LAT, LON = 15.4909, 73.8278
+M = 1 / 111_000  # about one metre of latitude, in degrees
+
+
+def _item(name, north_m, **extra):
+    return {"name": name, "lat": LAT + north_m * M, "lon": LON, "source": "opentripmap", **extra}
+
+
+PLACES = [_item("Church Square", 100, rate=3), _item("Fontainhas", 500), _item("Miramar Beach", 2000)]
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(poi_index, "_conn", None)
+    poi_index.add("general", LAT, LON, 1000, PLACES + [{"name": "No Position", "lat": None, "lon": None}])
+    yield
+    poi_index._conn.close()
+
+
+def _names(items):
+    return [it["name"] for it in items]
+
+
+def test_within_and_nearest_are_sorted_by_distance(index):
+    assert _names(poi_index.within("general", LAT, LON, 600)) == ["Church Square", "Fontainhas"]
+    assert _names(poi_index.nearest("general", LAT + 2100 * M, LON, 2)) == ["Miramar Beach", "Fontainhas"]
+    assert poi_index.within("foods", LAT, LON, 600) == []
+    (church,) = poi_index.within("general", LAT, LON, 200)
+    assert church == {**PLACES[0], "kinds": None, "otm": None}
+
+
+def test_readding_a_place_updates_it_in_place(index):
+    poi_index.add("general", LAT, LON, 0, [_item("church square", 101, rate=5)])
+    (church,) = poi_index.within("general", LAT, LON, 200)
+    assert church["name"] == "Church Square" and church["rate"] == 5
+
+
+@pytest.mark.parametrize("north_m, radius_m, limit, names", [
+    (0, 800, 10, ["Church Square", "Fontainhas"]),  # whole radius inside the covered circle
+    (0, 5000, 1, ["Church Square"]),  # k-th nearest is close, so a wide radius is still certain
+    (600, 300, 10, ["Fontainhas"]),  # off-centre, but 600 + 300 <= 1000
+    (0, 1500, 10, None),  # radius reaches past the coverage
+    (800, 300, 10, None),  # off-centre and 800 + 300 > 1000
+])
+def test_lookup_answers_only_inside_fresh_coverage(index, north_m, radius_m, limit, names):
+    items = poi_index.lookup("general", LAT + north_m * M, LON, radius_m, limit)
+    assert (None if items is None else _names(items)) == names
+
+
+def test_stale_coverage_is_a_miss(index, monkeypatch):
+    now = poi_index.time.time()
+    monkeypatch.setattr(poi_index.time, "time", lambda: now + settings.poi_cache_fresh_s + 1)
+    assert poi_index.lookup("general", LAT, LON, 800, 10) is None
+    assert len(poi_index.within("general", LAT, LON, 800)) == 2
+
+
+def test_disabled_cache_stores_and_finds_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    poi_index.add("general", LAT, LON, 1000, PLACES)
+    assert poi_index.within("general", LAT, LON, 600) == []
+    assert poi_index.lookup("general", LAT, LON, 600, 10) is None
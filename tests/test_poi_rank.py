@@ -0,0 +1,77 @@
+from app.tools.poi_rank import dedupe_and_rank
+
+LAT, LON = 28.6139, 77.2090
+M = 1 / 111_000  # about one metre of latitude, in degrees
+
+
+def _item(name, source="overpass", north_m=0.0, rate=None, **extra):
+    return {"name": name, "source": source, "lat": LAT + north_m * M, "lon": LON, "rate": rate, **extra}
+
+
+def _names(items):
+    return sorted(it["name"] for it in dedupe_and_rank(items))
+
+
+def test_saints_with_different_names_stay_apart():
+    items = [_item("St. Mary's Church"), _item("St. Mark's Church", north_m=110)]
+    assert _names(items) == ["St. Mark's Church", "St. Mary's Church"]
+
+
+def test_generic_name_does_not_swallow_specific_one():
+    items = [_item("Museum"), _item("Railway Museum", north_m=50)]
+    assert len(dedupe_and_rank(items)) == 2
+
+
+def test_different_kinds_of_place_stay_apart():
+    items = [_item("Hauz Khas Lake"), _item("Hauz Khas Fort", north_m=120)]
+    assert len(dedupe_and_rank(items)) == 2
+
+
+def test_transliteration_variants_merge():
+    items = [
+        _item("Lodi Gardens"),
+        _item("Lodhi Garden", source="opentripmap", north_m=400, rate=3),
+        _item("Qutb Minar", north_m=5000),
+        _item("Qutub Minar", source="wikipedia", north_m=5030),
+    ]
+    assert _names(items) == ["Lodhi Garden", "Qutub Minar"]
+
+
+def test_alias_merges_into_best_source_and_fills_gaps():
+    items = [
+        _item("Red Fort", source="wikipedia", kinds="wikipedia"),
+        _item("Lal Qila (Red Fort)", source="opentripmap", north_m=80, rate=7, kinds=None, otm="https://otm/1"),
+    ]
+    (merged,) = dedupe_and_rank(items)
+    assert merged["name"] == "Lal Qila (Red Fort)"
+    assert merged["kinds"] == "wikipedia"
+    assert merged["rate"] == 7
+
+
+def test_same_name_far_apart_merges_but_unrelated_do_not():
+    items = [_item("Hanuman Temple"), _item("hanuman temple", north_m=20_000), _item("Park"), _item("Central Park")]
+    assert len(dedupe_and_rank(items)) == 3
+
+
+def test_ranking_and_inputs_untouched():
+    items = [_item("Small Shrine", rate=1), _item("Big Fort", source="opentripmap", north_m=3000, rate=7)]
+    before = [dict(it) for it in items]
+    out = dedupe_and_rank(items, center=(LAT, LON))
+    assert [it["name"] for it in out] == ["Big Fort", "Small Shrine"]
+    assert items == before
+
+
+def test_unnamed_and_unpositioned_items():
+    items = [_item(""), {"name": "Nowhere Cafe", "source": "overpass"}, _item("Somewhere Cafe")]
+    assert _names(items) == ["Nowhere Cafe", "Somewhere Cafe"]
+
+
+def test_curly_apostrophes_and_malformed_rates():
+    items = [
+        _item("St. Mary’s Church", rate="n/a"),
+        _item("st marys church", source="opentripmap", north_m=20_000, rate="4"),
+        _item("Gandhi Smriti", rate=2),
+    ]
+    out = dedupe_and_rank(items)
+    assert [it["name"] for it in out] == ["st marys church", "Gandhi Smriti"]
+    assert out[0]["rate"] == "4"
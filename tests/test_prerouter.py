@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from app.agents import prerouter, router
+from app.config import settings
+
+TZ = "Asia/Kolkata"
+
+
+def _fields(query):
+    r = prerouter.pre_route(query, TZ)
+    return r["intent"], r["city"], r["days"], r["poi_topic"], r["guide_topic"], r["confidence"]
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("weather in goa tomorrow", ("weather", "Goa", 2, "general", "none", 1.0)),
+    ("plan a 3 day trip to Jaipur", ("plan", "Jaipur", 3, "general", "none", 1.0)),
+    ("plan a week in Ooty", ("plan", "Ooty", 7, "general", "none", 1.0)),
+    ("best restaurants in New Delhi", ("poi", "Delhi", 2, "restaurants", "none", 1.0)),
+    ("foods to try in lucknow", ("poi", "Lucknow", 2, "foods", "foods_to_try", 1.0)),
+    ("cheap places to visit in bangalore", ("poi", "Bengaluru", 2, "general", "budget", 1.0)),
+    # "Valley" is part of the name here, not a nature cue
+    ("things to do in Spiti Valley", ("poi", "Spiti", 2, "general", "none", 1.0)),
+])
+def test_confident_queries(query, expected):
+    assert _fields(query) == expected
+
+
+def test_ambiguous_queries_are_left_to_the_llm():
+    for query in (
+        "plan a trip to goa with good restaurants",       # two intent cues
+        "what is the weather in Goa during my trip",
+        "will it rain in Manali on my trip next week",
+        "compare delhi and mumbai weather",               # two cities
+    ):
+        assert _fields(query)[-1] < settings.fast_router_threshold, query
+    assert _fields("hello")[-1] == 0.0
+
+
+def test_find_cities_prefers_longest_alias():
+    assert prerouter.find_cities("from rann of kutch to new delhi") == [("Rann of Kutch", 1, 4), ("Delhi", 5, 7)]
+
+
+def test_date_window_spans_the_days():
+    r = prerouter.pre_route("plan a 3 day trip to Jaipur", TZ)
+    span = date.fromisoformat(r["end_date"]) - date.fromisoformat(r["start_date"])
+    assert span.days == 2
+
+
+def test_router_fast_path_skips_llm(monkeypatch):
+    monkeypatch.setattr(settings, "fast_router_threshold", 0.9)
+    monkeypatch.setattr(router, "cached_chat", lambda *a, **kw: pytest.fail("LLM called"))
+    before = prerouter.stats()["hits"]
+    r = router.route("weather in goa tomorrow", TZ)
+    assert (r["intent"], r["city"]) == ("weather", "Goa")
+    assert prerouter.stats()["hits"] == before + 1
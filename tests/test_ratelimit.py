@@ -0,0 +1,52 @@
+import pytest
+
+from app.utils import ratelimit
+from app.utils.ratelimit import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_queues_reservations_in_order(clock):
+    bucket = TokenBucket(60)  # one token per second
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    assert bucket.reserve(1) == pytest.approx(2.0)
+    clock[0] += 2.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+
+
+def test_oversized_request_waits_for_a_full_bucket(clock):
+    bucket = TokenBucket(10)
+    bucket.reserve(5)
+    assert bucket.reserve(1000) == pytest.approx(30.0)  # capped at capacity: 5 short at 1/6 per second
+
+
+def test_refund_and_pause(clock):
+    bucket = TokenBucket(60)
+    bucket.reserve(60)
+    bucket.refund(30)
+    assert bucket.reserve(30) == 0.0
+    bucket.refund(60)
+    bucket.pause(5)
+    assert bucket.reserve(1) == pytest.approx(5.0)
+    clock[0] += 5
+    assert bucket.reserve(1) == 0.0
+
+
+def test_zero_disables_a_bucket(clock):
+    limiter = RateLimiter(rpm=0, tpm=0)
+    assert all(limiter.reserve(10_000) == 0.0 for _ in range(100))
+
+
+def test_limiter_waits_for_the_tighter_bucket_and_settles(clock):
+    limiter = RateLimiter(rpm=600, tpm=600)  # 10 per second each
+    assert limiter.reserve(600) == 0.0
+    assert limiter.reserve(100) == pytest.approx(10.0)  # tokens, not requests, are short
+    limiter.settle(reserved=100, used=0)  # the second call never reached the model
+    limiter.settle(reserved=600, used=100)
+    assert limiter.reserve(100) == 0.0
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from app.agents import router
+from app.config import settings
+
+
+class _Warm:
+    def __init__(self):
+        self.settled = []
+
+    def settle(self, city):
+        self.settled.append(city)
+
+
+@pytest.fixture
+def warm(monkeypatch):
+    handle = _Warm()
+    monkeypatch.setattr(settings, "fast_router_threshold", 2.0)  # always ask the LLM
+    monkeypatch.setattr(settings, "router_prefetch", True)
+    monkeypatch.setattr(router.prefetch, "start", lambda guess: handle)
+    return handle
+
+
+def test_prefetch_settles_with_router_city(warm, monkeypatch):
+    answer = {"intent": "weather", "city": "Goa", "days": 3, "relative_date_phrase": "next week"}
+    monkeypatch.setattr(router, "cached_chat", lambda *a, **kw: json.dumps(answer))
+    r = router.route("is it raining in goa next week", "Asia/Kolkata")
+    assert (r["intent"], r["city"], r["days"]) == ("weather", "Goa", 3)
+    assert warm.settled == ["Goa"]
+
+
+def test_failed_llm_call_still_settles_prefetch(warm, monkeypatch):
+    def boom(*_a, **_kw):
+        raise TimeoutError("LLM call exceeded its deadline")
+
+    monkeypatch.setattr(router, "cached_chat", boom)
+    with pytest.raises(TimeoutError):
+        router.route("something about goa", "Asia/Kolkata")
+    assert warm.settled == [""]
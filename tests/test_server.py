@@ -0,0 +1,55 @@
+import asyncio
+import threading
+
+import pytest
+
+from app import server
+from app.config import settings
+
+
+@pytest.fixture
+def small_server(monkeypatch):
+    monkeypatch.setattr(settings, "server_max_concurrency", 2)
+    monkeypatch.setattr(settings, "server_max_overrun", 1)
+    monkeypatch.setattr(server, "_limiter", None)
+    monkeypatch.setattr(server, "_overrun", 0)
+    pool_sizes = []
+    real_pool = server.get_pool
+
+    def get_pool(name, max_workers):
+        pool_sizes.append(max_workers)
+        return real_pool(f"test-{name}-{max_workers}", max_workers)
+
+    monkeypatch.setattr(server, "get_pool", get_pool)
+    return pool_sizes
+
+
+def test_result_and_pool_sized_for_overrun(small_server):
+    assert asyncio.run(server._run_blocking(lambda x: x * 2, 21, deadline=1.0)) == 42
+    assert small_server == [3]
+
+
+def test_timeout_frees_limiter_and_counts_overrun(small_server):
+    release = threading.Event()
+
+    async def scenario():
+        with pytest.raises(server.HTTPError) as e:
+            await server._run_blocking(release.wait, deadline=0.05)
+        assert e.value.status == 504
+        assert server._overrun == 1
+        assert server._get_limiter()._value == 2
+
+        # At the overrun cap, new work is refused rather than queued
+        with pytest.raises(server.HTTPError) as e:
+            await server._run_blocking(lambda: 1, deadline=1.0)
+        assert e.value.status == 503
+
+        release.set()
+        for _ in range(100):
+            if server._overrun == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert server._overrun == 0
+        assert await server._run_blocking(lambda: 1, deadline=1.0) == 1
+
+    asyncio.run(scenario())
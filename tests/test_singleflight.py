@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.utils.singleflight import SingleFlight
+
+
+def test_concurrent_sync_callers_share_one_call():
+    flights = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "done"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flights.do("k", work)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flights.do("k", work)))
+    follower.start()
+    while not flights.coalesced:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+    assert results == ["done", "done"]
+    assert calls == [1]
+    assert flights.do("k", lambda: "again") == "again"  # nothing cached
+
+
+def test_sync_error_is_shared_and_not_cached():
+    flights = SingleFlight()
+    with pytest.raises(ValueError):
+        flights.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert flights.do("k", lambda: 1) == 1
+
+
+def test_async_followers_share_and_survive_one_cancel():
+    async def scenario():
+        flights = SingleFlight()
+        started = 0
+
+        async def fetch():
+            nonlocal started
+            started += 1
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        a = asyncio.ensure_future(flights.do_async("k", fetch))
+        b = asyncio.ensure_future(flights.do_async("k", fetch))
+        await asyncio.sleep(0)
+        a.cancel()
+        assert await b == "ok"
+        assert a.cancelled()
+        assert started == 1 and flights.coalesced == 1
+
+    asyncio.run(scenario())
+
+
+def test_async_call_cancelled_with_its_last_waiter():
+    async def scenario():
+        flights = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def fetch():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.ensure_future(flights.do_async("k", fetch)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for w in waiters:
+            w.cancel()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+        async def fresh():
+            return "fresh"
+
+        # A later caller starts a new call instead of joining the cancelled one
+        assert await flights.do_async("k", fresh) == "fresh"
+
+    asyncio.run(scenario())
@@ -0,0 +1,91 @@
+import asyncio
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.tools import poi, transport
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Route transport through a mock: set `upstream.reply` to a status or an exception."""
+    seen = []
+
+    class Upstream:
+        reply = 200
+
+    def handler(request):
+        seen.append(request)
+        if isinstance(Upstream.reply, Exception):
+            raise Upstream.reply
+        return httpx.Response(Upstream.reply, json={"elements": []})
+
+    monkeypatch.setattr(settings, "http_retries", 2)
+    monkeypatch.setattr(transport, "_retry_delay", lambda attempt, resp: 0.0)
+    transport.use_transport(httpx.MockTransport(handler))
+    Upstream.seen = seen
+    yield Upstream
+    transport.use_transport(None)
+
+
+def test_gateway_timeout_is_retried_by_default(upstream):
+    upstream.reply = 504
+    assert transport.get("https://example.test/a").status_code == 504
+    assert len(upstream.seen) == 3
+
+
+def test_timeouts_not_retried_when_the_server_enforces_a_limit(upstream):
+    upstream.reply = 504
+    assert transport.post("https://example.test/q", data={"q": 1}, retry_timeouts=False).status_code == 504
+    assert len(upstream.seen) == 1
+
+    upstream.reply = httpx.ReadTimeout("slow")
+    with pytest.raises(httpx.ReadTimeout):
+        transport.post("https://example.test/q", data={"q": 2}, retry_timeouts=False)
+    assert len(upstream.seen) == 2
+
+    upstream.reply = 503  # other failures still are
+    transport.post("https://example.test/q", data={"q": 3}, retry_timeouts=False)
+    assert len(upstream.seen) == 5
+
+
+def test_overpass_client_outwaits_the_server_and_does_not_retry(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    poi._fetch_buckets(28.6, 77.2, 5000)
+    (request,) = upstream.seen
+    assert f"[timeout:{poi.OVERPASS_TIMEOUT_S}]" in parse_qs(request.content.decode())["data"][0]
+    assert request.extensions["timeout"]["read"] > poi.OVERPASS_TIMEOUT_S
+
+    upstream.reply = 504
+    with pytest.raises(httpx.HTTPStatusError):
+        poi._fetch_buckets(28.6, 77.2, 5000)
+    assert len(upstream.seen) == 2
+
+
+def test_concurrent_async_gets_share_one_request():
+    seen = []
+
+    async def handler(request):
+        seen.append(request)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, json={"n": len(seen)})
+
+    async def scenario():
+        try:
+            same = [transport.aget("https://example.test/a", params={"q": 1}) for _ in range(3)]
+            other = transport.aget("https://example.test/a", params={"q": 2})
+            return await asyncio.gather(*same, other)
+        finally:
+            await transport.aclose()
+
+    before = transport.coalesced_count()
+    transport.use_transport(httpx.MockTransport(handler))
+    try:
+        responses = asyncio.run(scenario())
+    finally:
+        transport.use_transport(None)
+    assert len(seen) == 2
+    assert responses[0] is responses[1] is responses[2]
+    assert transport.coalesced_count() - before == 2
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.tools import transport, weather
+
+CITIES = {"Jaipur": (26.91, 75.79), "Goa": (15.49, 73.83)}
+
+
+def _daily(lat, start, end):
+    dates = weather._window_dates(start, end)
+    return {"daily": {
+        "time": dates,
+        "temperature_2m_min": [round(lat)] * len(dates),
+        "temperature_2m_max": [round(lat) + 10] * len(dates),
+        "precipitation_sum": [0.0] * len(dates),
+        "weathercode": [0] * len(dates),
+    }}
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """Open-Meteo stand-in (a bare object for one location, a list for several); yields forecast requests."""
+    forecasts = []
+
+    def handler(request):
+        q = request.url.params
+        if request.url.path == "/v1/search":
+            hit = CITIES.get(q["name"])
+            if hit is None:
+                return httpx.Response(200, json={"results": []})
+            return httpx.Response(200, json={"results": [{"name": q["name"], "latitude": hit[0], "longitude": hit[1]}]})
+        forecasts.append(request)
+        lats = [float(v) for v in q["latitude"].split(",")]
+        payloads = [_daily(lat, q["start_date"], q["end_date"]) for lat in lats]
+        return httpx.Response(200, json=payloads if len(payloads) > 1 else payloads[0])
+
+    monkeypatch.setattr(settings, "cache_enabled", False)
+    transport.use_transport(httpx.MockTransport(handler))
+    yield forecasts
+    transport.use_transport(None)
+
+
+def test_many_cities_share_one_forecast_request(upstream):
+    out = weather.daily_summary_many(["Jaipur", "Goa", "Nowhereville"], "2026-10-18", "2026-10-19")
+    assert [r["city"] for r in out] == ["Jaipur", "Goa", "Nowhereville"]
+    assert [(d["date"], d["tmin_c"]) for d in out[0]["days"]] == [("2026-10-18", 27), ("2026-10-19", 27)]
+    assert [d["tmin_c"] for d in out[1]["days"]] == [15, 15]
+    assert out[2]["days"] == [] and "Nowhereville" in out[2]["error"]
+    assert len(upstream) == 1
+
+
+def test_batch_size_splits_requests(upstream, monkeypatch):
+    monkeypatch.setattr(settings, "forecast_batch_size", 1)
+    out = weather.daily_summary_many(["Jaipur", "Goa"], "2026-10-18", "2026-10-18")
+    assert [len(r["days"]) for r in out] == [1, 1]
+    assert len(upstream) == 2
+
+
+def test_single_city_matches_batched_result(upstream):
+    one = weather.daily_summary("Jaipur", "2026-10-18", "2026-10-20")
+    (many,) = weather.daily_summary_many(["Jaipur"], "2026-10-18", "2026-10-20")
+    assert one["days"] == many["days"]
+
+
+def test_split_batch_rejects_short_answers():
+    assert weather._split_batch({"daily": {}}, 1) == [{"daily": {}}]
+    with pytest.raises(ValueError):
+        weather._split_batch([{}], 2)
+
+
+def test_async_twins_match_sync_and_keep_sqlite_off_the_loop(upstream, monkeypatch):
+    sync = [weather.daily_summary(c, "2026-10-18", "2026-10-19") for c in ("Jaipur", "Goa")]
+    lookups = []
+    real_get = weather.geocache.get
+
+    def get(source, city):
+        lookups.append(threading.current_thread())
+        return real_get(source, city)
+
+    monkeypatch.setattr(weather.geocache, "get", get)
+
+    async def scenario():
+        single = await weather.daily_summary_async("Jaipur", "2026-10-18", "2026-10-19")
+        many = await weather.daily_summary_many_async(["Jaipur", "Goa", "Nowhereville"], "2026-10-18", "2026-10-19")
+        await transport.aclose()
+        return single, many
+
+    single, many = asyncio.run(scenario())
+    assert single == sync[0]
+    assert [r["days"] for r in many[:2]] == [r["days"] for r in sync]
+    assert "Nowhereville" in many[2]["error"]
+    assert lookups and threading.main_thread() not in lookups
+
+
+@pytest.fixture
+def cached_upstream(upstream, monkeypatch, tmp_path):
+    """`upstream` with the forecast and geocode caches on, in a fresh directory."""
+    monkeypatch.setattr(settings, "cache_enabled", True)
+    monkeypatch.setattr(settings, "cache_dir", str(tmp_path))
+    monkeypatch.setattr(weather, "_forecast_store", None)
+    monkeypatch.setattr(weather.geocache, "_store", None)
+    return upstream
+
+
+def test_merge_days_keeps_window_order_and_prefers_fresh_days():
+    cached = {"2026-10-18": {"date": "2026-10-18", "tmin_c": 1}, "2026-10-19": {"date": "2026-10-19", "tmin_c": 1}}
+    fetched = [{"date": "2026-10-20", "tmin_c": 2}, {"date": "2026-10-19", "tmin_c": 2}]
+    dates = ["2026-10-18", "2026-10-19", "2026-10-20", "2026-10-21"]
+    assert [(d["date"], d["tmin_c"]) for d in weather._merge_days(dates, cached, fetched)] == [
+        ("2026-10-18", 1), ("2026-10-19", 2), ("2026-10-20", 2),
+    ]
+    assert weather._merge_days([], cached, fetched) == fetched
+
+
+def test_only_missing_days_are_fetched(cached_upstream):
+    first = weather.daily_summary("Jaipur", "2026-10-18", "2026-10-19")
+    wider = weather.daily_summary("Jaipur", "2026-10-18", "2026-10-21")
+    again = weather.daily_summary("Jaipur", "2026-10-19", "2026-10-20")
+    assert [(r.url.params["start_date"], r.url.params["end_date"]) for r in cached_upstream] == [
+        ("2026-10-18", "2026-10-19"), ("2026-10-20", "2026-10-21"),
+    ]
+    assert [d["date"] for d in wider["days"]] == ["2026-10-18", "2026-10-19", "2026-10-20", "2026-10-21"]
+    assert wider["days"][:2] == first["days"]
+    assert again["days"] == wider["days"][1:3]
+
+
+def test_batch_skips_cities_whose_days_are_cached(cached_upstream):
+    weather.daily_summary("Jaipur", "2026-10-18", "2026-10-19")
+    out = weather.daily_summary_many(["Jaipur", "Goa"], "2026-10-18", "2026-10-19")
+    assert [len(r["days"]) for r in out] == [2, 2]
+    assert len(cached_upstream) == 2
+    assert cached_upstream[1].url.params["latitude"] == "15.49"